@@ -1,37 +1,35 @@
 import asyncio
-import contextlib
 import datetime
-import edge_tts
-import ffmpeg
-import io
+import hmac
 import json
 import os
 import shutil
-import tempfile
+import threading
 import time
 import traceback
 
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
-from flask import Flask, request, jsonify, render_template
-from openai import OpenAI
-from PIL import Image, ImageFilter
+from flask import Flask, Response, request, jsonify, render_template, send_file
 
+from artifact_store import ARTIFACT_STORE
+from channel_profiles import CHANNEL_PROFILES, get_channel_profile
 from constants import (
-	ASSET_FOLDER, BGM_FOLDER, FONTS_FOLDER, LOCAL_IMAGE_DB, LOGO_FOLDER, PLAYLIST_FOLDER,
-	SCRIPT_FOLDER, THUMBNAIL_FOLDER, VIDEO_EXTENSION, VIDEO_OUTPUT_FOLDER
+	APP_HOST, APP_PORT, FONTS_FOLDER, IMAGE_SUMMARY_FILE, LOCAL_IMAGE_DB, PROFILE_FOLDER, PROFILE_PIPELINE,
+	READY_MIN_FREE_GB, RENDER_FARM_TOKEN, SCRIPT_FOLDER, SERVICES_LOCK_FILE, SSE_KEEP_ALIVE_INTERVAL, THUMBNAIL_FOLDER,
+	VIDEO_EXTENSION, VIDEO_OUTPUT_FOLDER
 )
-from convert_vertical_to_horizontal import convert_all_in_folder
-from convert_webp_to_jpg import convert_webp_to_jpg_in_folder
-from image_selector import ImageSelector
-from metadata_creator import MetadataCreator
-from script_generator import ScriptGenerator
-from tts_engine import TTSEngine
-from utils import sanitize_filename
-from video_creators.gardening_video_creator import GardeningVideoCreator
-from video_creators.health_video_creator import HealthVideoCreator
-from video_creators.diabetes_video_creator import DiabetesVideoCreator
-from youtube_uploader import YouTubeUploader
-from werkzeug.utils import secure_filename
+from image_usage_ledger import get_usage_ledger
+from job_events import JOB_ID_PATTERN, JOB_REGISTRY
+from playlist_cache import PLAYLIST_CACHE
+from plugin_registry import UPLOADERS, VIDEO_CREATORS
+from profiler import PipelineProfiler, flame_tree, load_profile, load_stacks
+from render_farm import RENDER_FARM
+from upload_scheduler import UPLOAD_SCHEDULER
+from utils import capture_stdout, format_title, is_loopback_host, try_lock_file
+
+# Heavy stage modules (openai, edge_tts, ffmpeg, PIL, googleapiclient) are imported on first use so the dashboard
+# starts fast. Check with: python benchmarks/import_time.py
 
 # Read API keys from environment variables
 load_dotenv()
@@ -41,23 +39,55 @@ if not openai_api_key:
 
 # Setup application
 app = Flask(__name__, template_folder=os.path.join(os.getcwd(), 'templates'))
-ai_client = OpenAI(api_key=openai_api_key)
+_ai_client = None
+_ai_client_pid = None
+_ai_client_lock = threading.Lock()
+_services_lock_file = None
 
-ACTIVE_CHANNELS = [
-	"gardening"
-]
 
+def get_ai_client():
+	"""OpenAI client of this process; a client inherited through fork would share its connection pool, so it's rebuilt."""
+	global _ai_client, _ai_client_pid
+	with _ai_client_lock:
+		if _ai_client is None or _ai_client_pid != os.getpid():
+			from openai import OpenAI
+			_ai_client = OpenAI(api_key=openai_api_key)
+			_ai_client_pid = os.getpid()
+		return _ai_client
 
-def load_playlists():
-	all_playlists = {channel: {} for channel in ACTIVE_CHANNELS}  # ✅ Default empty dict for each category
 
-	for channel in ACTIVE_CHANNELS:
-		file_path = os.path.join(PLAYLIST_FOLDER, f"{channel}_playlists.json")
-		if os.path.exists(file_path):
-			with open(file_path, "r", encoding="utf-8") as f:
-				all_playlists[channel] = json.load(f)  # ✅ Load JSON if file exists
+def start_background_services():
+	"""
+	Starts the upload dispatcher and the artifact store startup sweep in exactly one server process: the first one to
+	lock SERVICES_LOCK_FILE, which it holds until it exits. Called by every process (dev server, WSGI workers).
+	:return: True when this process runs the services.
+	"""
+	global _services_lock_file
+	if _services_lock_file is None:
+		_services_lock_file = try_lock_file(SERVICES_LOCK_FILE)
+		if _services_lock_file is None:
+			print(f"ℹ️ Background services run in another server process (pid {os.getpid()} only serves requests).")
+			return False
+		UPLOAD_SCHEDULER.start()
+		ARTIFACT_STORE.startup()
+	return True
+
+
+def active_channels(uploader=None):
+	"""Channels with a valid profile in channels/, optionally only the ones publishing through the given uploader."""
+	channels = []
+	for name in CHANNEL_PROFILES.names():
+		try:
+			profile = get_channel_profile(name)
+		except (FileNotFoundError, ValueError) as e:
+			print(f"⚠️ Skipping channel {name}: {e}")
+			continue
+		if uploader is None or profile["uploader"] == uploader:
+			channels.append(name)
+	return channels
 
-	return all_playlists
+def load_playlists():
+	return PLAYLIST_CACHE.get_all(active_channels())  # ✅ Empty dict for channels without a playlists file
 
 async def run_tts_pipeline(tts_client, formatted_title, main_points_amount, script_path):
 	subparts_durations = await tts_client.get_tts_subparts(formatted_title, main_points_amount)
@@ -68,8 +98,7 @@ async def run_tts_pipeline(tts_client, formatted_title, main_points_amount, scri
 @app.route("/rename_images", methods=["POST"])
 def rename_images():
 	from rename_images import rename_images
-	output = io.StringIO()
-	with contextlib.redirect_stdout(output):
+	with capture_stdout() as output:
 		rename_images()
 	return output.getvalue(), 200
 
@@ -77,34 +106,85 @@ def rename_images():
 @app.route("/generate_image_summary", methods=["POST"])
 def generate_image_summary():
 	from generate_image_summary import generate_image_summary
-	output = io.StringIO()
-	with contextlib.redirect_stdout(output):
+	with capture_stdout() as output:
 		generate_image_summary()
 	return output.getvalue(), 200
 
 
+@app.route("/scan_image_metadata", methods=["POST"])
+def scan_image_metadata():
+	from image_metadata_index import scan_image_metadata
+	with capture_stdout() as output:
+		scan_image_metadata()
+	return output.getvalue(), 200
+
+
+@app.route("/update_image_hashes", methods=["POST"])
+def update_image_hashes():
+	from image_hash_index import update_image_hash_index
+	with capture_stdout() as output:
+		update_image_hash_index()
+	return output.getvalue(), 200
+
+
+@app.route("/image_freshness", methods=["GET"])
+def image_freshness():
+	"""Per-topic report of how many images were never or recently used in videos."""
+	if not os.path.exists(IMAGE_SUMMARY_FILE):
+		return jsonify({"error": "Image summary file not found. Generate the image summary first."}), 404
+	with open(IMAGE_SUMMARY_FILE, "r", encoding="utf-8") as f:
+		image_database = json.load(f)
+	report = get_usage_ledger().topic_freshness(image_database)
+	return jsonify(dict(sorted(report.items(), key=lambda item: item[1]["fresh_percent"])))
+
+
 @app.route("/update_playlists", methods=["POST"])
 def update_playlists():
-	from youtube_uploader import YouTubeUploader
+	YouTubeUploader = UPLOADERS.get("youtube")
 
-	results = {}
+	# Sign in serially: a channel without a valid token opens a browser sign-in, one at a time.
+	uploaders = {}
+	for channel in active_channels(uploader="youtube"):
+		try:
+			uploaders[channel] = YouTubeUploader(channel)
+		except Exception as e:
+			print(f"❌ ERROR authenticating {channel}: {e}")
+			uploaders[channel] = None
+
+	def refresh_channel(channel):
+		if uploaders[channel] is None:
+			return None
+		try:
+			return uploaders[channel].fetch_and_store_playlists()
+		except Exception as e:
+			print(f"❌ ERROR refreshing playlists for {channel}: {e}")
+			return None
 
-	for channel in ACTIVE_CHANNELS:
-		uploader = YouTubeUploader(channel)
-		result = uploader.fetch_and_store_playlists()
-		results[channel] = f"{len(result)} playlists updated" if result else "Failed to update"
+	results = {}
+	channels = list(uploaders)
+	with ThreadPoolExecutor(max_workers=max(len(channels), 1)) as executor:
+		for channel, result in zip(channels, executor.map(refresh_channel, channels)):
+			results[channel] = f"{len(result)} playlists updated" if result else "Failed to update"
 
 	return results
 
 
+@app.route("/upload_queue", methods=["GET"])
+def upload_queue():
+	jobs = UPLOAD_SCHEDULER.list_jobs()
+	quota = {channel: UPLOAD_SCHEDULER.quota_ledger.used(channel) for channel in active_channels(uploader="youtube")}
+	return jsonify({"jobs": jobs, "quota_used_today": quota})
+
+
 @app.route("/bulk_image_availability_check", methods=["POST"])
 def bulk_image_check():
 	from bulk_image_availability_check import run_bulk_image_availability_check
 	topics = request.form.get("topics", "")
-	output = io.StringIO()
-	with contextlib.redirect_stdout(output):
-		run_bulk_image_availability_check(topics)
-	return output.getvalue()
+	refresh = request.form.get("refresh") == "true"
+	with capture_stdout() as output:
+		result = run_bulk_image_availability_check(topics, refresh=refresh)
+	result["log"] = output.getvalue()
+	return jsonify(result)
 
 
 @app.route('/video-edit')
@@ -119,6 +199,7 @@ def video_edit():
 
 @app.route('/convert-vertical', methods=['POST'])
 def convert_vertical_endpoint():
+	from convert_vertical_to_horizontal import convert_all_in_folder
 	folder_path = request.form.get("folder_path")
 	if not folder_path or not os.path.isdir(folder_path):
 		return "❌ Invalid folder path.", 400
@@ -129,6 +210,7 @@ def convert_vertical_endpoint():
 
 @app.route('/convert-webp', methods=['POST'])
 def convert_webp_endpoint():
+	from convert_webp_to_jpg import convert_webp_to_jpg_in_folder
 	folder_path = request.form.get("folder_path")
 	if not folder_path or not os.path.isdir(folder_path):
 		return "❌ Invalid folder path.", 400
@@ -169,6 +251,8 @@ def generate_content():
 	run_images = run_until in ["images", "video", "upload"]
 	run_video = run_until in ["video", "upload"]
 	run_upload = run_until == "upload"
+	run_shorts = request.form.get("make_shorts") == "on"
+	profile_job = PROFILE_PIPELINE or request.form.get("profile") == "on"
 
 	# Automatically counts main points separated by comma ,
 	main_points_amount = len([point.strip() for point in mainpoints.split(",") if point.strip()])
@@ -182,9 +266,16 @@ def generate_content():
 	if not mainpoints:
 		return jsonify({"error": "Please provide main points"}), 400
 
+	# ✅ CHANNEL PROFILE (channels/{category}.json) drives every stage below.
+	try:
+		profile = get_channel_profile(category)
+	except (FileNotFoundError, ValueError) as e:
+		return jsonify({"error": str(e)}), 400
+	if run_upload and (profile["uploader"] == "none" or not profile["policy"]["allow_upload"]):
+		return jsonify({"error": f"Uploads are disabled for channel '{category}'"}), 400
+
 	# ✅ SANITIZE TITLE
-	formatted_title = sanitize_filename(title)
-	formatted_title = title.replace(":", "_").replace("?", "_").replace("'", "_").replace("/", "_").replace("+", "_").replace("=", "_").lower()
+	formatted_title = format_title(title)
 
 	# ✅ DEFAULT THUMBNAIL PATH
 	thumbnail_path = os.path.join(THUMBNAIL_FOLDER, f"{formatted_title}.jpg")
@@ -192,23 +283,7 @@ def generate_content():
 	# ✅ NO THUMBNAIL
 	if not os.path.exists(thumbnail_path):
 		# ✅ No default thumbnail found
-		print(f"⚠️ WARNING: No thumbnail found for {formatted_title}. Upload will proceed without one.")
-
-	# ✅ CUSTOM INTRO FILES
-	custom_intro_paths = []
-	if custom_intro_files:
-		temp_intro_dir = tempfile.mkdtemp(prefix="intro_", dir=os.getcwd())  # avoids deep temp paths
-		for i, file in enumerate(custom_intro_files):
-			if file and file.filename:
-				# Shorten filename to avoid long paths
-				ext = os.path.splitext(file.filename)[-1]
-				filename = f"{i}{ext}"
-				save_path = os.path.join(temp_intro_dir, filename)
-				file.save(save_path)
-				custom_intro_paths.append(save_path)
-		print("📦 Passing custom intro files to selector in this order:")
-		for path in custom_intro_paths:
-			print("   →", path)
+		print(f"⚠️ WARNING: No thumbnail found for {formatted_title}. One will be generated from the video's images before upload.")
 
 	# ✅ SCHEDULED UPLOAD (Convert to ISO 8601)
 	scheduled_time = None
@@ -223,58 +298,117 @@ def generate_content():
 	# ✅ If video already exists and user only wants to upload, skip to upload step
 	if os.path.exists(output_video_path):
 		print(f"📼 Skipping content creation: Video already exists for: {output_video_path}")
-		if run_upload:
+		if run_upload or run_shorts:
 			run_script = False
 			run_tts = False
 			run_images = False
 			run_video = False
 		else:
 			return f"📼 Skipped: Video already exists at {output_video_path}. Now ready for upload."
+	video_creator_name = profile.get("video_creator", category)
+	if run_video and video_creator_name not in VIDEO_CREATORS:
+		return jsonify({"error": f"Unknown video creator '{video_creator_name}' for channel '{category}'"}), 400
+	if run_video and not VIDEO_CREATORS.is_available(video_creator_name):
+		return jsonify({"error": f"Video creator '{video_creator_name}' is not installed"}), 400
 
-	try:
-		# ✅ Step 1: Generate the script.
-		if run_script:
-			print("✅ Step 1: Generate the script.")
-			script_generator = ScriptGenerator(category, title, main_points_amount, formatted_title, mainpoints, ai_client)
-			script_path = script_generator.generate_script()
-
-		# ✅ Step 2: Generate narration and subtitles from script.
-		if run_tts:
-			print("✅ Step 2: Generate narration and subtitles from script.")
-			tts_client = TTSEngine(category)
-			subparts_durations, audio_path, subtitles_path = asyncio.run(run_tts_pipeline(tts_client, formatted_title, main_points_amount, script_path))
-			print(f"⌚ subparts_durations: {subparts_durations}")
-			print(f"🎤 audio_path: {audio_path}")
-			print(f"📗 subtitles_path: {subtitles_path}")
-
-		# ✅ Step 3: Pick images for the video.
-		if run_images:
-			print("✅ Step 3: Pick images for the video.")
-			mainpoints_list = [point.strip() for point in mainpoints.split(",")]
-			selector = ImageSelector(mainpoints_list, custom_intro_files=custom_intro_paths)
-			intro_images, main_topic_images, conclusion_images = selector.pick_images(main_points_amount) # returns array of paths
-
-		# ✅ Step 4: Generate Video with selected images.
-		if run_video:
-			print("✅ Step 4: Generate Video with selected images.")
-
-			if category == 'gardening':
-				video_creator = GardeningVideoCreator(
-					narration_audio=audio_path,
-					subtitle_file=subtitles_path,
-					output_file=output_video_path,
-					video_title=title,
-					font_path=FONTS_FOLDER,
-					intro_images=intro_images,
-					main_topic_images=main_topic_images,
-					conclusion_images=conclusion_images,
-					subparts_durations=subparts_durations,
-					logo_path=f"{LOGO_FOLDER}/cyc-logo.png",
-				)
-			elif category == 'health':
-				video_creator = HealthVideoCreator(
-					narration_audio=audio_path,
-					subtitle_file=subtitles_path,
+	# ✅ CUSTOM INTRO FILES
+	custom_intro_paths = []
+	if custom_intro_files:
+		temp_intro_dir = ARTIFACT_STORE.temp_dir("intro_")  # Short path (avoids deep temp paths); swept at startup if a crash leaves it behind
+		for i, file in enumerate(custom_intro_files):
+			if file and file.filename:
+				# Shorten filename to avoid long paths
+				ext = os.path.splitext(file.filename)[-1]
+				filename = f"{i}{ext}"
+				save_path = os.path.join(temp_intro_dir, filename)
+				file.save(save_path)
+				custom_intro_paths.append(save_path)
+		print("📦 Passing custom intro files to selector in this order:")
+		for path in custom_intro_paths:
+			print("   →", path)
+
+	job = JOB_REGISTRY.create(title, category)
+	temp_dir = temp_intro_dir if custom_intro_files else None
+
+	def run_pipeline():
+		profiler = PipelineProfiler(job.id) if profile_job else None
+
+		def on_progress(event_type, **data):
+			job.publish(event_type, **data)
+			if profiler and event_type == "ffmpeg_pass":
+				profiler.record_process(**data)
+
+		def enter_stage(stage):
+			job.publish("stage", stage=stage)
+			if profiler:
+				profiler.enter(stage)
+
+		def finish_profile():
+			# Before the job finishes: the dashboard stops listening at the final event.
+			if profiler and profiler.finish():
+				job.publish("profile_ready", url=f"/jobs/{job.id}/profile")
+
+		tts_future = None
+
+		def wait_for_narration():
+			# A failed job must not leave its background TTS writing the title's subpart audio: a retry would take the
+			# half-written files as narrated (and cache their durations).
+			if tts_future is not None and not tts_future.done():
+				print("⏳ Wait for the background narration to stop before ending the job")
+				try:
+					tts_future.result()
+				except Exception as tts_error:
+					print(f"❌ Background narration failed too: {tts_error}")
+
+		ARTIFACT_STORE.acquire(formatted_title)
+		try:
+			# ✅ Step 1: Generate the script.
+			if run_script:
+				print("✅ Step 1: Generate the script.")
+				enter_stage("script")
+				from script_generator import ScriptGenerator
+				script_generator = ScriptGenerator(category, title, main_points_amount, formatted_title, mainpoints, get_ai_client())
+				script_path = script_generator.generate_script()
+
+			# ✅ Step 2: Generate narration and subtitles from script.
+			if run_tts:
+				print("✅ Step 2: Generate narration and subtitles from script.")
+				enter_stage("tts")
+				from tts_engine import TTSEngine
+				tts_client = TTSEngine(category, progress_callback=on_progress)
+				if run_images and run_video:
+					# Images and the video timeline only need subpart durations: plan them on predicted ones while TTS runs.
+					subparts_durations = tts_client.predict_subparts_durations(formatted_title, main_points_amount)
+					tts_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"tts-{job.id}")
+					tts_run = run_tts_pipeline(tts_client, formatted_title, main_points_amount, script_path)
+					tts_future = tts_executor.submit(profiler.run, "tts_background", asyncio.run, tts_run) if profiler else tts_executor.submit(asyncio.run, tts_run)
+					tts_executor.shutdown(wait=False)
+				else:
+					subparts_durations, audio_path, subtitles_path = asyncio.run(run_tts_pipeline(tts_client, formatted_title, main_points_amount, script_path))
+					print(f"⌚ subparts_durations: {subparts_durations}")
+					print(f"🎤 audio_path: {audio_path}")
+					print(f"📗 subtitles_path: {subtitles_path}")
+
+			# ✅ Step 3: Pick images for the video.
+			if run_images:
+				print("✅ Step 3: Pick images for the video.")
+				enter_stage("images")
+				mainpoints_list = [point.strip() for point in mainpoints.split(",")]
+				from image_selector import ImageSelector
+				selector = ImageSelector(mainpoints_list, custom_intro_files=custom_intro_paths, usage_ledger=get_usage_ledger())
+				intro_images, main_topic_images, conclusion_images = selector.pick_images(main_points_amount) # returns array of paths
+				from image_selector import save_selection
+				save_selection(formatted_title, intro_images, main_topic_images, conclusion_images)
+
+			# ✅ Step 4: Generate Video with selected images.
+			if run_video:
+				print("✅ Step 4: Generate Video with selected images.")
+				enter_stage("video")
+
+				video_creator_class = VIDEO_CREATORS.get(video_creator_name)
+				video_creator = video_creator_class(
+					narration_audio=audio_path if tts_future is None else None,
+					subtitle_file=subtitles_path if tts_future is None else None,
 					output_file=output_video_path,
 					video_title=title,
 					font_path=FONTS_FOLDER,
@@ -282,61 +416,376 @@ def generate_content():
 					main_topic_images=main_topic_images,
 					conclusion_images=conclusion_images,
 					subparts_durations=subparts_durations,
-					logo_path=f"{LOGO_FOLDER}/folha-canal.png",
+					logo_path=profile.get("style", {}).get("watermark"),
+					progress_callback=on_progress,
+					render_mode=profile["render"]["mode"],
+					max_segment_images=profile["render"]["max_segment_images"],
+					max_single_pass_images=profile["render"]["max_single_pass_images"],
+					subtitle_mode=profile["render"]["subtitles"],
+					render_farm=RENDER_FARM,
+					renditions=profile["render"]["renditions"],
 				)
-			elif category == 'diabetes':
-				video_creator = DiabetesVideoCreator(
-					narration_audio=audio_path,
-					subtitle_file=subtitles_path,
-					output_file=output_video_path,
-					video_title=title,
-					font_path=FONTS_FOLDER,
-					intro_images=intro_images,
-					main_topic_images=main_topic_images,
-					conclusion_images=conclusion_images,
-					subparts_durations=subparts_durations,
+
+				if tts_future is not None:
+					video_creator.prepare_timeline()
+					print("⏳ Wait for narration")
+					subparts_durations, audio_path, subtitles_path = tts_future.result()
+					print(f"⌚ subparts_durations: {subparts_durations}")
+					print(f"🎤 audio_path: {audio_path}")
+					print(f"📗 subtitles_path: {subtitles_path}")
+					video_creator.retime(subparts_durations, audio_path, subtitles_path)
+
+				video_creator.create_video()
+				if run_images:
+					get_usage_ledger().record_video(formatted_title, intro_images + main_topic_images + conclusion_images)
+
+			if run_shorts:
+				print("✅ Step 4.1: Cut vertical Shorts from the video's subparts.")
+				enter_stage("shorts")
+				from shorts_generator import ShortsGenerator
+				ShortsGenerator(category, formatted_title, progress_callback=on_progress).generate()
+
+			if run_upload and not os.path.exists(thumbnail_path):
+				print("✅ Step 4.2: Generate the thumbnail from the video's images.")
+				enter_stage("thumbnail")
+				from thumbnail_engine import generate_thumbnails
+				results = generate_thumbnails([{"title": title, "category": category}], progress_callback=on_progress)
+				if "error" in results[0]:
+					print(f"⚠️ WARNING: Upload will proceed without a thumbnail: {results[0]['error']}")
+
+			if run_upload:
+				# ✅ Step 5: Generate video metadata.
+				print("✅ Step 5: Generate video metadata.")
+				enter_stage("metadata")
+				title_and_mainpoints = formatted_title + mainpoints
+				from metadata_creator import MetadataCreator
+				metadata_creator = MetadataCreator(get_ai_client(), category, title_and_mainpoints, title=title, mainpoints=mainpoints)
+				upload_title = metadata_creator.generate_title()
+				description = metadata_creator.generate_description()
+				tags = metadata_creator.generate_tags()
+
+			if run_upload and profile["policy"]["dry_run"]:
+				print(f"🧪 Dry run: '{upload_title}' is not queued for upload.")
+				job.publish("upload_skipped", reason="dry_run", title=upload_title, description=description, tags=tags)
+			elif run_upload:
+				# ✅ Step 6: Queue video for upload to YouTube.
+				print("✅ Step 6: Queue video for upload to YouTube.")
+				enter_stage("upload")
+				upload_job = UPLOAD_SCHEDULER.enqueue(
+					category=category,
+					video_path=output_video_path,
+					title=upload_title,
+					description=description,
+					tags=tags,
+					thumbnail_path=thumbnail_path if os.path.exists(thumbnail_path) else None,
+					playlist_ids=playlist_ids,
+					publish_at=scheduled_time
 				)
-			else:
-				return jsonify({"error": "Invalid category"}), 400
-
-			video_creator.create_video()
-
-		if run_upload:
-			# ✅ Step 5: Generate video metadata.
-			print("✅ Step 5: Generate video metadata.")
-			title_and_mainpoints = formatted_title + mainpoints
-			metadata_creator = MetadataCreator(ai_client, category, title_and_mainpoints)
-			description = metadata_creator.generate_description()
-			tags = metadata_creator.generate_tags()
-
-			# ✅ Step 6: Upload Video to YouTube.
-			print("✅ Step 6: Upload Video to YouTube.")
-			youtube_uploader = YouTubeUploader(category)
-			video_id = youtube_uploader.upload_video(
-				video_path=output_video_path,
-				title=title,
-				description=description,
-				tags=tags,
-				privacy_status="private",
-				scheduled_time=scheduled_time,
-				thumbnail_path=thumbnail_path,
-				playlist_ids=playlist_ids
-			)
-
-		process_end_time = time.time()
-		process_total_time = process_end_time - process_start_time
-		print(f"📺 Total content generation time: {round(process_total_time, 1)} s")
-		return f"✅ Video successfully created & uploaded for: {formatted_title} (Scheduled: {scheduled_time})"
-	except Exception as e:
-		print("❌ ERROR OCCURRED!")
-		print(traceback.format_exc())  # Log full error traceback
-		return jsonify({"status": "error", "message": str(e)}), 500
 
-	# ✅ Last Step: Clear temp directory
-	finally:
-		if 'temp_intro_dir' in locals() and os.path.exists(temp_intro_dir):
-			shutil.rmtree(temp_intro_dir, ignore_errors=True)
+				def on_upload_event(event_type, **data):
+					job.publish(event_type, **data)
+					if event_type == "upload_done":
+						job.finish("done", f"✅ Video uploaded: {formatted_title} → {data['video_id']} (Scheduled: {upload_job['publish_at']})")
+					elif event_type == "upload_failed":
+						job.finish("error", f"❌ Upload failed for {formatted_title}: {data['error']}")
+
+				# The job stays open until the scheduler reports the upload outcome.
+				UPLOAD_SCHEDULER.add_listener(upload_job["id"], on_upload_event)
+				job.publish("upload_queued", upload_job_id=upload_job["id"], publish_at=upload_job["publish_at"])
+
+			finish_profile()
+			process_end_time = time.time()
+			process_total_time = process_end_time - process_start_time
+			print(f"📺 Total content generation time: {round(process_total_time, 1)} s")
+			if not run_upload or profile["policy"]["dry_run"]:
+				job.finish("done", f"✅ Video successfully created for: {formatted_title}")
+		except Exception as e:
+			print("❌ ERROR OCCURRED!")
+			print(traceback.format_exc())  # Log full error traceback
+			wait_for_narration()
+			finish_profile()
+			job.finish("error", str(e))
+
+		# ✅ Last Step: Clear temp directory
+		finally:
+			wait_for_narration()
+			if temp_dir and os.path.exists(temp_dir):
+				shutil.rmtree(temp_dir, ignore_errors=True)
+			ARTIFACT_STORE.release(formatted_title)
+			ARTIFACT_STORE.collect()
+
+	threading.Thread(target=run_pipeline, name=f"content-{job.id}", daemon=True).start()
+	return jsonify({"job_id": job.id, "events_url": f"/jobs/{job.id}/events"}), 202
+
+
+@app.route('/generate-shorts', methods=['POST'])
+def generate_shorts():
+	"""
+	Cuts vertical Shorts (one per main point) from a video that was already generated, reusing its subpart
+	narration, subtitles and images. Runs as a job like /generate-content.
+	"""
+	title = request.form.get('title')
+	category = request.form.get('category')
+	if not title or not category:
+		return jsonify({"error": "Please provide the video title and category"}), 400
+	try:
+		get_channel_profile(category)
+	except (FileNotFoundError, ValueError) as e:
+		return jsonify({"error": str(e)}), 400
+
+	formatted_title = format_title(title)
+	from shorts_generator import ShortsGenerator
+	generator = ShortsGenerator(category, formatted_title)
+	try:
+		generator.subparts()
+	except FileNotFoundError as e:
+		return jsonify({"error": str(e)}), 404
+
+	job = JOB_REGISTRY.create(f"{title} (Shorts)", category)
+
+	def run_shorts():
+		def on_progress(event_type, **data):
+			job.publish(event_type, **data)
+
+		ARTIFACT_STORE.acquire(formatted_title)
+		try:
+			job.publish("stage", stage="shorts")
+			generator.progress_callback = on_progress
+			paths = generator.generate()
+			job.finish("done", f"✅ {len(paths)} Shorts created for: {formatted_title}")
+		except Exception as e:
+			print("❌ ERROR OCCURRED!")
+			print(traceback.format_exc())
+			job.finish("error", str(e))
+		finally:
+			ARTIFACT_STORE.release(formatted_title)
+
+	threading.Thread(target=run_shorts, name=f"shorts-{job.id}", daemon=True).start()
+	return jsonify({"job_id": job.id, "events_url": f"/jobs/{job.id}/events"}), 202
+
+
+@app.route('/generate-thumbnails', methods=['POST'])
+def generate_thumbnails_route():
+	"""
+	Renders thumbnail variants for a JSON manifest: [{"title", "category", "images" (optional), "text" (optional)}].
+	Runs as a job; a thumbnail_done event is published per title.
+	"""
+	entries = request.get_json(silent=True)
+	if not isinstance(entries, list) or not entries or not all(isinstance(entry, dict) and entry.get("title") and entry.get("category") for entry in entries):
+		return jsonify({"error": "Please provide a JSON list of {title, category} entries"}), 400
+	for entry in entries:
+		try:
+			get_channel_profile(entry["category"])
+		except (FileNotFoundError, ValueError) as e:
+			return jsonify({"error": str(e)}), 400
+
+	job = JOB_REGISTRY.create(f"{len(entries)} thumbnail(s)", entries[0]["category"])
 
+	def run_thumbnails():
+		def on_progress(event_type, **data):
+			job.publish(event_type, **data)
+
+		try:
+			job.publish("stage", stage="thumbnail")
+			from thumbnail_engine import generate_thumbnails
+			results = generate_thumbnails(entries, progress_callback=on_progress)
+			errors = [result for result in results if "error" in result]
+			job.finish("error" if errors else "done", f"✅ {len(results) - len(errors)} thumbnails rendered, {len(errors)} title(s) failed")
+		except Exception as e:
+			print("❌ ERROR OCCURRED!")
+			print(traceback.format_exc())
+			job.finish("error", str(e))
+
+	threading.Thread(target=run_thumbnails, name=f"thumbnails-{job.id}", daemon=True).start()
+	return jsonify({"job_id": job.id, "events_url": f"/jobs/{job.id}/events"}), 202
+
+@app.route('/artifacts', methods=['GET'])
+def artifacts_report():
+	"""Disk used by generated videos and caches, the quota, and how much a collection could free."""
+	return jsonify(ARTIFACT_STORE.report())
+
+@app.route('/artifacts/collect', methods=['POST'])
+def collect_artifacts():
+	"""Removes the least recently used artifacts until usage is under the quota. JSON body: {"dry_run": true} to preview."""
+	data = request.get_json(silent=True) or {}
+	return jsonify(ARTIFACT_STORE.collect(dry_run=bool(data.get("dry_run"))))
+
+@app.route('/healthz', methods=['GET'])
+def healthz():
+	"""Liveness: the process answers requests."""
+	return jsonify({"status": "ok", "pid": os.getpid()})
+
+@app.route('/readyz', methods=['GET'])
+def readyz():
+	"""Readiness: channels load, ffmpeg is installed and output folders are writable with enough free disk."""
+	checks = {}
+	try:
+		checks["channels"] = bool(active_channels())
+	except Exception as e:
+		checks["channels"] = False
+		print(f"⚠️ Readiness: channels failed to load: {e}")
+	checks["ffmpeg"] = shutil.which("ffmpeg") is not None
+	for folder in (SCRIPT_FOLDER, VIDEO_OUTPUT_FOLDER, THUMBNAIL_FOLDER):
+		os.makedirs(folder, exist_ok=True)
+		checks[f"writable:{folder}"] = os.access(folder, os.W_OK)
+	free_gb = shutil.disk_usage(".").free / 1024 ** 3
+	checks["disk"] = free_gb >= READY_MIN_FREE_GB
+	ready = all(checks.values())
+	body = {
+		"status": "ready" if ready else "not ready",
+		"pid": os.getpid(),
+		"checks": checks,
+		"free_gb": round(free_gb, 1),
+		"background_services": _services_lock_file is not None,  # False in every worker but one
+	}
+	return jsonify(body), 200 if ready else 503
+
+@app.route('/jobs/<job_id>/profile', methods=['GET'])
+def job_profile(job_id):
+	"""Flame graph, wall/CPU time and child processes of every stage of a profiled job (?format=json for the summary)."""
+	profile = load_profile(job_id) if JOB_ID_PATTERN.fullmatch(job_id) else None
+	if not profile:
+		return jsonify({"error": "This job wasn't profiled. Tick \"Profile stages\" or set PROFILE_PIPELINE=1."}), 404
+	if request.args.get("format") == "json":
+		return jsonify(profile)
+	stages = [dict(summary, tree=flame_tree(load_stacks(job_id, summary["stage"]))) for summary in profile["stages"]]
+	return render_template("profile.html", profile=profile, stages=stages)
+
+@app.route('/jobs/<job_id>/profile/<stage>.folded', methods=['GET'])
+def job_profile_stacks(job_id, stage):
+	"""Collapsed stacks of a stage, for speedscope or flamegraph.pl."""
+	profile = load_profile(job_id) if JOB_ID_PATTERN.fullmatch(job_id) else None
+	if not profile or stage not in {summary["stage"] for summary in profile["stages"]}:
+		return jsonify({"error": "Profile not found"}), 404
+	return send_file(os.path.abspath(os.path.join(PROFILE_FOLDER, job_id, f"{stage}.folded")), mimetype="text/plain")
+
+@app.route('/jobs', methods=['GET'])
+def list_jobs():
+	return jsonify(JOB_REGISTRY.list())
+
+
+@app.route('/jobs/<job_id>/events', methods=['GET'])
+def job_events(job_id):
+	"""
+	Server-sent events stream of one content job. Replays past events, then follows new ones until the job finishes.
+	Reconnecting clients resume after the Last-Event-ID header the browser sends automatically.
+	"""
+	job = JOB_REGISTRY.get(job_id)
+	if not job:
+		return jsonify({"error": "Job not found"}), 404
+
+	last_event_id = request.headers.get("Last-Event-ID", request.args.get("after", -1))
+	try:
+		last_event_id = int(last_event_id)
+	except ValueError:
+		last_event_id = -1
+
+	def stream():
+		after_id = last_event_id
+		while True:
+			events = job.wait_for_events(after_id, timeout=SSE_KEEP_ALIVE_INTERVAL)
+			if not events:
+				if job.finished:
+					return
+				yield ": keep-alive\n\n"
+				continue
+			for event in events:
+				after_id = event["id"]
+				yield f"id: {event['id']}\nevent: {event['type']}\ndata: {json.dumps(event['data'], ensure_ascii=False)}\n\n"
+
+	return Response(stream(), mimetype="text/event-stream", headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+# 🖧 Render farm (see render_worker.py)
+
+def render_farm_forbidden():
+	"""The render farm hands out files and accepts uploads: beyond localhost it only serves workers with the token."""
+	if not RENDER_FARM_TOKEN:
+		if is_loopback_host(APP_HOST):
+			return None
+		return jsonify({"error": f"Render farm disabled: set RENDER_FARM_TOKEN to use it with APP_HOST={APP_HOST}"}), 403
+	if not hmac.compare_digest(request.headers.get("X-Render-Token", ""), RENDER_FARM_TOKEN):
+		return jsonify({"error": "Invalid render farm token"}), 403
+	return None
+
+@app.route('/render/workers', methods=['POST'])
+def register_render_worker():
+	forbidden = render_farm_forbidden()
+	if forbidden:
+		return forbidden
+	data = request.get_json(silent=True) or {}
+	return jsonify(RENDER_FARM.register_worker(data.get("name") or request.remote_addr, data.get("info"))), 201
+
+@app.route('/render/workers/<worker_id>', methods=['DELETE'])
+def deregister_render_worker(worker_id):
+	forbidden = render_farm_forbidden()
+	if forbidden:
+		return forbidden
+	RENDER_FARM.deregister_worker(worker_id)
+	return "", 204
+
+@app.route('/render/workers/<worker_id>/heartbeat', methods=['POST'])
+def render_worker_heartbeat(worker_id):
+	forbidden = render_farm_forbidden()
+	if forbidden:
+		return forbidden
+	try:
+		RENDER_FARM.heartbeat(worker_id)
+	except KeyError:
+		return jsonify({"error": "Unknown worker, register again"}), 404
+	return "", 204
+
+@app.route('/render/workers/<worker_id>/claim', methods=['POST'])
+def claim_render_task(worker_id):
+	forbidden = render_farm_forbidden()
+	if forbidden:
+		return forbidden
+	try:
+		task = RENDER_FARM.claim(worker_id)
+	except KeyError:
+		return jsonify({"error": "Unknown worker, register again"}), 404
+	if task is None:
+		return "", 204
+	return jsonify(task)
+
+@app.route('/render/assets/<content_hash>', methods=['GET'])
+def render_asset(content_hash):
+	forbidden = render_farm_forbidden()
+	if forbidden:
+		return forbidden
+	path = RENDER_FARM.asset_path(content_hash)
+	if not path or not os.path.exists(path):
+		return jsonify({"error": "Unknown asset"}), 404
+	return send_file(path, mimetype="application/octet-stream")
+
+@app.route('/render/tasks/<task_id>/result', methods=['PUT'])
+def upload_render_result(task_id):
+	forbidden = render_farm_forbidden()
+	if forbidden:
+		return forbidden
+	stats = json.loads(request.headers.get("X-Render-Stats") or "{}")
+	try:
+		accepted = RENDER_FARM.complete(task_id, request.headers.get("X-Worker-Id"), request.stream, stats)
+	except PermissionError as e:
+		return jsonify({"error": str(e)}), 403
+	except ValueError as e:
+		return jsonify({"error": str(e)}), 400
+	return jsonify({"accepted": accepted})
+
+@app.route('/render/tasks/<task_id>/fail', methods=['POST'])
+def fail_render_task(task_id):
+	forbidden = render_farm_forbidden()
+	if forbidden:
+		return forbidden
+	data = request.get_json(silent=True) or {}
+	RENDER_FARM.fail(task_id, data.get("worker_id"), data.get("error", "unknown error"))
+	return "", 204
+
+@app.route('/render/status', methods=['GET'])
+def render_farm_status():
+	forbidden = render_farm_forbidden()
+	if forbidden:
+		return forbidden
+	return jsonify(RENDER_FARM.status())
 
 if __name__ == '__main__':
 	# Ensure important folders exist.
@@ -344,5 +793,17 @@ if __name__ == '__main__':
 	os.makedirs(VIDEO_OUTPUT_FOLDER, exist_ok=True)
 	os.makedirs(THUMBNAIL_FOLDER, exist_ok=True)
 
-	# Run the Flask app locally.
-	app.run(port=5000, debug=True)
+	# The Werkzeug debugger runs any code for whoever reaches it: only on a loopback address.
+	debug = is_loopback_host(APP_HOST)
+	if not debug:
+		print(f"⚠️ Debugger and reloader off: APP_HOST={APP_HOST} is reachable from other machines.")
+		if not RENDER_FARM_TOKEN:
+			print("⚠️ Render farm disabled until RENDER_FARM_TOKEN is set.")
+
+	# Resume queued uploads (with the reloader, only in its child, which is the process serving requests).
+	if not debug or os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+		start_background_services()
+
+	# Run the Flask app locally (APP_HOST=0.0.0.0 lets render workers on other machines reach it).
+	# For production serving see wsgi.py and gunicorn.conf.py.
+	app.run(host=APP_HOST, port=APP_PORT, debug=debug)
@@ -0,0 +1,317 @@
+import json
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+
+from constants import (
+	ARTIFACT_MAX_AGE_DAYS, ARTIFACT_MIN_AGE_HOURS, ARTIFACT_QUOTA_GB, ARTIFACT_TEMP_MAX_AGE_HOURS, BASE_PLATE_FOLDER,
+	JOB_EVENTS_FOLDER, PROFILE_FOLDER, PROFILE_MAX_AGE_DAYS, SCRIPT_EXTENSION, SCRIPT_FOLDER, SHORTS_FOLDER, SHORTS_FRAME_FOLDER, SUBTITLE_CACHE_FOLDER, TEMP_FOLDER,
+	THUMBNAIL_CACHE_FOLDER, THUMBNAIL_VARIANT_FOLDER, UPLOAD_QUEUE_FILE, VIDEO_OUTPUT_FOLDER
+)
+
+CACHE_FOLDERS = (BASE_PLATE_FOLDER, SUBTITLE_CACHE_FOLDER, SHORTS_FRAME_FOLDER, THUMBNAIL_CACHE_FOLDER)
+LEGACY_SUBPART_SUFFIX = re.compile(r"_intro|_conclusion|_\d+|_durations|_concat_list|_images")
+LEGACY_SCRIPT_FILE = re.compile(r"(_intro|_conclusion|_\d+|_durations|_concat_list|_images)?\.(txt|mp3|wav|srt|json)")
+SHORT_FILE = re.compile(r"(?P<title>.+)_short_\d+\.\w+")
+THUMBNAIL_VARIANT_FILE = re.compile(r"(?P<title>.+)_[a-z]\.jpg")
+GB = 1024 ** 3
+
+
+def video_folder(formatted_title):
+	"""Folder of a video's scripts, narration, subtitles and image selection."""
+	return os.path.join(SCRIPT_FOLDER, formatted_title)
+
+def path_usage(path):
+	""":return: (bytes, newest modification time) of a file, or of a folder and everything under it."""
+	if os.path.isfile(path):
+		stat = os.stat(path)
+		return stat.st_size, stat.st_mtime
+	total, newest = 0, os.path.getmtime(path)
+	for folder, _, files in os.walk(path):
+		for name in files:
+			try:
+				stat = os.stat(os.path.join(folder, name))
+			except FileNotFoundError:
+				continue
+			total += stat.st_size
+			newest = max(newest, stat.st_mtime)
+	return total, newest
+
+def list_files(folder):
+	if not os.path.isdir(folder):
+		return []
+	return [entry for entry in os.scandir(folder) if entry.is_file()]
+
+
+class ArtifactStore:
+	"""
+	Keeps the disk used by generated videos under a quota. A video's artifacts are its folder scripts/<title>/
+	(scripts, narration, subtitles, image selection), its renders in video_output (renditions and Shorts included)
+	and its thumbnail variants; thumbnails/<title>.jpg is kept, it may be hand-made.
+	Collection removes cache files, then whole videos, least recently used first (videos already uploaded before the
+	others), and never touches videos in use by a pipeline of this process, waiting in the upload queue or younger
+	than ARTIFACT_MIN_AGE_HOURS.
+	"""
+
+	def __init__(self, quota_gb=ARTIFACT_QUOTA_GB, min_age_hours=ARTIFACT_MIN_AGE_HOURS, max_age_days=ARTIFACT_MAX_AGE_DAYS, temp_max_age_hours=ARTIFACT_TEMP_MAX_AGE_HOURS, upload_queue_path=UPLOAD_QUEUE_FILE):
+		self.quota_bytes = int(quota_gb * GB)
+		self.min_age = min_age_hours * 60 * 60
+		self.max_age = max_age_days * 24 * 60 * 60 if max_age_days is not None else None
+		self.temp_max_age = temp_max_age_hours * 60 * 60
+		self.upload_queue_path = upload_queue_path
+		self._lock = threading.Lock()
+		self._in_use = {}  # formatted title -> number of running jobs working on it
+
+	def acquire(self, formatted_title):
+		"""Marks a video as in use until release(); also counts as a use for least-recently-used ordering."""
+		with self._lock:
+			self._in_use[formatted_title] = self._in_use.get(formatted_title, 0) + 1
+		if os.path.isdir(video_folder(formatted_title)):
+			os.utime(video_folder(formatted_title))
+
+	def release(self, formatted_title):
+		with self._lock:
+			if self._in_use.get(formatted_title, 0) <= 1:
+				self._in_use.pop(formatted_title, None)
+			else:
+				self._in_use[formatted_title] -= 1
+
+	def temp_dir(self, prefix):
+		"""Temp dir for one request, inside TEMP_FOLDER so leftovers of a crash are found by clean_temp_dirs."""
+		os.makedirs(TEMP_FOLDER, exist_ok=True)
+		return tempfile.mkdtemp(prefix=prefix, dir=TEMP_FOLDER)
+
+	def clean_temp_dirs(self, now=None):
+		"""
+		Removes temp dirs and segment folders of renders that no running request owns anymore, recognized by their age,
+		job event logs as old, and job profiles older than PROFILE_MAX_AGE_DAYS.
+		:return: Bytes reclaimed.
+		"""
+		now = now or time.time()
+		candidates = [entry.path for entry in os.scandir(TEMP_FOLDER) if entry.is_dir()] if os.path.isdir(TEMP_FOLDER) else []
+		candidates += [entry.path for entry in os.scandir(".") if entry.is_dir() and entry.name.startswith("intro_")]  # Created in the working dir before TEMP_FOLDER
+		if os.path.isdir(VIDEO_OUTPUT_FOLDER):
+			candidates += [entry.path for entry in os.scandir(VIDEO_OUTPUT_FOLDER) if entry.is_dir() and entry.name.endswith("_segments")]
+
+		reclaimed = 0
+		for path in candidates:
+			size, last_modified = path_usage(path)
+			if now - last_modified < self.temp_max_age:
+				continue
+			shutil.rmtree(path, ignore_errors=True)
+			reclaimed += size
+			print(f"🧹 Removed orphaned temp dir: {path} ({round(size / 1024 / 1024, 1)} MB)")
+
+		for entry in list_files(JOB_EVENTS_FOLDER):
+			if now - entry.stat().st_mtime >= self.temp_max_age:
+				reclaimed += entry.stat().st_size
+				os.remove(entry.path)
+		profiles = [entry.path for entry in os.scandir(PROFILE_FOLDER) if entry.is_dir()] if os.path.isdir(PROFILE_FOLDER) else []
+		for path in profiles:
+			size, last_modified = path_usage(path)
+			if now - last_modified >= PROFILE_MAX_AGE_DAYS * 24 * 60 * 60:
+				shutil.rmtree(path, ignore_errors=True)
+				reclaimed += size
+		return reclaimed
+
+	def migrate_flat_scripts(self):
+		"""Moves the files of videos generated before per-video folders (scripts/<title>_1.mp3, ...) into scripts/<title>/."""
+		if not os.path.isdir(SCRIPT_FOLDER):
+			return 0
+
+		names = [entry.name for entry in list_files(SCRIPT_FOLDER)]
+		stems = {name[:-len(SCRIPT_EXTENSION)] for name in names if name.endswith(SCRIPT_EXTENSION)}
+		# Every video has its full script <title>.txt; <title>_intro.txt and the like are not titles of their own.
+		titles = {
+			stem for stem in stems
+			if not any(stem != other and stem.startswith(other) and LEGACY_SUBPART_SUFFIX.fullmatch(stem[len(other):]) for other in stems)
+		}
+
+		moved = 0
+		for name in names:
+			owners = [title for title in titles if name.startswith(title) and LEGACY_SCRIPT_FILE.fullmatch(name[len(title):])]
+			if not owners:
+				continue
+			folder = video_folder(max(owners, key=len))
+			os.makedirs(folder, exist_ok=True)
+			os.replace(os.path.join(SCRIPT_FOLDER, name), os.path.join(folder, name))
+			moved += 1
+		if moved:
+			print(f"📦 Moved {moved} script files of {len(titles)} videos into per-video folders.")
+		return moved
+
+	def upload_states(self):
+		""":return: {formatted title: set of upload job statuses} from the upload queue file."""
+		if not os.path.exists(self.upload_queue_path):
+			return {}
+		with open(self.upload_queue_path, "r", encoding="utf-8") as f:
+			jobs = json.load(f)
+		states = {}
+		for job in jobs:
+			title = os.path.splitext(os.path.basename(job["video_path"]))[0]
+			states.setdefault(title, set()).add(job["status"])
+		return states
+
+	def videos(self):
+		"""
+		Groups the artifacts on disk by video.
+		:return: {formatted title: {"title", "paths", "bytes", "last_used"}}
+		"""
+		paths = {}
+		if os.path.isdir(SCRIPT_FOLDER):
+			for entry in os.scandir(SCRIPT_FOLDER):
+				if entry.is_dir():
+					paths.setdefault(entry.name, []).append(entry.path)
+		for folder, pattern in ((SHORTS_FOLDER, SHORT_FILE), (THUMBNAIL_VARIANT_FOLDER, THUMBNAIL_VARIANT_FILE)):
+			for entry in list_files(folder):
+				match = pattern.fullmatch(entry.name)
+				if match:
+					paths.setdefault(match.group("title"), []).append(entry.path)
+
+		# Renders: <title>.mp4 and renditions <title>_<name>.mp4 belong to the longest title they start with.
+		known_titles = sorted(paths, key=len, reverse=True)
+		for entry in list_files(VIDEO_OUTPUT_FOLDER):
+			stem = os.path.splitext(entry.name)[0]
+			title = next((title for title in known_titles if stem == title or stem.startswith(f"{title}_")), stem)
+			paths.setdefault(title, []).append(entry.path)
+
+		videos = {}
+		for title, video_paths in paths.items():
+			usages = [path_usage(path) for path in video_paths]
+			videos[title] = {
+				"title": title,
+				"paths": video_paths,
+				"bytes": sum(size for size, _ in usages),
+				"last_used": max(last_modified for _, last_modified in usages),
+			}
+		return videos
+
+	def cache_files(self):
+		""":return: [{"path", "bytes", "last_used"}] of every cache file, oldest first."""
+		files = []
+		for folder in CACHE_FOLDERS:
+			for entry in list_files(folder):
+				stat = entry.stat()
+				files.append({"path": entry.path, "bytes": stat.st_size, "last_used": stat.st_mtime})
+		return sorted(files, key=lambda cache_file: cache_file["last_used"])
+
+	def report(self, now=None):
+		"""
+		Disk usage and what a collection could free.
+		:return: {"quota_bytes", "used_bytes", "reclaimable_bytes", "cache_bytes", "temp_bytes", "videos": [...]},
+		videos most recently used first with "bytes", "last_used", "uploaded" and "protected" (why it can't be collected).
+		"""
+		now = now or time.time()
+		upload_states = self.upload_states()
+		with self._lock:
+			in_use = set(self._in_use)
+
+		videos = []
+		for video in self.videos().values():
+			states = upload_states.get(video["title"], set())
+			protected = None
+			if video["title"] in in_use:
+				protected = "in_use"
+			elif states & {"queued", "uploading"}:
+				protected = "upload_queued"
+			elif now - video["last_used"] < self.min_age:
+				protected = "recent"
+			videos.append({
+				"title": video["title"],
+				"paths": video["paths"],
+				"bytes": video["bytes"],
+				"last_used": video["last_used"],
+				"uploaded": "done" in states,
+				"protected": protected,
+			})
+		videos.sort(key=lambda video: video["last_used"], reverse=True)
+
+		cache_files = self.cache_files()
+		temp_bytes = sum(path_usage(entry.path)[0] for entry in os.scandir(TEMP_FOLDER)) if os.path.isdir(TEMP_FOLDER) else 0
+		reclaimable = sum(video["bytes"] for video in videos if not video["protected"])
+		reclaimable += sum(cache_file["bytes"] for cache_file in cache_files if now - cache_file["last_used"] >= self.min_age)
+		return {
+			"quota_bytes": self.quota_bytes,
+			"used_bytes": sum(video["bytes"] for video in videos) + sum(cache_file["bytes"] for cache_file in cache_files) + temp_bytes,
+			"reclaimable_bytes": reclaimable,
+			"cache_bytes": sum(cache_file["bytes"] for cache_file in cache_files),
+			"temp_bytes": temp_bytes,
+			"videos": videos,
+		}
+
+	def collect(self, dry_run=False, now=None):
+		"""
+		Removes videos older than ARTIFACT_MAX_AGE_DAYS, then, while usage is over the quota, cache files and videos
+		least recently used first.
+		:param dry_run: Only report what would be removed.
+		:return: {"removed": [titles and cache paths], "reclaimed_bytes", "used_bytes", "quota_bytes", "dry_run"}
+		"""
+		now = now or time.time()
+		report = self.report(now)
+		used = report["used_bytes"]
+		removed = []
+		reclaimed = 0
+
+		def remove(name, paths, size):
+			nonlocal used, reclaimed
+			if not dry_run:
+				for path in paths:
+					if os.path.isdir(path):
+						shutil.rmtree(path, ignore_errors=True)
+					elif os.path.exists(path):
+						os.remove(path)
+			removed.append(name)
+			used -= size
+			reclaimed += size
+
+		# Uploaded videos go first, then the others; each group least recently used first.
+		candidates = sorted((video for video in report["videos"] if not video["protected"]), key=lambda video: (not video["uploaded"], video["last_used"]))
+		if self.max_age is not None:
+			for video in [video for video in candidates if now - video["last_used"] > self.max_age]:
+				remove(video["title"], video["paths"], video["bytes"])
+				candidates.remove(video)
+
+		if used > self.quota_bytes:
+			for cache_file in self.cache_files():
+				if used <= self.quota_bytes:
+					break
+				if now - cache_file["last_used"] >= self.min_age:
+					remove(cache_file["path"], [cache_file["path"]], cache_file["bytes"])
+			for video in candidates:
+				if used <= self.quota_bytes:
+					break
+				remove(video["title"], video["paths"], video["bytes"])
+
+		if used > self.quota_bytes:
+			print(f"⚠️ Artifacts use {round(used / GB, 2)} GB, over the {round(self.quota_bytes / GB, 2)} GB quota, and nothing else can be collected yet.")
+		if removed:
+			print(f"🧹 {'Would collect' if dry_run else 'Collected'} {len(removed)} artifacts, {round(reclaimed / 1024 / 1024, 1)} MB.")
+		return {"removed": removed, "reclaimed_bytes": reclaimed, "used_bytes": used, "quota_bytes": self.quota_bytes, "dry_run": dry_run}
+
+	def startup(self):
+		"""Housekeeping when the app starts: per-video folders for old scripts, orphaned temp dirs, then the quota."""
+		self.migrate_flat_scripts()
+		self.clean_temp_dirs()
+		return self.collect()
+
+
+ARTIFACT_STORE = ArtifactStore()
+
+if __name__ == "__main__":
+	import argparse
+
+	parser = argparse.ArgumentParser(description="Report disk used by generated videos and collect the least recently used ones over the quota.")
+	parser.add_argument("--collect", action="store_true", help="Remove artifacts until usage is under ARTIFACT_QUOTA_GB.")
+	parser.add_argument("--dry-run", action="store_true", help="With --collect, only list what would be removed.")
+	args = parser.parse_args()
+
+	summary = ARTIFACT_STORE.report()
+	print(f"💾 {round(summary['used_bytes'] / GB, 2)} GB used of {round(summary['quota_bytes'] / GB, 2)} GB, {round(summary['reclaimable_bytes'] / GB, 2)} GB reclaimable ({len(summary['videos'])} videos, {round(summary['cache_bytes'] / GB, 2)} GB of caches)")
+	if args.collect:
+		if not args.dry_run:
+			ARTIFACT_STORE.migrate_flat_scripts()
+			ARTIFACT_STORE.clean_temp_dirs()
+		print(json.dumps(ARTIFACT_STORE.collect(dry_run=args.dry_run), indent=4, ensure_ascii=False))
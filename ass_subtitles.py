@@ -0,0 +1,177 @@
+import hashlib
+import importlib.util
+import os
+import re
+
+from constants import SUBTITLE_CACHE_FOLDER
+
+# Same script resolution and default style ffmpeg gives an SRT converted on the fly by the subtitles filter,
+# so a force_style written for that filter (e.g. FontSize=16) renders the same from the pre-built ASS file.
+PLAY_RES_X = 384
+PLAY_RES_Y = 288
+STYLE_FIELDS = [
+	"Name", "Fontname", "Fontsize", "PrimaryColour", "SecondaryColour", "OutlineColour", "BackColour",
+	"Bold", "Italic", "Underline", "StrikeOut", "ScaleX", "ScaleY", "Spacing", "Angle",
+	"BorderStyle", "Outline", "Shadow", "Alignment", "MarginL", "MarginR", "MarginV", "Encoding",
+]
+DEFAULT_STYLE = {
+	"Name": "Default", "Fontname": "Arial", "Fontsize": "16", "PrimaryColour": "&Hffffff", "SecondaryColour": "&Hffffff",
+	"OutlineColour": "&H0", "BackColour": "&H0", "Bold": "0", "Italic": "0", "Underline": "0", "StrikeOut": "0",
+	"ScaleX": "100", "ScaleY": "100", "Spacing": "0", "Angle": "0", "BorderStyle": "1", "Outline": "1", "Shadow": "0",
+	"Alignment": "2", "MarginL": "10", "MarginR": "10", "MarginV": "10", "Encoding": "1",
+}
+SRT_TIME = re.compile(r"(\d+):(\d+):(\d+)[,.](\d+)\s*-->\s*(\d+):(\d+):(\d+)[,.](\d+)")
+SRT_TAGS = {"<i>": r"{\i1}", "</i>": r"{\i0}", "<b>": r"{\b1}", "</b>": r"{\b0}", "<u>": r"{\u1}", "</u>": r"{\u0}"}
+
+
+def parse_srt(srt_path):
+	"""Returns the cues of an SRT file as (start seconds, end seconds, text) tuples."""
+	with open(srt_path, "r", encoding="utf-8-sig") as f:
+		blocks = re.split(r"\n\s*\n", f.read().replace("\r\n", "\n").strip())
+
+	cues = []
+	for block in blocks:
+		lines = block.split("\n")
+		for index, line in enumerate(lines[:2]):
+			match = SRT_TIME.search(line)
+			if match:
+				h1, m1, s1, ms1, h2, m2, s2, ms2 = (int(value) for value in match.groups())
+				start = h1 * 3600 + m1 * 60 + s1 + ms1 / 1000
+				end = h2 * 3600 + m2 * 60 + s2 + ms2 / 1000
+				cues.append((start, end, "\n".join(lines[index + 1:]).strip()))
+				break
+	return cues
+
+def parse_force_style(force_style):
+	"""Turns a subtitles filter force_style ("FontName=Heavitas,FontSize=16,...") into ASS style fields."""
+	fields = {field.lower(): field for field in STYLE_FIELDS}
+	style = {}
+	for option in filter(None, (part.strip() for part in force_style.split(","))):
+		key, _, value = option.partition("=")
+		field = fields.get(key.strip().lower())
+		if field is None:
+			raise ValueError(f"❌ Unknown subtitle style option: {key}")
+		style[field] = value.strip()
+	return style
+
+def _ass_time(seconds):
+	centiseconds = int(round(seconds * 100))
+	return f"{centiseconds // 360000}:{centiseconds // 6000 % 60:02}:{centiseconds // 100 % 60:02}.{centiseconds % 100:02}"
+
+def _ass_text(text):
+	for tag, override in SRT_TAGS.items():
+		text = text.replace(tag, override)
+	text = re.sub(r"<[^>]+>", "", text)  # Other HTML-like tags (e.g. <font>) aren't carried over.
+	return text.replace("\n", r"\N")
+
+
+# 🔤 Fonts
+
+def find_font_file(font_name, fonts_folder):
+	"""Returns the .ttf/.otf in fonts_folder whose family (or file) name is font_name, or None."""
+	if not fonts_folder or not os.path.isdir(fonts_folder):
+		return None
+
+	candidates = sorted(entry.path for entry in os.scandir(fonts_folder) if entry.name.lower().endswith((".ttf", ".otf")))
+	for path in candidates:
+		if os.path.splitext(os.path.basename(path))[0].lower() == font_name.lower():
+			return path
+	try:
+		from fontTools.ttLib import TTFont
+	except ImportError:
+		return None
+	for path in candidates:
+		with TTFont(path, lazy=True) as font:
+			if (font["name"].getBestFamilyName() or "").lower() == font_name.lower():
+				return path
+	return None
+
+def subset_font(font_path, text):
+	"""
+	Returns the font file reduced to the glyphs text needs (plus basic Latin).
+	A subset of a few KB is what gets embedded in the ASS file instead of the whole font.
+	"""
+	import io
+	from fontTools import subset
+
+	options = subset.Options()
+	options.name_IDs = ["*"]  # libass matches the embedded font by its family name.
+	options.notdef_outline = True
+	font = subset.load_font(font_path, options)
+	subsetter = subset.Subsetter(options)
+	subsetter.populate(text="".join(set(text)) + "".join(chr(code) for code in range(0x20, 0x7f)))
+	subsetter.subset(font)
+	buffer = io.BytesIO()
+	subset.save_font(font, buffer, options)
+	return buffer.getvalue()
+
+def encode_font(data):
+	"""ASS [Fonts] encoding: every 3 bytes become 4 characters (6 bits + 33 each), 80 characters per line."""
+	chars = []
+	for i in range(0, len(data), 3):
+		chunk = data[i:i + 3]
+		value = int.from_bytes(chunk.ljust(3, b"\0"), "big")
+		chars.extend(chr(((value >> shift) & 0x3F) + 33) for shift in (18, 12, 6, 0)[:len(chunk) + 1])
+	text = "".join(chars)
+	return [text[i:i + 80] for i in range(0, len(text), 80)]
+
+
+def build_ass_subtitles(srt_path, force_style, fonts_folder=None, embed_fonts=True, play_res=None):
+	"""
+	Converts an SRT file into a styled ASS file once, cached in SUBTITLE_CACHE_FOLDER by SRT content, style and font.
+	The font named by the style is subset to the characters the cues use and embedded, so libass doesn't have to
+	scan a fonts folder at render time.
+	:param force_style: Style in the subtitles filter force_style format, e.g. "FontName=Heavitas,FontSize=16".
+	:param play_res: (Optional) (width, height) the style's sizes and margins refer to. ffmpeg's 384x288 default
+		stretches text on videos of another shape, like vertical ones.
+	:return: (ass path, True when the font is embedded in the file)
+	"""
+	play_res_x, play_res_y = play_res or (PLAY_RES_X, PLAY_RES_Y)
+	style = dict(DEFAULT_STYLE, **parse_force_style(force_style))
+	font_path = find_font_file(style["Fontname"], fonts_folder) if embed_fonts else None
+	if font_path and importlib.util.find_spec("fontTools") is None:
+		print("⚠️ fontTools is not installed: subtitles will load fonts from the fonts folder.")
+		font_path = None
+
+	key = hashlib.sha256(force_style.encode("utf-8"))
+	if play_res:
+		key.update(f"|{play_res_x}x{play_res_y}".encode("utf-8"))
+	for path in filter(None, (srt_path, font_path)):
+		with open(path, "rb") as f:
+			key.update(hashlib.sha256(f.read()).digest())
+	ass_path = os.path.join(SUBTITLE_CACHE_FOLDER, f"{key.hexdigest()[:20]}.ass")
+	if os.path.exists(ass_path):
+		print(f"💬 Reusing pre-built subtitles: {ass_path}")
+		return ass_path, font_path is not None
+
+	print(f"💬 Build ASS subtitles from {srt_path}")
+	cues = parse_srt(srt_path)
+	font_data = subset_font(font_path, "".join(text for _, _, text in cues)) if font_path else None
+
+	lines = [
+		"[Script Info]",
+		"ScriptType: v4.00+",
+		f"PlayResX: {play_res_x}",
+		f"PlayResY: {play_res_y}",
+		"ScaledBorderAndShadow: yes",
+		"WrapStyle: 0",
+		"",
+		"[V4+ Styles]",
+		f"Format: {', '.join(STYLE_FIELDS)}",
+		f"Style: {','.join(style[field] for field in STYLE_FIELDS)}",
+		"",
+	]
+	if font_data:
+		lines += ["[Fonts]", f"fontname: {os.path.splitext(os.path.basename(font_path))[0]}_0.ttf"]
+		lines += encode_font(font_data)
+		lines.append("")
+	lines += ["[Events]", "Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text"]
+	lines += [f"Dialogue: 0,{_ass_time(start)},{_ass_time(end)},Default,,0,0,0,,{_ass_text(text)}" for start, end, text in cues]
+
+	os.makedirs(SUBTITLE_CACHE_FOLDER, exist_ok=True)
+	temp_path = f"{ass_path}.tmp"
+	with open(temp_path, "w", encoding="utf-8") as f:
+		f.write("\n".join(lines) + "\n")
+	os.replace(temp_path, ass_path)
+	print(f"✅ Subtitles saved: {ass_path} ({len(cues)} cues{', font embedded' if font_data else ''})")
+	return ass_path, font_path is not None
@@ -0,0 +1,280 @@
+"""
+Synthetic inputs and local stand-in servers for the benchmark suite: an image library, channel assets,
+narration audio, an OpenAI-compatible chat server and a Kokoro-compatible speech server (also behind an
+edge-tts stand-in), so the pipeline can be timed without network, API keys or real media.
+"""
+import asyncio
+import io
+import json
+import math
+import os
+import random
+import shutil
+import struct
+import threading
+import time
+import types
+import urllib.request
+import wave
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from PIL import Image, ImageDraw
+
+SAMPLE_RATE = 22050
+WORDS = (
+	"planta tierra riego semilla raíz hoja flor fruto abono compost sol sombra maceta huerto cosecha poda "
+	"tomate pepino albahaca lechuga cebolla ajo fresa menta romero orégano agua otoño primavera verano"
+).split()
+TOPICS = (
+	"tomate", "pepino", "albahaca", "lechuga", "cebolla", "ajo", "fresa", "menta", "romero", "orégano",
+	"pimiento", "calabaza", "zanahoria", "rábano", "espinaca", "acelga", "perejil", "cilantro", "chayote", "amaranto",
+)
+
+
+def synthetic_words(count, seed=0):
+	rng = random.Random(seed)
+	return " ".join(rng.choice(WORDS) for _ in range(count))
+
+def topic_names(count):
+	"""Returns count topic folder names: the real-looking ones first, then numbered variants."""
+	return [TOPICS[i % len(TOPICS)] + (f" {i // len(TOPICS)}" if i >= len(TOPICS) else "") for i in range(count)]
+
+
+# 🔊 Audio
+
+def make_wav_bytes(duration, frequency=220.0):
+	"""Mono 16-bit sine tone. ffprobe and the ffmpeg concat demuxer read it whatever the file extension."""
+	frames = int(duration * SAMPLE_RATE)
+	step = 2 * math.pi * frequency / SAMPLE_RATE
+	samples = struct.pack(f"<{frames}h", *(int(8000 * math.sin(step * i)) for i in range(frames)))
+	buffer = io.BytesIO()
+	with wave.open(buffer, "wb") as wav:
+		wav.setnchannels(1)
+		wav.setsampwidth(2)
+		wav.setframerate(SAMPLE_RATE)
+		wav.writeframes(samples)
+	return buffer.getvalue()
+
+def write_narration(path, duration, frequency=220.0):
+	os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+	with open(path, "wb") as f:
+		f.write(make_wav_bytes(duration, frequency))
+	return path
+
+def write_srt(path, text, duration, words_per_cue=10):
+	"""Spreads the words of text evenly over duration, words_per_cue words per cue."""
+	words = text.split()
+	cues = [words[i:i + words_per_cue] for i in range(0, len(words), words_per_cue)]
+	cue_duration = duration / max(len(cues), 1)
+
+	def srt_time(seconds):
+		return f"{int(seconds // 3600):02}:{int(seconds % 3600 // 60):02}:{int(seconds % 60):02},{int(seconds % 1 * 1000):03}"
+
+	with open(path, "w", encoding="utf-8") as f:
+		for index, cue in enumerate(cues):
+			f.write(f"{index + 1}\n{srt_time(index * cue_duration)} --> {srt_time((index + 1) * cue_duration)}\n{' '.join(cue)}\n\n")
+	return path
+
+
+# 🖼️ Images
+
+def _draw_image(path, width, height, rng, mode="RGB"):
+	base = tuple(rng.randrange(40, 220) for _ in range(3))
+	img = Image.new(mode, (width, height), base + ((255,) if mode == "RGBA" else ()))
+	draw = ImageDraw.Draw(img)
+	for _ in range(6):
+		x, y = rng.randrange(width), rng.randrange(height)
+		radius = rng.randrange(min(width, height) // 8, min(width, height) // 2)
+		color = tuple(rng.randrange(256) for _ in range(3)) + ((255,) if mode == "RGBA" else ())
+		draw.ellipse((x - radius, y - radius, x + radius, y + radius), fill=color)
+	img.save(path, quality=85) if path.endswith(".jpg") else img.save(path)
+
+def make_image_library(root, topics=20, images_per_topic=40, width=1280, height=720, seed=0):
+	"""
+	Creates topic folders of synthetic JPEGs in root. An existing library built with the same parameters is reused.
+	:return: List of topic folder names.
+	"""
+	params = {"topics": topics, "images_per_topic": images_per_topic, "width": width, "height": height, "seed": seed}
+	marker_path = os.path.join(root, ".library.json")
+	names = topic_names(topics)
+	if os.path.exists(marker_path):
+		with open(marker_path, "r", encoding="utf-8") as f:
+			if json.load(f) == params:
+				return names
+		shutil.rmtree(root)
+
+	print(f"🖼️ Generating synthetic image library: {topics} topics × {images_per_topic} images ({width}x{height})")
+	rng = random.Random(seed)
+	for name in names:
+		folder = os.path.join(root, name)
+		os.makedirs(folder, exist_ok=True)
+		for index in range(images_per_topic):
+			_draw_image(os.path.join(folder, f"{name.replace(' ', '_')}_{index:04}.jpg"), width, height, rng)
+
+	with open(marker_path, "w", encoding="utf-8") as f:
+		json.dump(params, f)
+	return names
+
+def make_channel_assets(asset_folder, seed=0):
+	"""Creates the background, avatars, CTAs, logo, bell and BGM files the gardening video creator expects."""
+	rng = random.Random(seed)
+	os.makedirs(os.path.join(asset_folder, "logo"), exist_ok=True)
+	os.makedirs(os.path.join(asset_folder, "bgm"), exist_ok=True)
+	images = {
+		"garden_bg.png": (1920, 1080, "RGB"),
+		"gardening_avatar_intro.png": (600, 900, "RGBA"),
+		"gardening_avatar_main_point.png": (600, 900, "RGBA"),
+		"cta-cyc-07-08-2025-1.png": (1200, 200, "RGBA"),
+		"cta-cyc-07-08-2025-2.png": (1200, 200, "RGBA"),
+		"cta-cyc-07-08-2025-3.png": (1200, 200, "RGBA"),
+		"logo/cyc-logo.png": (800, 300, "RGBA"),
+	}
+	for name, (width, height, mode) in images.items():
+		path = os.path.join(asset_folder, name)
+		if not os.path.exists(path):
+			_draw_image(path, width, height, rng, mode)
+
+	for name, duration, frequency in (("bell_ding.mp3", 1, 880.0), ("bgm/gardening_bgm.mp3", 30, 110.0)):
+		path = os.path.join(asset_folder, name)
+		if not os.path.exists(path):
+			write_narration(path, duration, frequency)
+
+
+# 🌐 Stand-in servers
+
+class _StandInServer:
+	"""Threaded local HTTP server. Use as a context manager or call start()/stop()."""
+
+	def __init__(self, latency=0.0):
+		self.latency = latency
+		self.requests = 0
+		self._server = None
+		self._thread = None
+
+	def handle(self, path, payload):
+		"""Returns (status, content type, body bytes)."""
+		raise NotImplementedError
+
+	@property
+	def url(self):
+		host, port = self._server.server_address[:2]
+		return f"http://{host}:{port}"
+
+	def start(self):
+		stand_in = self
+
+		class Handler(BaseHTTPRequestHandler):
+			def do_POST(self):
+				length = int(self.headers.get("Content-Length", 0))
+				payload = json.loads(self.rfile.read(length) or b"{}")
+				stand_in.requests += 1
+				if stand_in.latency:
+					time.sleep(stand_in.latency)
+				status, content_type, body = stand_in.handle(self.path, payload)
+				self.send_response(status)
+				self.send_header("Content-Type", content_type)
+				self.send_header("Content-Length", str(len(body)))
+				self.end_headers()
+				self.wfile.write(body)
+
+			def log_message(self, *args):
+				pass
+
+		self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+		self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+		self._thread.start()
+		return self
+
+	def stop(self):
+		if self._server:
+			self._server.shutdown()
+			self._server.server_close()
+
+	def __enter__(self):
+		return self.start()
+
+	def __exit__(self, *exc):
+		self.stop()
+
+
+class FakeOpenAIServer(_StandInServer):
+	"""OpenAI-compatible /v1/chat/completions answering every prompt with words_per_response synthetic words."""
+
+	def __init__(self, words_per_response=450, latency=0.0):
+		super().__init__(latency)
+		self.words_per_response = words_per_response
+
+	def handle(self, path, payload):
+		if not path.endswith("/chat/completions"):
+			return 404, "application/json", b'{"error": {"message": "not found"}}'
+		content = synthetic_words(self.words_per_response, seed=self.requests)
+		body = {
+			"id": f"chatcmpl-bench-{self.requests}",
+			"object": "chat.completion",
+			"created": int(time.time()),
+			"model": payload.get("model", "gpt-4o"),
+			"choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+			"usage": {"prompt_tokens": 0, "completion_tokens": self.words_per_response, "total_tokens": self.words_per_response},
+		}
+		return 200, "application/json", json.dumps(body).encode("utf-8")
+
+
+class FakeSpeechServer(_StandInServer):
+	"""Kokoro-compatible /v1/audio/speech returning a tone as long as the input takes to read at words_per_second."""
+
+	def __init__(self, words_per_second=2.5, latency=0.0):
+		super().__init__(latency)
+		self.words_per_second = words_per_second
+
+	def duration_for(self, text):
+		return max(len(text.split()) / self.words_per_second, 0.5)
+
+	def handle(self, path, payload):
+		if not path.endswith("/audio/speech"):
+			return 404, "application/json", b'{"error": "not found"}'
+		return 200, "audio/wav", make_wav_bytes(self.duration_for(payload.get("input", "")))
+
+
+class FakeCommunicate:
+	"""
+	edge_tts.Communicate stand-in: fetches the narration from a FakeSpeechServer and streams it like edge-tts does,
+	followed by evenly spaced WordBoundary events (offsets in 100 ns units).
+	"""
+	speech_server = None
+
+	def __init__(self, text, voice, rate="+0%", **kwargs):
+		self.text = text
+		self.voice = voice
+
+	def _fetch(self):
+		request = urllib.request.Request(
+			f"{self.speech_server.url}/v1/audio/speech",
+			data=json.dumps({"input": self.text, "voice": self.voice}).encode("utf-8"),
+			headers={"Content-Type": "application/json"}
+		)
+		with urllib.request.urlopen(request) as response:
+			return response.read()
+
+	async def stream(self):
+		audio = await asyncio.to_thread(self._fetch)
+		for start in range(0, len(audio), 4096):
+			yield {"type": "audio", "data": audio[start:start + 4096]}
+
+		words = self.text.split()
+		word_duration = self.speech_server.duration_for(self.text) / max(len(words), 1)
+		for index, word in enumerate(words):
+			yield {"type": "WordBoundary", "offset": int(index * word_duration * 1e7), "duration": int(word_duration * 1e7), "text": word}
+
+
+def make_fake_edge_tts(speech_server):
+	"""Edge provider class narrating through the fake speech server, to register as the "edge" TTS provider."""
+	from edge_tts import SubMaker
+	from tts_providers import EdgeTTSProvider
+	FakeCommunicate.speech_server = speech_server
+	client = types.SimpleNamespace(Communicate=FakeCommunicate, SubMaker=SubMaker)
+
+	class FakeEdgeTTSProvider(EdgeTTSProvider):
+		def load_client(self):
+			return client
+
+	return FakeEdgeTTSProvider
@@ -0,0 +1,107 @@
+"""
+Import-time budget check for the dashboard and the worker entry points.
+
+Runs `python -X importtime -c "import <module>"` in fresh interpreters and fails when the median cumulative
+import time goes over budget or a heavy dependency is pulled in at startup.
+
+Usage (from the repository root):
+	python benchmarks/import_time.py
+	python benchmarks/import_time.py --runs 7 --module app
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Median cumulative import time allowed per entry point, in milliseconds.
+IMPORT_TIME_BUDGETS = {
+	"app": 400,
+	"upload_scheduler": 60,
+}
+
+# Modules that must only load when a stage needs them.
+LAZY_MODULES = (
+	"aiohttp",
+	"edge_tts",
+	"ffmpeg",
+	"google.cloud",
+	"google_auth_oauthlib",
+	"googleapiclient",
+	"numpy",
+	"openai",
+	"PIL",
+)
+
+
+def measure_import(module):
+	"""
+	Imports module in a fresh interpreter.
+	:return: (cumulative import time in ms, {module imported by it: (depth, cumulative us)})
+	"""
+	env = dict(os.environ)
+	env.setdefault("OPEN_AI_API_KEY", "import-time-benchmark")
+	result = subprocess.run(
+		[sys.executable, "-X", "importtime", "-c", f"import {module}"],
+		cwd=ROOT_DIR, env=env, capture_output=True, text=True
+	)
+	if result.returncode != 0:
+		raise RuntimeError(f"❌ import {module} failed:\n{result.stderr[-2000:]}")
+
+	# Children are printed before their parent, indented by two spaces per level. Interpreter startup imports
+	# (site, encodings...) are top-level entries before the module's own block.
+	entries = []
+	for line in result.stderr.splitlines():
+		if not line.startswith("import time:") or "|" not in line:
+			continue
+		_, cumulative, name = line[len("import time:"):].split("|")
+		if not cumulative.strip().isdigit():
+			continue  # header line
+		depth = (len(name) - len(name.lstrip(" ")) - 1) // 2
+		entries.append((depth, name.strip(), int(cumulative)))
+
+	imported = {}
+	for depth, name, cumulative in reversed(entries):
+		if imported and depth == 0:
+			break
+		if imported or name == module:
+			imported[name] = (depth, cumulative)
+	return imported.get(module, (0, 0))[1] / 1000, imported
+
+
+def check_module(module, budget_ms, runs):
+	timings = []
+	imported = {}
+	for _ in range(runs):
+		elapsed_ms, imported = measure_import(module)
+		timings.append(elapsed_ms)
+
+	median_ms = statistics.median(timings)
+	leaked = [name for name in LAZY_MODULES if name in imported]
+	slowest = sorted(((us, name) for name, (depth, us) in imported.items() if depth == 1), reverse=True)[:5]
+
+	status = "✅" if median_ms <= budget_ms and not leaked else "❌"
+	print(f"{status} import {module}: {median_ms:.1f} ms median of {runs} (budget {budget_ms} ms)")
+	for us, name in slowest:
+		print(f"   {name:<28} {us / 1000:8.1f} ms")
+	if leaked:
+		print(f"   ⚠️ Heavy modules loaded at startup: {', '.join(leaked)}")
+	return status == "✅"
+
+
+def main():
+	parser = argparse.ArgumentParser(description="Check import time budgets of the app entry points.")
+	parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per module (median is compared).")
+	parser.add_argument("--module", action="append", help="Only check these modules (default: all budgets).")
+	args = parser.parse_args()
+
+	modules = args.module or list(IMPORT_TIME_BUDGETS)
+	ok = True
+	for module in modules:
+		ok = check_module(module, IMPORT_TIME_BUDGETS.get(module, IMPORT_TIME_BUDGETS["app"]), args.runs) and ok
+	sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,467 @@
+"""
+End-to-end pipeline benchmarks against local stand-ins (see fixtures.py).
+
+Everything runs inside a scratch workspace (benchmarks/.workspace by default) with a synthetic image library,
+synthetic channel assets, a fake OpenAI server and a fake speech server behind the edge-tts provider.
+Results are written as JSON so runs of different commits can be compared.
+
+Usage (from the repository root):
+	python benchmarks/run_benchmarks.py --output bench_main.json
+	python benchmarks/run_benchmarks.py --compare bench_main.json --output bench_branch.json
+	python benchmarks/run_benchmarks.py --only video_creator --runs 10
+
+Benchmarks that need ffmpeg/ffprobe are reported as skipped when they are not on PATH.
+"""
+import argparse
+import asyncio
+import contextlib
+import datetime
+import glob
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+import fixtures
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+DEFAULT_WORKSPACE = os.path.join(ROOT_DIR, "benchmarks", ".workspace")
+REGRESSION_THRESHOLD = 10  # percent slower than the compared run to count as a regression
+BENCH_TITLE = "benchmark video"
+BENCH_SCRIPT_FOLDER = os.path.join("scripts", BENCH_TITLE)  # artifact_store.video_folder(BENCH_TITLE)
+VIDEO_CREATOR_HELPERS = (
+	"get_narration_duration", "normalize_subparts_duration", "build_canvas", "build_base_plate", "plate_canvas", "mix_audio",
+	"overlay_image_sequence", "overlay_logo", "build_ass_subtitles", "apply_subtitles", "get_image_resolution",
+)
+
+
+class Skip(Exception):
+	pass
+
+
+def require_ffmpeg():
+	if not shutil.which("ffmpeg") or not shutil.which("ffprobe"):
+		raise Skip("ffmpeg/ffprobe not found on PATH")
+
+def git_commit():
+	try:
+		commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR, capture_output=True, text=True).stdout.strip()
+		dirty = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT_DIR, capture_output=True, text=True).stdout.strip())
+		return commit, dirty
+	except OSError:
+		return None, None
+
+
+class BenchmarkRunner:
+	def __init__(self, runs, only=None):
+		self.runs = runs
+		self.only = only or []
+		self.results = {}
+
+	def wants(self, name):
+		return not self.only or any(pattern in name or name in pattern for pattern in self.only)
+
+	def run(self, name, fn, setup=None, runs=None, report=None):
+		"""
+		Times fn over several runs. Output printed by the pipeline is swallowed so it doesn't skew timings.
+		:param setup: (Optional) Called untimed before every run; its return value is passed to fn.
+		:param report: (Optional) Called after the last run; the dict it returns is saved with the timings.
+		"""
+		if not self.wants(name):
+			return
+
+		timings = []
+		try:
+			for _ in range(runs or self.runs):
+				with contextlib.redirect_stdout(io.StringIO()):
+					state = setup() if setup else None
+					start = time.perf_counter()
+					fn(state) if setup else fn()
+					timings.append((time.perf_counter() - start) * 1000)
+		except Skip as e:
+			self.results[name] = {"skipped": str(e)}
+			print(f"⏭️ {name}: skipped ({e})")
+			return
+		except Exception as e:
+			self.results[name] = {"error": f"{type(e).__name__}: {e}"}
+			print(f"❌ {name}: {type(e).__name__}: {e}")
+			return
+
+		self.results[name] = {
+			"median_ms": round(statistics.median(timings), 3),
+			"min_ms": round(min(timings), 3),
+			"max_ms": round(max(timings), 3),
+			"runs": len(timings),
+		}
+		if report:
+			self.results[name]["report"] = report()
+		print(f"⏱️ {name}: {self.results[name]['median_ms']:.2f} ms median of {len(timings)}")
+
+
+def prepare_workspace(args):
+	"""Builds the fixtures and makes the workspace the working directory the pipeline modules resolve paths from."""
+	workspace = os.path.abspath(args.workspace)
+	library = os.path.join(workspace, "library")
+	os.makedirs(workspace, exist_ok=True)
+	topics = fixtures.make_image_library(library, args.topics, args.images_per_topic, args.image_width, args.image_height)
+	fixtures.make_channel_assets(os.path.join(workspace, "assets"))
+
+	for folder in ("channels", "fonts"):
+		shutil.rmtree(os.path.join(workspace, folder), ignore_errors=True)
+		shutil.copytree(os.path.join(ROOT_DIR, folder), os.path.join(workspace, folder))
+	for leftover in ("scripts", "video_output"):
+		shutil.rmtree(os.path.join(workspace, leftover), ignore_errors=True)
+		os.makedirs(os.path.join(workspace, leftover))
+	for leftover in glob.glob(os.path.join(workspace, "*.json*")):
+		os.remove(leftover)
+
+	# Must happen before constants is imported: paths there are module-level and relative to the working directory.
+	os.environ["LOCAL_IMAGE_DB"] = library
+	os.environ.setdefault("OPEN_AI_API_KEY", "benchmark")
+	os.chdir(workspace)
+	sys.path.insert(0, ROOT_DIR)
+	return topics
+
+
+def write_subpart_scripts(main_points_amount, words_per_main_point):
+	os.makedirs(BENCH_SCRIPT_FOLDER, exist_ok=True)
+	subparts = ["_intro"] + [f"_{i}" for i in range(1, main_points_amount + 1)] + ["_conclusion"]
+	texts = []
+	for index, sub in enumerate(subparts):
+		words = words_per_main_point if sub[1:].isdigit() else 60
+		texts.append(fixtures.synthetic_words(words, seed=index))
+		with open(os.path.join(BENCH_SCRIPT_FOLDER, f"{BENCH_TITLE}{sub}.txt"), "w", encoding="utf-8") as f:
+			f.write(texts[-1])
+
+	script_path = os.path.join(BENCH_SCRIPT_FOLDER, f"{BENCH_TITLE}.txt")
+	with open(script_path, "w", encoding="utf-8") as f:
+		f.write("\n\n\n\n".join(texts))
+	return script_path
+
+def clear_outputs(patterns):
+	for pattern in patterns:
+		for path in glob.glob(pattern):
+			os.remove(path)
+
+
+def benchmark_images(runner, topics, args):
+	from generate_image_summary import generate_image_summary
+	from image_selector import ImageSelector
+
+	runner.run("images.generate_image_summary", generate_image_summary)
+	if not os.path.exists("image_summary.json"):
+		generate_image_summary()
+
+	main_points = topics[:args.main_points]
+	runner.run(
+		"images.pick_images",
+		lambda: ImageSelector(main_points, exclude_near_duplicates=False).pick_images(len(main_points))
+	)
+
+def benchmark_script(runner, openai_server, args):
+	from openai import OpenAI
+	from script_generator import ScriptGenerator
+
+	client = OpenAI(api_key="benchmark", base_url=f"{openai_server.url}/v1")
+	main_points = ", ".join(fixtures.topic_names(args.main_points))
+	generator = ScriptGenerator("gardening", BENCH_TITLE, args.main_points, BENCH_TITLE, main_points, client)
+	runner.run(
+		"script.generate_script",
+		lambda _: generator.generate_script(),
+		setup=lambda: clear_outputs([os.path.join(BENCH_SCRIPT_FOLDER, f"{BENCH_TITLE}*.txt")]),
+		runs=min(runner.runs, 3)
+	)
+
+def benchmark_tts(runner, args):
+	from plugin_registry import TTS_PROVIDERS
+	from tts_engine import TTSEngine
+
+	engine = TTSEngine("gardening")
+	audio_patterns = [os.path.join(BENCH_SCRIPT_FOLDER, f"{BENCH_TITLE}{suffix}") for suffix in ("_*.mp3", "_*.srt", ".mp3", ".srt", "_durations.txt", "_concat_list.txt")]
+
+	def setup_subparts():
+		require_ffmpeg()
+		clear_outputs(audio_patterns)
+		write_subpart_scripts(args.main_points, args.words_per_main_point)
+
+	def setup_merge():
+		require_ffmpeg()
+		script_path = write_subpart_scripts(args.main_points, args.words_per_main_point)
+		if not os.path.exists(os.path.join(BENCH_SCRIPT_FOLDER, f"{BENCH_TITLE}_durations.txt")):
+			asyncio.run(engine.get_tts_subparts(BENCH_TITLE, args.main_points))
+		clear_outputs(audio_patterns[2:4])
+		return script_path
+
+	print(f"🎤 TTS provider under test: {TTS_PROVIDERS.get('edge')}")
+	runner.run("tts.get_tts_subparts", lambda _: asyncio.run(engine.get_tts_subparts(BENCH_TITLE, args.main_points)), setup=setup_subparts)
+	runner.run("tts.generate_tts", lambda script_path: asyncio.run(engine.generate_tts(script_path, BENCH_TITLE, args.main_points)), setup=setup_merge)
+
+	actual = []
+	predictions = []
+
+	def setup_predict():
+		durations_path = os.path.join(BENCH_SCRIPT_FOLDER, f"{BENCH_TITLE}_durations.txt")
+		if not actual:
+			setup_merge()
+			with open(durations_path, "r", encoding="utf-8") as f:
+				actual.extend(float(d) for d in f.read().split(","))
+		clear_outputs([durations_path])
+
+	def report_prediction():
+		predicted = sum(predictions[-1])
+		return {"predicted_seconds": round(predicted, 1), "actual_seconds": round(sum(actual), 1), "error_percent": round(abs(predicted - sum(actual)) / sum(actual) * 100, 1)}
+
+	runner.run(
+		"tts.predict_subparts_durations",
+		lambda _: predictions.append(engine.predict_subparts_durations(BENCH_TITLE, args.main_points)),
+		setup=setup_predict,
+		report=report_prediction
+	)
+
+def make_creator(topics, main_points_amount, narration_seconds, output_name, **render_options):
+	"""Builds a GardeningVideoCreator over synthetic narration/subtitles and images picked from the library."""
+	from constants import FONTS_FOLDER, VIDEO_OUTPUT_FOLDER
+	from image_selector import ImageSelector
+	from video_creators.gardening_video_creator import GardeningVideoCreator
+
+	require_ffmpeg()
+	narration = fixtures.write_narration(os.path.join("scripts", f"{output_name}_narration.mp3"), narration_seconds)
+	subtitles = fixtures.write_srt(
+		os.path.join("scripts", f"{output_name}.srt"),
+		fixtures.synthetic_words(int(narration_seconds * 2.5)),
+		narration_seconds
+	)
+	main_points = topics[:main_points_amount]
+	with contextlib.redirect_stdout(io.StringIO()):
+		intro_images, main_topic_images, conclusion_images = ImageSelector(main_points, exclude_near_duplicates=False).pick_images(main_points_amount)
+	subpart_count = main_points_amount + 2
+	return GardeningVideoCreator(
+		video_title=output_name,
+		narration_audio=narration,
+		subtitle_file=subtitles,
+		output_file=os.path.join(VIDEO_OUTPUT_FOLDER, f"{output_name}.mp4"),
+		intro_images=intro_images,
+		main_topic_images=main_topic_images,
+		conclusion_images=conclusion_images,
+		subparts_durations=[narration_seconds / subpart_count] * subpart_count,
+		font_path=FONTS_FOLDER,
+		logo_path="assets/logo/cyc-logo.png",
+		**render_options
+	)
+
+def benchmark_video_creator(runner, topics, args):
+	import ffmpeg
+	from ass_subtitles import build_ass_subtitles
+	from constants import BASE_PLATE_FOLDER, SUBTITLE_CACHE_FOLDER
+
+	if not any(runner.wants(f"video_creator.{name}") for name in VIDEO_CREATOR_HELPERS):
+		return
+	try:
+		with contextlib.redirect_stdout(io.StringIO()):
+			creator = make_creator(topics, args.main_points, args.narration_seconds, "helpers")
+	except Skip as e:
+		for name in VIDEO_CREATOR_HELPERS:
+			runner.run(f"video_creator.{name}", lambda: (_ for _ in ()).throw(e))
+		return
+
+	def compiled(stream):
+		"""Graphs are lazy: compiling to ffmpeg arguments is where ffmpeg-python walks the whole graph."""
+		return ffmpeg.output(stream, os.devnull, format="null").compile()
+
+	canvas = creator.build_canvas()
+	images = creator.main_topic_images[:fixtures_images_per_subpart()]
+	runner.run("video_creator.get_narration_duration", creator.get_narration_duration)
+	runner.run("video_creator.normalize_subparts_duration", creator.normalize_subparts_duration)
+	runner.run("video_creator.build_canvas", lambda: compiled(creator.build_canvas(custom_bg_path="assets/garden_bg.png")))
+	runner.run(
+		"video_creator.build_base_plate",
+		lambda _: creator.build_base_plate("assets/garden_bg.png"),
+		setup=lambda: shutil.rmtree(BASE_PLATE_FOLDER, ignore_errors=True)
+	)
+	runner.run("video_creator.plate_canvas", lambda: compiled(creator.plate_canvas(creator.build_base_plate("assets/garden_bg.png"))))
+	runner.run("video_creator.mix_audio", lambda: compiled(creator.mix_audio()))
+	runner.run("video_creator.overlay_image_sequence", lambda: compiled(creator.overlay_image_sequence(canvas, images, 0, args.narration_seconds, motion="bounce_vertical")[0]))
+	runner.run("video_creator.overlay_logo", lambda: compiled(creator.overlay_logo(canvas)))
+	runner.run(
+		"video_creator.build_ass_subtitles",
+		lambda _: build_ass_subtitles(creator.subtitle_file, creator.get_subtitle_style(), creator.font_path),
+		setup=lambda: shutil.rmtree(SUBTITLE_CACHE_FOLDER, ignore_errors=True)
+	)
+	runner.run("video_creator.apply_subtitles", lambda: compiled(creator.apply_subtitles(canvas)))
+	runner.run("video_creator.get_image_resolution", lambda: [creator.get_image_resolution(path) for path in creator.main_topic_images])
+
+def fixtures_images_per_subpart():
+	from constants import TOPIC_IMAGES_PER_SUBPART
+	return TOPIC_IMAGES_PER_SUBPART
+
+BENCH_RENDITIONS = [
+	{"name": "review", "height": 720, "crf": 28},
+	{"name": "mobile", "height": 480, "video_bitrate": "800k", "audio_bitrate": "96k"},
+]
+
+def benchmark_render(runner, topics, args):
+	"""
+	Full renders in both modes, plus a single pass encoding BENCH_RENDITIONS next to the main output.
+	The render report (passes, open inputs, ffmpeg peak RSS) is saved with the timings.
+	"""
+	variants = {
+		"single_pass": {"render_mode": "single_pass"},
+		"segmented": {"render_mode": "segmented", "max_segment_images": args.segment_images},
+		"renditions": {"render_mode": "single_pass", "renditions": BENCH_RENDITIONS},
+	}
+	for variant, render_options in variants.items():
+		creators = []
+
+		def setup():
+			creator = make_creator(topics, args.main_points, args.render_seconds, f"render_{variant}", **render_options)
+			clear_outputs(creator.output_files())
+			creators.append(creator)
+			return creator
+
+		runner.run(
+			f"render.gardening_create_video.{variant}",
+			lambda creator: creator.create_video(),
+			setup=setup,
+			runs=args.render_runs,
+			report=lambda: creators[-1].render_report
+		)
+
+
+def start_coordinator():
+	"""Serves the app (and so its render farm endpoints) from a background thread."""
+	from werkzeug.serving import make_server
+	from app import app
+	server = make_server("127.0.0.1", 0, app, threaded=True)
+	threading.Thread(target=server.serve_forever, daemon=True).start()
+	return server, f"http://127.0.0.1:{server.server_port}"
+
+def benchmark_render_farm(runner, topics, args):
+	"""Segmented render distributed to render_worker.py processes running against this process as coordinator."""
+	name = "render.gardening_create_video.farm"
+	if not args.farm_workers or not runner.wants(name):
+		return
+	if not shutil.which("ffmpeg") or not shutil.which("ffprobe"):
+		runner.run(name, require_ffmpeg)
+		return
+
+	from render_farm import RENDER_FARM
+	with contextlib.redirect_stdout(io.StringIO()):
+		server, url = start_coordinator()
+	workers = [
+		subprocess.Popen(
+			[sys.executable, os.path.join(ROOT_DIR, "render_worker.py"), "--coordinator", url, "--name", f"bench-{index}", "--cache", os.path.join("cache", f"render_worker_{index}")],
+			stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+		)
+		for index in range(args.farm_workers)
+	]
+	creators = []
+
+	def setup():
+		deadline = time.time() + 60
+		while len(RENDER_FARM.live_workers()) < args.farm_workers:
+			if time.time() > deadline:
+				raise RuntimeError("render workers didn't register within 60s")
+			time.sleep(0.2)
+		creator = make_creator(topics, args.main_points, args.render_seconds, "render_farm", render_mode="segmented", max_segment_images=args.segment_images, render_farm=RENDER_FARM)
+		clear_outputs(creator.output_files())
+		creators.append(creator)
+		return creator
+
+	try:
+		runner.run(name, lambda creator: creator.create_video(), setup=setup, runs=args.render_runs, report=lambda: creators[-1].render_report)
+	finally:
+		for worker in workers:
+			worker.terminate()
+		for worker in workers:
+			worker.wait()
+		server.shutdown()
+
+
+def compare(results, baseline_path, threshold):
+	"""Prints the change of every median against a previous results file. Returns the names that regressed."""
+	with open(baseline_path, "r", encoding="utf-8") as f:
+		baseline = json.load(f)
+
+	print(f"\n📊 Compared with {baseline.get('commit')} ({baseline_path})")
+	regressions = []
+	for name, result in results.items():
+		old = baseline.get("results", {}).get(name, {})
+		if "median_ms" not in result or "median_ms" not in old:
+			continue
+		change = (result["median_ms"] - old["median_ms"]) / old["median_ms"] * 100 if old["median_ms"] else 0
+		marker = "🔴" if change > threshold else ("🟢" if change < -threshold else "⚪")
+		print(f"{marker} {name:<45} {old['median_ms']:10.2f} → {result['median_ms']:10.2f} ms ({change:+.1f}%)")
+		if change > threshold:
+			regressions.append(name)
+	return regressions
+
+
+def main():
+	parser = argparse.ArgumentParser(description="Benchmark the content pipeline against local stand-ins.")
+	parser.add_argument("--output", help="Write results JSON to this file.")
+	parser.add_argument("--compare", help="Previous results JSON to compare medians with.")
+	parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD, help="Percent slower that counts as a regression.")
+	parser.add_argument("--fail-on-regression", action="store_true", help="Exit with status 1 when a benchmark regressed.")
+	parser.add_argument("--only", action="append", help="Run benchmarks whose name contains this text (repeatable).")
+	parser.add_argument("--runs", type=int, default=5)
+	parser.add_argument("--workspace", default=DEFAULT_WORKSPACE)
+	parser.add_argument("--topics", type=int, default=20, help="Topic folders in the synthetic image library.")
+	parser.add_argument("--images-per-topic", type=int, default=40)
+	parser.add_argument("--image-width", type=int, default=1280)
+	parser.add_argument("--image-height", type=int, default=720)
+	parser.add_argument("--main-points", type=int, default=3)
+	parser.add_argument("--words-per-main-point", type=int, default=450)
+	parser.add_argument("--narration-seconds", type=float, default=600)
+	parser.add_argument("--render-seconds", type=float, default=20, help="Narration length of the full render benchmark.")
+	parser.add_argument("--render-runs", type=int, default=1)
+	parser.add_argument("--segment-images", type=int, default=15, help="Images per segment of the segmented render benchmark.")
+	parser.add_argument("--farm-workers", type=int, default=2, help="Local render_worker.py processes for the render farm benchmark (0 to skip it).")
+	parser.add_argument("--openai-latency", type=float, default=0.0, help="Seconds the fake OpenAI server waits per request.")
+	parser.add_argument("--tts-latency", type=float, default=0.0, help="Seconds the fake speech server waits per request.")
+	args = parser.parse_args()
+
+	baseline_path = os.path.abspath(args.compare) if args.compare else None
+	output_path = os.path.abspath(args.output) if args.output else None
+	topics = prepare_workspace(args)
+	runner = BenchmarkRunner(args.runs, args.only)
+
+	from plugin_registry import TTS_PROVIDERS
+
+	with fixtures.FakeOpenAIServer(args.words_per_main_point, args.openai_latency) as openai_server, \
+		fixtures.FakeSpeechServer(latency=args.tts_latency) as speech_server:
+		TTS_PROVIDERS.register("edge", fixtures.make_fake_edge_tts(speech_server))
+		benchmark_images(runner, topics, args)
+		benchmark_script(runner, openai_server, args)
+		benchmark_tts(runner, args)
+		benchmark_video_creator(runner, topics, args)
+		benchmark_render(runner, topics, args)
+		benchmark_render_farm(runner, topics, args)
+
+	commit, dirty = git_commit()
+	report = {
+		"commit": commit,
+		"dirty": dirty,
+		"created_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+		"python": platform.python_version(),
+		"platform": platform.platform(),
+		"ffmpeg": shutil.which("ffmpeg"),
+		"params": {key: value for key, value in vars(args).items() if key not in ("output", "compare", "workspace", "fail_on_regression", "only")},
+		"results": runner.results,
+	}
+	if output_path:
+		with open(output_path, "w", encoding="utf-8") as f:
+			json.dump(report, f, indent=4)
+		print(f"💾 Results saved to {output_path}")
+
+	regressions = compare(runner.results, baseline_path, args.threshold) if baseline_path else []
+	if regressions and args.fail_on_regression:
+		sys.exit(1)
+
+if __name__ == "__main__":
+	main()
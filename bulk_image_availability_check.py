@@ -5,60 +5,60 @@ import sys
 
 from constants import IMAGE_SUMMARY_FILE, LOCAL_IMAGE_DB
 from generate_image_summary import generate_image_summary
-from utils import normalize_text
+from image_alias_index import get_alias_index
 
 # Minimum required images per topic
 MIN_IMAGES = 17
 
 init() #colorama
 
-def load_image_summary():
-	"""Loads the pre-generated image summary JSON."""
-	generate_image_summary()
+def load_alias_index(refresh=False):
+	"""Loads the cached alias index of the image summary, rescanning LOCAL_IMAGE_DB only when asked or missing."""
+	if refresh or not os.path.exists(IMAGE_SUMMARY_FILE):
+		generate_image_summary()
 
 	if not os.path.exists(IMAGE_SUMMARY_FILE):
 		print("❌ ERROR: Image summary file not found! Run generate_image_summary.py first.")
 		sys.exit(1)
 
-	with open(IMAGE_SUMMARY_FILE, "r", encoding="utf-8") as f:
-		return json.load(f)
+	return get_alias_index()
 
-def get_images_for_topic(topic, image_database):
-	"""Retrieves images for a topic using normalized keys, supporting multilingual variants."""
-	topic_key = normalize_text(topic)
-
-	for stored_key, images in image_database.items():
-		# Split folder name like "manzana - apple - maçã" into variants and normalize all
-		normalized_variants = [normalize_text(v) for v in stored_key.split(" - ")]
-
-		if topic_key in normalized_variants:
-			return images
-
-	return []
-
-def check_images_for_topics(topic_list, image_database):
-	"""Checks which topics have fewer images than the minimum."""
-	missing_topics = {}
+def check_images_for_topics(topic_list, alias_index):
+	"""Resolves every topic against the alias index and counts its images."""
+	results = []
 	for topic in topic_list:
-		matching_images = get_images_for_topic(topic, image_database)
-		image_count = len(matching_images)
-		if image_count < MIN_IMAGES:
-			missing_topics[topic] = {
-				"image_count": image_count,
-				"status": "❌ Needs More Images"
-			}
-	return missing_topics
-
-def run_bulk_image_availability_check(raw_input):
-	"""Main function for UI or CLI to run image availability check."""
-	topics = [topic.strip() for line in raw_input.split("\n") for topic in line.split(",") if topic.strip()]
-	image_database = load_image_summary()
-	missing_images = check_images_for_topics(topics, image_database)
+		folder, match = alias_index.resolve(topic)
+		image_count = len(alias_index.image_database.get(folder, [])) if folder else 0
+		results.append({
+			"topic": topic,
+			"folder": folder,
+			"match": match,
+			"image_count": image_count,
+			"status": "✅ OK" if image_count >= MIN_IMAGES else "❌ Needs More Images"
+		})
+	return results
+
+def run_bulk_image_availability_check(raw_input, refresh=False):
+	"""
+	Main function for UI or CLI to run image availability check.
+	:return: Dict with totals and one result per topic.
+	"""
+	topics = list(dict.fromkeys(topic.strip() for line in raw_input.split("\n") for topic in line.split(",") if topic.strip()))
+	alias_index = load_alias_index(refresh)
+	results = check_images_for_topics(topics, alias_index)
+	missing_images = {
+		result["topic"]: {"image_count": result["image_count"], "status": result["status"]}
+		for result in results if result["image_count"] < MIN_IMAGES
+	}
 
 	total_topics = len(topics)
 	missing_count = len(missing_images)
 	missing_percent = (missing_count / total_topics) * 100 if total_topics else 0
 
+	for result in results:
+		if result["match"] == "fuzzy":
+			print(f"🔎 '{result['topic']}' matched folder '{result['folder']}' by near match")
+
 	if missing_images:
 		report_path = "missing_image_topics.json"
 		with open(report_path, "w", encoding="utf-8") as f:
@@ -75,6 +75,16 @@ def run_bulk_image_availability_check(raw_input):
 	else:
 		print("\n✅ All topics have sufficient images!")
 
+	return {
+		"total_topics": total_topics,
+		"sufficient_count": total_topics - missing_count,
+		"missing_count": missing_count,
+		"missing_percent": round(missing_percent, 1),
+		"fuzzy_match_count": sum(1 for result in results if result["match"] == "fuzzy"),
+		"min_images": MIN_IMAGES,
+		"topics": results
+	}
+
 # For CLI usage
 if __name__ == "__main__":
 	if len(sys.argv) < 2:
@@ -84,4 +94,4 @@ if __name__ == "__main__":
 		sys.exit(1)
 
 	raw_input = " ".join(sys.argv[1:])
-	run_bulk_image_availability_check(raw_input)
+	run_bulk_image_availability_check(raw_input, refresh=True)
@@ -0,0 +1,129 @@
+import copy
+import json
+import os
+import threading
+
+from constants import CHANNEL_SCHEMA_FILE, CHANNELS_FOLDER
+
+
+def deep_merge(base, override):
+	"""Returns base updated with override. Nested objects are merged, everything else (lists included) is replaced."""
+	merged = dict(base)
+	for key, value in override.items():
+		if isinstance(value, dict) and isinstance(merged.get(key), dict):
+			merged[key] = deep_merge(merged[key], value)
+		else:
+			merged[key] = value
+	return merged
+
+def apply_schema_defaults(profile, schema):
+	"""Fills missing properties that declare a "default" in the schema, recursing into nested objects."""
+	for key, subschema in schema.get("properties", {}).items():
+		if key not in profile and "default" in subschema:
+			profile[key] = copy.deepcopy(subschema["default"])
+		elif key not in profile and any("default" in prop for prop in subschema.get("properties", {}).values()):
+			profile[key] = {}  # Optional section whose settings all have defaults, e.g. "script" or "policy".
+		if isinstance(profile.get(key), dict) and subschema.get("type") == "object":
+			apply_schema_defaults(profile[key], subschema)
+	return profile
+
+
+class ChannelProfiles:
+	"""
+	Loads channel profiles from channels/*.json. A profile may "extends" another one (by name) and overrides it
+	key by key. Files starting with "_" are base profiles: they are only used through "extends" and never listed.
+	Profiles are merged, filled with schema defaults and validated once, then served from memory until one of the
+	files they were built from (or the schema) changes on disk.
+	Returned profiles are shared: read them, don't modify them.
+	"""
+
+	def __init__(self, folder=CHANNELS_FOLDER, schema_path=CHANNEL_SCHEMA_FILE):
+		self.folder = folder
+		self.schema_path = schema_path
+		self._lock = threading.RLock()
+		self._profiles = {}  # name -> (profile, {source path: mtime})
+		self._schema = None
+		self._schema_mtime = None
+		self._validator = None
+
+	def _get_validator(self):
+		mtime = os.path.getmtime(self.schema_path)
+		if self._validator is None or mtime != self._schema_mtime:
+			from jsonschema import Draft202012Validator  # Only needed when (re)compiling profiles.
+			with open(self.schema_path, "r", encoding="utf-8") as f:
+				self._schema = json.load(f)
+			Draft202012Validator.check_schema(self._schema)
+			self._validator = Draft202012Validator(self._schema)
+			self._schema_mtime = mtime
+			self._profiles.clear()  # Every profile was validated against the old schema.
+		return self._validator
+
+	def path_for(self, name):
+		return os.path.join(self.folder, f"{name}.json")
+
+	def names(self):
+		"""Channel names with a profile, base profiles excluded."""
+		return sorted(
+			entry.name[:-len(".json")] for entry in os.scandir(self.folder)
+			if entry.is_file() and entry.name.endswith(".json") and not entry.name.startswith("_")
+		)
+
+	def _is_fresh(self, sources):
+		try:
+			return all(os.path.getmtime(path) == mtime for path, mtime in sources.items())
+		except OSError:
+			return False
+
+	def _read_chain(self, name, sources, seen=()):
+		if name in seen:
+			raise ValueError(f"❌ Circular 'extends' in channel profiles: {' → '.join(seen + (name,))}")
+
+		path = self.path_for(name)
+		if not os.path.exists(path):
+			raise FileNotFoundError(f"❌ Channel profile not found: {path}")
+
+		sources[path] = os.path.getmtime(path)
+		with open(path, "r", encoding="utf-8") as f:
+			data = json.load(f)
+		data.pop("$schema", None)  # Editor hint, not part of the profile.
+
+		parent = data.pop("extends", None)
+		if parent is None:
+			return data
+		return deep_merge(self._read_chain(parent, sources, seen + (name,)), data)
+
+	def _compile(self, name):
+		validator = self._get_validator()
+		sources = {}
+		profile = self._read_chain(name, sources)
+		profile["name"] = name  # A base profile's name must not leak into its children.
+		apply_schema_defaults(profile, self._schema)
+
+		errors = sorted(validator.iter_errors(profile), key=lambda error: list(error.absolute_path))
+		if errors:
+			details = "; ".join(f"{'/'.join(map(str, error.absolute_path)) or '(root)'}: {error.message}" for error in errors)
+			raise ValueError(f"❌ Invalid channel profile '{name}': {details}")
+
+		print(f"📇 Loaded channel profile: {name}")
+		return profile, sources
+
+	def get(self, name):
+		"""
+		Returns the compiled profile of a channel, recompiling it when any file of its "extends" chain changed.
+		:raises FileNotFoundError: When the channel has no profile.
+		:raises ValueError: When the merged profile fails schema validation.
+		"""
+		with self._lock:
+			self._get_validator()
+			cached = self._profiles.get(name)
+			if cached and self._is_fresh(cached[1]):
+				return cached[0]
+
+			self._profiles[name] = self._compile(name)
+			return self._profiles[name][0]
+
+
+CHANNEL_PROFILES = ChannelProfiles()
+
+def get_channel_profile(name):
+	return CHANNEL_PROFILES.get(name)
@@ -6,27 +6,130 @@ load_dotenv()
 
 # Paths
 ASSET_FOLDER = "assets"
+BASE_PLATE_FOLDER = "cache/base_plates"
 BASE_DIR = os.path.abspath(os.path.dirname(__file__))  # Gets the base directory of the project
 BGM_FOLDER = "assets/bgm"
+CHANNEL_SCHEMA_FILE = "channels/schemas/channel.schema.json"
+CHANNELS_FOLDER = "channels"
 CREDENTIALS_FOLDER = "credentials"
+DURATION_HISTORY_FILE = "duration_history.jsonl"
 FONTS_FOLDER = "fonts"
+IMAGE_HASH_INDEX_FILE = "image_hashes.json"
+IMAGE_METADATA_FILE = "image_metadata.json"
 IMAGE_SUMMARY_FILE = "image_summary.json"
+IMAGE_USAGE_LEDGER_FILE = "image_usage.jsonl"
+JOB_EVENTS_FOLDER = "jobs"  # <job id>.jsonl event log of every content job, read by server workers that did not start it
 LOCAL_IMAGE_DB = os.getenv("LOCAL_IMAGE_DB")
-LOG_FILE = "renamed_images.json"
+LOG_FILE = "renamed_images.json"  # Legacy rename log, migrated into RENAME_JOURNAL_FILE.
 LOGO_FOLDER = "assets/logo"
 
 PLAYLIST_FOLDER = "playlists"
+PROFILE_FOLDER = "profiles"  # <job id>/ with the sampled stacks and stage summary of profiled jobs
+RENAME_JOURNAL_FILE = "renamed_images.jsonl"
 SCRIPT_FOLDER = "scripts"
+SERVICES_LOCK_FILE = "background_services.lock"  # held by the one server process running the upload scheduler and housekeeping
+SHORTS_FOLDER = "video_output/shorts"
+SHORTS_FRAME_FOLDER = "cache/shorts_frames"
+SUBTITLE_CACHE_FOLDER = "cache/subtitles"
+TEMP_FOLDER = "tmp"  # Per-request temp dirs (e.g. uploaded custom intro files), swept at startup when orphaned
+THUMBNAIL_CACHE_FOLDER = "cache/thumbnails"
 THUMBNAIL_FOLDER = "thumbnails"
+THUMBNAIL_FONT_FILE = "fonts/Heavitas.ttf"
+THUMBNAIL_VARIANT_FOLDER = "thumbnails/variants"
+UPLOAD_QUEUE_FILE = "upload_queue.json"
+UPLOAD_QUOTA_FILE = "upload_quota.json"
+UPLOAD_SESSION_FOLDER = "upload_sessions"
 VIDEO_OUTPUT_FOLDER = "video_output"
 
 # Config variables
+APP_HOST = os.getenv("APP_HOST", "127.0.0.1")
+APP_PORT = int(os.getenv("APP_PORT", "5000"))
+WSGI_WORKERS = int(os.getenv("WSGI_WORKERS", "2"))  # server processes in production mode (gunicorn)
+WSGI_THREADS = int(os.getenv("WSGI_THREADS", "16"))  # request threads per process; every open job event stream holds one
+FILE_LOCK_TIMEOUT = 30  # seconds to wait for another thread or process updating a shared JSON file
+READY_MIN_FREE_GB = 5  # /readyz reports not ready below this much free disk
 EDUCATION_YOUTUBE_CATEGORY_ID = "27"
 PEOPLE_BLOGS_YOUTUBE_CATEGORY_ID = "22"
 GOOGLE_OAUTH_PORT = 8765
 TOPIC_IMAGES_PER_SUBPART = 15
 IMAGES_PER_TOPIC = TOPIC_IMAGES_PER_SUBPART + 2  # (Includes 1 intro + 15 topic images + 1 conclusion).
 MAX_PLAYLISTS_PER_REQUEST = 80
+RENAME_WORKERS = 8
+IMAGE_HASH_WORKERS = 8
+IMAGE_METADATA_WORKERS = 16
+NEAR_DUPLICATE_DISTANCE = 6  # Max differing dHash bits (of 64) for two images to count as near-duplicates.
+UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024  # Must be a multiple of 256 KB.
+UPLOAD_MAX_RETRIES = 10
+UPLOAD_MAX_BACKOFF = 64  # seconds
+TOKEN_REFRESH_MARGIN = 300  # seconds before expiry to refresh OAuth tokens
+PLAYLIST_ITEMS_PAGE_SIZE = 50  # API maximum for playlistItems.list
+PLAYLIST_ITEMS_INDEX_TTL = 24 * 60 * 60  # seconds before a playlist's local items are re-checked
+SSE_KEEP_ALIVE_INTERVAL = 15  # seconds between keep-alive comments on idle job event streams
+JOB_STALE_AFTER = 4 * SSE_KEEP_ALIVE_INTERVAL  # seconds without a write to its log before a running job of another process counts as dead
+DEFAULT_WORDS_PER_SECOND = 2.5  # narration speed assumed until the duration model has history
+DURATION_MODEL_MIN_SAMPLES = 6  # subparts of history before a voice gets its own duration model
+
+# Rendering
+RENDER_MODE = "auto"  # "single_pass", "segmented", or "auto": segmented when a video has more image inputs than RENDER_MAX_SINGLE_PASS_IMAGES
+RENDER_MAX_SINGLE_PASS_IMAGES = 60
+RENDER_MAX_SEGMENT_IMAGES = 15  # image/video inputs open at once per segment render
+RENDER_SEGMENT_FPS = 25
+RENDER_SEGMENT_CRF = 12  # near-lossless intermediate segments, re-encoded once by the final pass
+RENDER_FARM_TOKEN = os.getenv("RENDER_FARM_TOKEN")  # Shared secret render workers send in X-Render-Token (optional on localhost, required to use the farm when APP_HOST is not loopback)
+RENDER_HEARTBEAT_INTERVAL = 5  # seconds between render worker heartbeats
+RENDER_WORKER_TIMEOUT = 30  # seconds without a heartbeat before a worker is declared dead and its tasks reassigned
+RENDER_TASK_MAX_ATTEMPTS = 3
+RENDER_WORKER_CACHE_FOLDER = "cache/render_worker"
+SUBTITLE_MODE = "burned"  # "burned" into the picture, "soft" (muxed as a subtitle track) or "none"
+
+# Shorts
+SHORTS_WIDTH = 1080
+SHORTS_HEIGHT = 1920
+SHORTS_MAX_SECONDS = 59  # YouTube Shorts must stay under 60 seconds
+SHORTS_WORKERS = 2  # Shorts rendered at the same time (one ffmpeg process each)
+
+# Thumbnails
+THUMBNAIL_WIDTH = 1280
+THUMBNAIL_HEIGHT = 720
+THUMBNAIL_VARIANTS = 3  # A/B variants per title (layout, image and accent differ); variant "a" becomes the upload thumbnail
+THUMBNAIL_TIME_BUDGET = 1.5  # seconds per thumbnail; optional effects are dropped once half of it is spent
+THUMBNAIL_WORKERS = None  # processes rendering a manifest (None = one per CPU)
+
+# Artifact store
+ARTIFACT_QUOTA_GB = float(os.getenv("ARTIFACT_QUOTA_GB", "100"))  # disk for scripts, renders and caches; least recently used videos are collected above it
+ARTIFACT_MIN_AGE_HOURS = 24  # younger artifacts are never collected: they may belong to a pipeline of another process
+ARTIFACT_MAX_AGE_DAYS = None  # videos untouched for longer are collected even under the quota (None = only when over quota)
+ARTIFACT_TEMP_MAX_AGE_HOURS = 12  # temp and segment dirs older than this are leftovers of a crashed request
+
+# Pipeline profiling
+PROFILE_PIPELINE = os.getenv("PROFILE_PIPELINE", "").lower() in ("1", "true")  # profile every content job (or tick "Profile" per job)
+PROFILE_SAMPLE_INTERVAL = 0.01  # seconds between stack samples of the pipeline threads
+PROFILE_MIN_FRACTION = 0.005  # flame graph frames under this share of their stage's samples are merged away
+PROFILE_MAX_AGE_DAYS = 7  # profiles older than this are removed at startup
+
+# Upload scheduler
+YOUTUBE_DAILY_QUOTA = 10000  # units per channel project, reset at midnight Pacific time
+UPLOAD_MAX_CONCURRENT = 2
+UPLOAD_MAX_BANDWIDTH = None  # bytes per second shared by all uploads (None = unlimited)
+UPLOAD_BANDWIDTH_WINDOWS = [
+	# (start_hour, end_hour, bytes per second) in server local time; overrides UPLOAD_MAX_BANDWIDTH inside the window.
+	# e.g. (9, 19, 2 * 1024 * 1024) to leave bandwidth for the office during working hours.
+]
+UPLOAD_MAX_ATTEMPTS = 3
+UPLOAD_MIN_LEAD_TIME = 60 * 60  # seconds between now and the earliest auto-assigned publishAt slot
+UPLOAD_CADENCE = {
+	# Weekdays (0 = Monday) and UTC times when a channel publishes.
+	"gardening": {"weekdays": [0, 1, 2, 3, 4, 5, 6], "times": ["15:00"]},
+}
+
+# YouTube Data API quota units per call (https://developers.google.com/youtube/v3/determine_quota_cost)
+YOUTUBE_QUOTA_COSTS = {
+	"playlistItems.insert": 50,
+	"playlistItems.list": 1,
+	"playlists.list": 1,
+	"thumbnails.set": 50,
+	"videos.insert": 1600,
+}
 
 # Default extensions
 AUDIO_EXTENSION = ".mp3"
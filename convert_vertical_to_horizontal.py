@@ -1,6 +1,10 @@
 import os
 from PIL import Image, ImageFilter
 
+from constants import IMAGE_METADATA_FILE
+from image_metadata_index import get_metadata_index, needs_horizontal_conversion
+from utils import file_lock
+
 
 BLUR_RATE = 20  # 0 to 100%
 CURRENT_FOLDER = os.path.dirname(os.path.abspath(__file__))
@@ -18,6 +22,13 @@ def is_square(img):
 def is_wide_but_small_and_out_of_target_ratio(img):
 	return (img.height < img.width) and (img.width < 1920) and ((img.width / img.height) < TARGET_RATIO)
 
+def blur_fill(img, width, height, blur=BLUR_RATE):
+	"""Centers img on a width x height canvas filled with a blurred copy of itself stretched to the canvas size."""
+	bg = img.resize((width, height), Image.LANCZOS)
+	bg = bg.filter(ImageFilter.GaussianBlur(blur))
+	bg.paste(img, ((width - img.width) // 2, (height - img.height) // 2))
+	return bg
+
 def convert_to_horizontal(img, base_name):
 	width, height = img.size
 	new_width = int(height * TARGET_RATIO)
@@ -25,9 +36,7 @@ def convert_to_horizontal(img, base_name):
 	if new_width <= width:
 		new_width = width + 300  # fallback if width is already wide
 
-	bg = img.resize((new_width, height), Image.LANCZOS)
-	bg = bg.filter(ImageFilter.GaussianBlur(BLUR_RATE))
-	bg.paste(img, ((new_width - width) // 2, 0))
+	bg = blur_fill(img, new_width, height)
 
 	output_path = os.path.join(OUTPUT_FOLDER, base_name)
 	bg.save(output_path)
@@ -36,29 +45,39 @@ def convert_all_in_folder(folder_path):
 	converted = 0
 	skipped = 0
 
-	for filename in os.listdir(folder_path):
-		filepath = os.path.join(folder_path, filename)
-		if os.path.isdir(filepath) or not filename.lower().endswith((".jpg", ".jpeg", ".png", ".webp")):
-			continue
-
-		try:
-			with Image.open(filepath) as img:
-				if is_vertical(img) or is_square(img):
-					width, height = img.size
-					new_width = int(height * TARGET_RATIO)
-					new_width = max(new_width, width + 300)
-
-					bg = img.resize((new_width, height), Image.LANCZOS)
-					bg = bg.filter(ImageFilter.GaussianBlur(20))
-					bg.paste(img, ((new_width - width) // 2, 0))
-
-					bg.save(filepath)
-					converted += 1
-				else:
-					skipped += 1
-		except Exception as e:
-			print(f"❌ Error: {filename} → {e}")
-
+	# ✅ Use the metadata index to skip images that are already horizontal without opening them.
+	# Held for the whole folder: save() rewrites the sidecar, so it must start from the latest saved entries.
+	with file_lock(IMAGE_METADATA_FILE, timeout=None):
+		metadata_index = get_metadata_index()
+		metadata_index.scan([folder_path])
+
+		for filename in os.listdir(folder_path):
+			filepath = os.path.join(folder_path, filename)
+			if os.path.isdir(filepath) or not filename.lower().endswith((".jpg", ".jpeg", ".png", ".webp")):
+				continue
+
+			metadata = metadata_index.get(filepath)
+			if metadata and not needs_horizontal_conversion(metadata):
+				skipped += 1
+				continue
+
+			try:
+				with Image.open(filepath) as img:
+					if is_vertical(img) or is_square(img):
+						width, height = img.size
+						new_width = int(height * TARGET_RATIO)
+						new_width = max(new_width, width + 300)
+
+						bg = blur_fill(img, new_width, height)
+						bg.save(filepath)
+						converted += 1
+					else:
+						skipped += 1
+				metadata_index.update_entry(filepath)
+			except Exception as e:
+				print(f"❌ Error: {filename} → {e}")
+
+		metadata_index.save()
 	return converted, skipped
 
 
@@ -0,0 +1,160 @@
+import glob
+import json
+import os
+import threading
+import time
+
+from constants import DEFAULT_WORDS_PER_SECOND, DURATION_HISTORY_FILE, DURATION_MODEL_MIN_SAMPLES, SCRIPT_EXTENSION, SCRIPT_FOLDER
+from utils import file_lock
+
+DURATIONS_SUFFIX = f"_durations{SCRIPT_EXTENSION}"
+
+
+def count_words(text):
+	return len(text.split())
+
+def subpart_names(main_points_amount):
+	return ["_intro"] + [f"_{i}" for i in range(1, main_points_amount + 1)] + ["_conclusion"]
+
+
+class DurationModel:
+	"""
+	Predicts how long the TTS narration of a subpart lasts from its word count, per voice:
+	seconds = words / words_per_second + pause, fitted by least squares on past subparts.
+	History is an append-only JSONL file written after every TTS run; scripts narrated before it existed are read back
+	from their _durations.txt files and count for every voice.
+	"""
+
+	def __init__(self, history_path=DURATION_HISTORY_FILE, script_folder=SCRIPT_FOLDER):
+		self.history_path = history_path
+		self.script_folder = script_folder
+		self._lock = threading.Lock()
+		self.samples = {}  # voice (None for legacy scripts) -> {title: [(words, seconds), ...]}
+		self._fits = {}
+		self._mtime = None
+		self._legacy = {}
+		self._load_legacy_durations()
+		self.reload()
+
+	def _load_legacy_durations(self):
+		"""Pairs every <title>/<title>_durations.txt in the script folder with the word counts of its subpart scripts."""
+		for durations_path in glob.glob(os.path.join(glob.escape(self.script_folder), "*", f"*{DURATIONS_SUFFIX}")):
+			title = os.path.basename(durations_path)[:-len(DURATIONS_SUFFIX)]
+			try:
+				with open(durations_path, "r", encoding="utf-8") as f:
+					durations = [float(d) for d in f.read().strip().split(",")]
+				word_counts = self.subpart_word_counts(title, len(durations) - 2)
+			except (OSError, ValueError):
+				continue
+			if word_counts:
+				self._legacy[title] = list(zip(word_counts, durations))
+
+	def subpart_word_counts(self, formatted_title, main_points_amount):
+		""":return: Word count of every subpart script, or None when one of them is missing."""
+		counts = []
+		for sub in subpart_names(main_points_amount):
+			path = os.path.join(self.script_folder, formatted_title, formatted_title + sub + SCRIPT_EXTENSION)
+			if not os.path.exists(path):
+				return None
+			with open(path, "r", encoding="utf-8") as f:
+				counts.append(count_words(f.read()))
+		return counts
+
+	def reload(self):
+		"""Re-reads the history if another process appended to it."""
+		try:
+			mtime = os.stat(self.history_path).st_mtime
+		except FileNotFoundError:
+			mtime = None
+		if mtime == self._mtime and self.samples:
+			return
+
+		samples = {}
+		if mtime is not None:
+			with open(self.history_path, "r", encoding="utf-8") as f:
+				for line in f:
+					try:
+						entry = json.loads(line)
+					except json.JSONDecodeError:
+						continue
+					samples.setdefault(entry["voice"], {})[entry["title"]] = [tuple(sample) for sample in entry["subparts"]]
+		recorded = {title for titles in samples.values() for title in titles}
+		samples[None] = {title: pairs for title, pairs in self._legacy.items() if title not in recorded}
+
+		with self._lock:
+			self.samples = samples
+			self._fits = {}
+			self._mtime = mtime
+
+	def record(self, formatted_title, voice, word_counts, durations, timestamp=None):
+		"""Adds the real subpart durations of a finished TTS run to the history."""
+		pairs = [(words, round(seconds, 3)) for words, seconds in zip(word_counts, durations)]
+		entry = {"title": formatted_title, "voice": voice, "ts": timestamp or time.time(), "subparts": pairs}
+		with file_lock(self.history_path):
+			self.reload()  # Appends of other processes first, or the mtime below would hide them.
+			with self._lock:
+				with open(self.history_path, "a", encoding="utf-8") as f:
+					f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+				for titles in self.samples.values():
+					titles.pop(formatted_title, None)
+				self.samples.setdefault(voice, {})[formatted_title] = pairs
+				self._fits = {}
+				self._mtime = os.stat(self.history_path).st_mtime  # Our own append is already applied in memory.
+
+	@staticmethod
+	def fit_samples(samples):
+		"""
+		Least squares fit of seconds = words / words_per_second + pause.
+		Falls back to a plain ratio (no pause) when the word counts are too alike for a slope.
+		:return: {"words_per_second", "pause", "samples"}, or None with fewer than DURATION_MODEL_MIN_SAMPLES usable samples.
+		"""
+		samples = [(words, seconds) for words, seconds in samples if words > 0 and seconds > 0]
+		n = len(samples)
+		if n < DURATION_MODEL_MIN_SAMPLES:
+			return None
+		sum_words = sum(words for words, _ in samples)
+		sum_seconds = sum(seconds for _, seconds in samples)
+		sum_words_squared = sum(words * words for words, _ in samples)
+		sum_products = sum(words * seconds for words, seconds in samples)
+
+		denominator = n * sum_words_squared - sum_words * sum_words
+		slope = (n * sum_products - sum_words * sum_seconds) / denominator if denominator > 0 else 0
+		pause = (sum_seconds - slope * sum_words) / n
+		if slope <= 0 or pause < 0:
+			slope, pause = sum_seconds / sum_words, 0
+		return {"words_per_second": 1 / slope, "pause": pause, "samples": n}
+
+	def fit(self, voice):
+		"""
+		Model of a voice: its own history once it has DURATION_MODEL_MIN_SAMPLES subparts, otherwise the history of
+		every voice. :return: The fit, or None without enough history.
+		"""
+		with self._lock:
+			if voice not in self._fits:
+				own = [pair for pairs in self.samples.get(voice, {}).values() for pair in pairs]
+				every_voice = [pair for titles in self.samples.values() for pairs in titles.values() for pair in pairs]
+				self._fits[voice] = self.fit_samples(own) or self.fit_samples(every_voice)
+			return self._fits[voice]
+
+	def predict(self, voice, word_counts, default_words_per_second=DEFAULT_WORDS_PER_SECOND):
+		""":return: Predicted duration in seconds of every subpart."""
+		fit = self.fit(voice) or {"words_per_second": default_words_per_second, "pause": 0}
+		return [words / fit["words_per_second"] + fit["pause"] for words in word_counts]
+
+	def summary(self):
+		"""Fit of every voice with history, for reporting."""
+		return {str(voice): self.fit(voice) for voice in list(self.samples)}
+
+
+_MODEL = None
+_MODEL_LOCK = threading.Lock()
+
+def get_duration_model():
+	"""Returns the process-wide model, reloading the history if the file changed on disk."""
+	global _MODEL
+	with _MODEL_LOCK:
+		if _MODEL is None:
+			_MODEL = DurationModel()
+		else:
+			_MODEL.reload()
+		return _MODEL
@@ -1,6 +1,6 @@
 import os
-import json
 from constants import IMAGE_SUMMARY_FILE, LOCAL_IMAGE_DB
+from utils import atomic_write_json, file_lock
 
 def generate_image_summary():
 	"""
@@ -21,8 +21,8 @@ def generate_image_summary():
 			if images:
 				image_db[topic_folder.strip()] = images  # 🔁 Store real folder name
 
-	with open(IMAGE_SUMMARY_FILE, "w", encoding="utf-8") as f:
-		json.dump(image_db, f, indent=4, ensure_ascii=False)
+	with file_lock(IMAGE_SUMMARY_FILE):
+		atomic_write_json(IMAGE_SUMMARY_FILE, image_db)
 
 	print(f"✅ Image summary updated! {len(image_db)} topics found.")
 
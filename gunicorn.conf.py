@@ -0,0 +1,25 @@
+# gunicorn -c gunicorn.conf.py wsgi:app
+import os
+
+from constants import APP_HOST, APP_PORT, SCRIPT_FOLDER, THUMBNAIL_FOLDER, VIDEO_OUTPUT_FOLDER, WSGI_THREADS, WSGI_WORKERS
+
+bind = f"{APP_HOST}:{APP_PORT}"
+workers = WSGI_WORKERS
+worker_class = "gthread"  # Job event streams (SSE) hold a thread each for as long as the dashboard watches a job.
+threads = WSGI_THREADS
+timeout = 120  # Only long requests: uploads of rendered segments by render workers. Pipelines run in job threads.
+graceful_timeout = 30
+preload_app = False  # Each worker imports the app itself, so no client, pool or lock is shared through fork.
+accesslog = "-"
+
+
+def on_starting(server):
+	for folder in (SCRIPT_FOLDER, VIDEO_OUTPUT_FOLDER, THUMBNAIL_FOLDER):
+		os.makedirs(folder, exist_ok=True)
+
+
+def post_worker_init(worker):
+	# One worker wins the services lock and runs the upload dispatcher and startup cleanup; when it dies, its
+	# replacement takes the lock over.
+	from app import start_background_services
+	start_background_services()
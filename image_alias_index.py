@@ -0,0 +1,80 @@
+import json
+import os
+import re
+import threading
+
+from constants import IMAGE_SUMMARY_FILE
+from utils import normalize_text
+
+
+def fuzzy_key(text):
+	"""
+	Normalizes accents, punctuation and simple plurals so "Tomates", "tomate" and "Tomaté" share one key.
+	Every word loses a trailing "s" and then a trailing "e" ("ies" becomes "y"), which maps most Spanish,
+	Portuguese and English singular/plural pairs to the same stem.
+	"""
+	words = re.sub(r"[^a-z0-9]+", " ", normalize_text(text)).split()
+	stems = []
+	for word in words:
+		if len(word) > 3:
+			if word.endswith("ies"):
+				word = word[:-3] + "y"
+			else:
+				if word.endswith("s"):
+					word = word[:-1]
+				if word.endswith("e") and len(word) > 3:
+					word = word[:-1]
+		stems.append(word)
+	return " ".join(stems)
+
+
+class ImageAliasIndex:
+	"""
+	Maps every alias of every image folder ("manzana - apple - maçã") to the folder name.
+	Exact lookups use normalized aliases, full folder names first; near matches (plural/punctuation variants) use
+	fuzzy keys, which can be wrong ("Pine" and "Pin" share one), so only reports ask for them.
+	"""
+
+	def __init__(self, image_database):
+		self.image_database = image_database
+		self.exact = {}
+		self.fuzzy = {}
+		for folder in image_database:  # A full folder name wins over another folder's alias
+			self.exact[normalize_text(folder)] = folder
+		for folder in image_database:
+			for alias in [folder] + folder.split(" - "):
+				self.exact.setdefault(normalize_text(alias), folder)
+				self.fuzzy.setdefault(fuzzy_key(alias), folder)
+
+	def resolve(self, topic, fuzzy=True):
+		"""
+		Returns (folder name, "exact" | "fuzzy") for a topic, or (None, None) when no folder matches.
+		:param fuzzy: Whether to fall back to near matches.
+		"""
+		folder = self.exact.get(normalize_text(topic))
+		if folder is not None:
+			return folder, "exact"
+		if not fuzzy:
+			return None, None
+		folder = self.fuzzy.get(fuzzy_key(topic))
+		if folder is not None:
+			return folder, "fuzzy"
+		return None, None
+
+	def images_for_topic(self, topic):
+		folder, _ = self.resolve(topic, fuzzy=False)
+		return self.image_database.get(folder, []) if folder else []
+
+
+_CACHE = {"mtime": None, "index": None}
+_CACHE_LOCK = threading.Lock()
+
+def get_alias_index(summary_path=IMAGE_SUMMARY_FILE):
+	"""Returns the alias index of the image summary, rebuilding it only when the summary file changed."""
+	mtime = os.stat(summary_path).st_mtime
+	with _CACHE_LOCK:
+		if _CACHE["index"] is None or _CACHE["mtime"] != mtime:
+			with open(summary_path, "r", encoding="utf-8") as f:
+				_CACHE["index"] = ImageAliasIndex(json.load(f))
+			_CACHE["mtime"] = mtime
+		return _CACHE["index"]
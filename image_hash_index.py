@@ -0,0 +1,179 @@
+import json
+import numpy as np
+import os
+import sys
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+from constants import IMAGE_HASH_INDEX_FILE, IMAGE_HASH_WORKERS, LOCAL_IMAGE_DB, NEAR_DUPLICATE_DISTANCE
+from PIL import Image
+from utils import atomic_write_json, file_lock
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg")
+HASH_SIZE = 8  # 8x8 difference hash → 64 bits
+BIT_WEIGHTS = 1 << np.arange(HASH_SIZE * HASH_SIZE - 1, -1, -1, dtype=np.uint64)
+
+
+def load_thumbnail(image_path):
+	"""Decodes an image straight to a tiny grayscale thumbnail ((HASH_SIZE + 1) x HASH_SIZE)."""
+	with Image.open(image_path) as img:
+		img.draft("L", (HASH_SIZE * 8, HASH_SIZE * 8))  # JPEG: decode at reduced scale instead of full size.
+		return np.asarray(img.convert("L").resize((HASH_SIZE + 1, HASH_SIZE), Image.BILINEAR), dtype=np.int16)
+
+def dhash_batch(thumbnails):
+	"""Computes difference hashes for a stack of thumbnails shaped (N, HASH_SIZE, HASH_SIZE + 1) in one pass."""
+	bits = thumbnails[:, :, 1:] > thumbnails[:, :, :-1]
+	return (bits.reshape(len(thumbnails), -1).astype(np.uint64) * BIT_WEIGHTS).sum(axis=1, dtype=np.uint64)
+
+def hamming_distance(hash_a, hash_b):
+	return (hash_a ^ hash_b).bit_count()
+
+
+class BKTree:
+	"""Burkhard-Keller tree over 64-bit hashes for Hamming-distance range queries."""
+
+	def __init__(self):
+		self.root = None  # [hash, [items], {distance: child}]
+
+	def add(self, image_hash, item):
+		if self.root is None:
+			self.root = [image_hash, [item], {}]
+			return
+
+		node = self.root
+		while True:
+			distance = hamming_distance(image_hash, node[0])
+			if distance == 0:
+				node[1].append(item)
+				return
+			child = node[2].get(distance)
+			if child is None:
+				node[2][distance] = [image_hash, [item], {}]
+				return
+			node = child
+
+	def query(self, image_hash, max_distance):
+		"""Returns [(distance, item)] for every item within max_distance bits."""
+		results = []
+		stack = [self.root] if self.root else []
+		while stack:
+			node = stack.pop()
+			distance = hamming_distance(image_hash, node[0])
+			if distance <= max_distance:
+				results.extend((distance, item) for item in node[1])
+			for child_distance, child in node[2].items():
+				if distance - max_distance <= child_distance <= distance + max_distance:
+					stack.append(child)
+		return results
+
+
+class ImageHashIndex:
+	"""
+	Perceptual hashes (dHash) of every image in LOCAL_IMAGE_DB, keyed by path relative to the library.
+	update() only hashes files whose size or mtime changed since the last run.
+	"""
+
+	def __init__(self, index_path=IMAGE_HASH_INDEX_FILE, image_db=LOCAL_IMAGE_DB):
+		self.index_path = index_path
+		self.image_db = image_db
+		self.entries = {}  # relative path -> [size, mtime, hash hex]
+		self._tree = None
+		if os.path.exists(index_path):
+			with open(index_path, "r", encoding="utf-8") as f:
+				self.entries = json.load(f)
+
+	def relative_path(self, image_path):
+		return os.path.relpath(image_path, self.image_db).replace("\\", "/")
+
+	def get_hash(self, image_path):
+		entry = self.entries.get(self.relative_path(image_path))
+		return int(entry[2], 16) if entry else None
+
+	def update(self):
+		"""Hashes new or changed images and drops deleted ones. Returns the number of hashed images."""
+		print("🧬 STARTED perceptual hash index update!")
+		start_time = time.time()
+
+		current = {}
+		for topic in os.scandir(self.image_db):
+			if not topic.is_dir():
+				continue
+			for img in os.scandir(topic.path):
+				if img.name.endswith(IMAGE_EXTENSIONS):
+					stat = img.stat()
+					current[f"{topic.name}/{img.name}"] = (stat.st_size, stat.st_mtime)
+
+		to_hash = [
+			rel_path for rel_path, (size, mtime) in current.items()
+			if rel_path not in self.entries or tuple(self.entries[rel_path][:2]) != (size, mtime)
+		]
+		self.entries = {rel_path: entry for rel_path, entry in self.entries.items() if rel_path in current}
+
+		def safe_thumbnail(rel_path):
+			try:
+				return load_thumbnail(os.path.join(self.image_db, rel_path))
+			except Exception as e:
+				print(f"⚠️ Could not hash {rel_path}: {e}")
+				return None
+
+		with ThreadPoolExecutor(max_workers=IMAGE_HASH_WORKERS) as executor:
+			thumbnails = list(executor.map(safe_thumbnail, to_hash))
+
+		hashed = [(rel_path, thumb) for rel_path, thumb in zip(to_hash, thumbnails) if thumb is not None]
+		if hashed:
+			hashes = dhash_batch(np.stack([thumb for _, thumb in hashed]))
+			for (rel_path, _), image_hash in zip(hashed, hashes):
+				size, mtime = current[rel_path]
+				self.entries[rel_path] = [size, mtime, f"{int(image_hash):016x}"]
+
+		atomic_write_json(self.index_path, self.entries, indent=None)
+		self._tree = None
+		print(f"✅ Hashed {len(hashed)} new/changed images ({len(self.entries)} indexed) in {round(time.time() - start_time, 1)} s")
+		return len(hashed)
+
+	def tree(self):
+		if self._tree is None:
+			self._tree = BKTree()
+			for rel_path, entry in self.entries.items():
+				self._tree.add(int(entry[2], 16), rel_path)
+		return self._tree
+
+	def find_near_duplicates(self, image_path, max_distance=NEAR_DUPLICATE_DISTANCE):
+		"""Returns relative paths of library images within max_distance bits of the given image."""
+		image_hash = self.get_hash(image_path)
+		if image_hash is None:
+			return []
+		own_path = self.relative_path(image_path)
+		return [item for _, item in self.tree().query(image_hash, max_distance) if item != own_path]
+
+	def duplicate_groups(self, max_distance=NEAR_DUPLICATE_DISTANCE):
+		"""Groups library images that are near-duplicates of each other."""
+		groups = []
+		seen = set()
+		tree = self.tree()
+		for rel_path, entry in self.entries.items():
+			if rel_path in seen:
+				continue
+			group = sorted(item for _, item in tree.query(int(entry[2], 16), max_distance))
+			seen.update(group)
+			if len(group) > 1:
+				groups.append(group)
+		return groups
+
+
+def update_image_hash_index():
+	"""Updates the hash index and prints near-duplicate groups found in the library."""
+	with file_lock(IMAGE_HASH_INDEX_FILE, timeout=None):  # A second update waits, then finds the index up to date.
+		index = ImageHashIndex()
+		index.update()
+	groups = index.duplicate_groups()
+	print(f"🔁 {len(groups)} groups of near-duplicate images found.")
+	for group in groups:
+		print("   - " + " | ".join(group))
+	return groups
+
+if __name__ == "__main__":
+	if not LOCAL_IMAGE_DB or not os.path.isdir(LOCAL_IMAGE_DB):
+		print("❌ ERROR: LOCAL_IMAGE_DB is not set or does not exist.")
+		sys.exit(1)
+	update_image_hash_index()
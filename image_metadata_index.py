@@ -0,0 +1,208 @@
+import json
+import os
+import sys
+import threading
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+from constants import IMAGE_METADATA_FILE, IMAGE_METADATA_WORKERS, LOCAL_IMAGE_DB
+from PIL import Image
+from utils import atomic_write_json, file_lock
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".webp")
+EXIF_ORIENTATION_TAG = 0x0112
+ROTATED_ORIENTATIONS = (5, 6, 7, 8)  # EXIF orientations that swap width and height when displayed
+TARGET_RATIO = 16 / 9
+
+
+def read_image_header(image_path):
+	"""Reads dimensions, format and EXIF orientation from the file header. Pixel data is never decoded."""
+	stat = os.stat(image_path)
+	with Image.open(image_path) as img:
+		width, height = img.size
+		image_format = img.format
+		try:
+			orientation = int(img.getexif().get(EXIF_ORIENTATION_TAG, 1))
+		except Exception:
+			orientation = 1
+	return {
+		"width": width,
+		"height": height,
+		"format": image_format,
+		"orientation": orientation,
+		"size": stat.st_size,
+		"mtime": stat.st_mtime
+	}
+
+def display_size(entry):
+	"""Width and height as shown on screen, after applying the EXIF orientation."""
+	if entry["orientation"] in ROTATED_ORIENTATIONS:
+		return entry["height"], entry["width"]
+	return entry["width"], entry["height"]
+
+def orientation_of(entry):
+	width, height = display_size(entry)
+	if width == height:
+		return "square"
+	return "vertical" if height > width else "landscape"
+
+def needs_horizontal_conversion(entry):
+	"""Same rule convert_all_in_folder applies: vertical and square images get blur-padded to 16:9."""
+	return entry["height"] >= entry["width"]
+
+
+class ImageMetadataIndex:
+	"""
+	Sidecar index of image headers (width, height, format, EXIF orientation, file size, mtime).
+	Library images are keyed by path relative to LOCAL_IMAGE_DB, others by absolute path. Queries are answered
+	from memory; scan() re-reads only files whose size or mtime changed.
+	Writers hold file_lock(index_path) and reload() first, so they merge into what other processes saved.
+	"""
+
+	def __init__(self, index_path=IMAGE_METADATA_FILE, image_db=LOCAL_IMAGE_DB):
+		self.index_path = index_path
+		self.image_db = os.path.abspath(image_db) if image_db else None
+		self._lock = threading.Lock()
+		self.entries = {}
+		self._mtime = None
+		self.reload()
+
+	def reload(self):
+		"""Re-reads the sidecar file if another process (or index instance) saved it since."""
+		try:
+			mtime = os.stat(self.index_path).st_mtime
+		except FileNotFoundError:
+			return
+		if mtime == self._mtime:
+			return
+		with open(self.index_path, "r", encoding="utf-8") as f:
+			entries = json.load(f)
+		with self._lock:
+			self.entries = entries
+			self._mtime = mtime
+
+	def key_for(self, image_path):
+		path = os.path.abspath(image_path)
+		if self.image_db and path.startswith(self.image_db + os.sep):
+			path = os.path.relpath(path, self.image_db)
+		return path.replace("\\", "/")
+
+	def path_for(self, key):
+		return key if os.path.isabs(key) or not self.image_db else os.path.join(self.image_db, key)
+
+	def get(self, image_path):
+		return self.entries.get(self.key_for(image_path))
+
+	def update_entry(self, image_path):
+		"""Re-reads one file header, e.g. after a converter rewrote the image."""
+		entry = read_image_header(image_path)
+		with self._lock:
+			self.entries[self.key_for(image_path)] = entry
+		return entry
+
+	def scan(self, folders=None):
+		"""
+		Reads headers of new or changed images in parallel and drops entries of deleted files.
+		:param folders: (Optional) Folders to scan. Defaults to every topic folder of LOCAL_IMAGE_DB.
+		:return: Number of headers read.
+		"""
+		print("📐 STARTED image metadata scan!")
+		start_time = time.time()
+		if folders is None:
+			folders = [entry.path for entry in os.scandir(self.image_db) if entry.is_dir()]
+
+		current = {}
+		for folder in folders:
+			for entry in os.scandir(folder):
+				if entry.is_file() and entry.name.lower().endswith(IMAGE_EXTENSIONS):
+					stat = entry.stat()
+					current[self.key_for(entry.path)] = (entry.path, stat.st_size, stat.st_mtime)
+
+		scanned_prefixes = tuple(self.key_for(folder) + "/" for folder in folders)
+		with self._lock:
+			for key in [key for key in self.entries if key.startswith(scanned_prefixes) and key not in current]:
+				del self.entries[key]
+
+		to_read = [
+			path for key, (path, size, mtime) in current.items()
+			if key not in self.entries or (self.entries[key]["size"], self.entries[key]["mtime"]) != (size, mtime)
+		]
+
+		def safe_read(path):
+			try:
+				return path, read_image_header(path)
+			except Exception as e:
+				print(f"⚠️ Could not read header of {path}: {e}")
+				return path, None
+
+		with ThreadPoolExecutor(max_workers=IMAGE_METADATA_WORKERS) as executor:
+			for path, entry in executor.map(safe_read, to_read):
+				if entry:
+					with self._lock:
+						self.entries[self.key_for(path)] = entry
+
+		self.save()
+		print(f"✅ Read {len(to_read)} new/changed image headers ({len(self.entries)} indexed) in {round(time.time() - start_time, 1)} s")
+		return len(to_read)
+
+	def save(self):
+		with self._lock:
+			atomic_write_json(self.index_path, self.entries, indent=None)
+			self._mtime = os.stat(self.index_path).st_mtime  # Our own write is already in memory.
+
+	def query(self, orientation=None, needs_conversion=None, folder=None, min_width=None):
+		"""
+		Filters indexed images without touching the files.
+		:param orientation: "landscape", "vertical" or "square".
+		:param needs_conversion: True/False to match images convert_all_in_folder would (not) convert.
+		:param folder: Topic folder name or absolute folder path.
+		:param min_width: Minimum displayed width in pixels.
+		:return: List of image paths.
+		"""
+		prefix = self.key_for(folder) + "/" if folder else ""
+		results = []
+		for key, entry in self.entries.items():
+			if prefix and not key.startswith(prefix):
+				continue
+			if orientation and orientation_of(entry) != orientation:
+				continue
+			if needs_conversion is not None and needs_horizontal_conversion(entry) != needs_conversion:
+				continue
+			if min_width and display_size(entry)[0] < min_width:
+				continue
+			results.append(self.path_for(key))
+		return results
+
+	def summary(self):
+		counts = {}
+		for entry in self.entries.values():
+			orientation = orientation_of(entry)
+			counts[orientation] = counts.get(orientation, 0) + 1
+		counts["needs_conversion"] = sum(1 for entry in self.entries.values() if needs_horizontal_conversion(entry))
+		return counts
+
+
+_INDEX = None
+_INDEX_LOCK = threading.Lock()
+
+def get_metadata_index():
+	"""Returns the process-wide metadata index, reloading the sidecar file if it changed on disk."""
+	global _INDEX
+	with _INDEX_LOCK:
+		if _INDEX is None:
+			_INDEX = ImageMetadataIndex()
+		else:
+			_INDEX.reload()
+		return _INDEX
+
+def scan_image_metadata():
+	with file_lock(IMAGE_METADATA_FILE, timeout=None):
+		index = get_metadata_index()  # Reloaded under the lock: the scan merges into the latest saved entries
+		index.scan()
+	print(f"📊 Orientation summary: {index.summary()}")
+
+if __name__ == "__main__":
+	if not LOCAL_IMAGE_DB or not os.path.isdir(LOCAL_IMAGE_DB):
+		print("❌ ERROR: LOCAL_IMAGE_DB is not set or does not exist.")
+		sys.exit(1)
+	scan_image_metadata()
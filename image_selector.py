@@ -1,12 +1,32 @@
+import itertools
 import json
 import os
 import random
 import sys
 import unicodedata
 
-from constants import IMAGE_SUMMARY_FILE, IMAGES_PER_TOPIC, LOCAL_IMAGE_DB, TOPIC_IMAGES_PER_SUBPART
+from constants import IMAGE_HASH_INDEX_FILE, IMAGE_SUMMARY_FILE, IMAGES_PER_TOPIC, LOCAL_IMAGE_DB, NEAR_DUPLICATE_DISTANCE, TOPIC_IMAGES_PER_SUBPART
+from artifact_store import video_folder
+from image_alias_index import get_alias_index
+from utils import atomic_write_json
 
 
+def selection_path(formatted_title):
+	return os.path.join(video_folder(formatted_title), f"{formatted_title}_images.json")
+
+def save_selection(formatted_title, intro_images, main_topic_images, conclusion_images):
+	"""Records the images picked for a video next to its scripts, so derived videos (e.g. Shorts) reuse them."""
+	selection = {"intro": intro_images, "main_topic": main_topic_images, "conclusion": conclusion_images}
+	atomic_write_json(selection_path(formatted_title), selection)
+
+def load_selection(formatted_title):
+	""":return: {"intro", "main_topic", "conclusion"} image lists, or None when the video's selection wasn't recorded."""
+	path = selection_path(formatted_title)
+	if not os.path.exists(path):
+		return None
+	with open(path, "r", encoding="utf-8") as f:
+		return json.load(f)
+
 def normalize_text(text):
 	"""Removes accents and converts to lowercase."""
 	text = unicodedata.normalize('NFD', text)
@@ -14,13 +34,18 @@ def normalize_text(text):
 
 
 class ImageSelector:
-	def __init__(self, main_points, exclude_images=None, custom_intro_files=None):
+	def __init__(self, main_points, exclude_images=None, custom_intro_files=None, exclude_near_duplicates=True, usage_ledger=None, orientation=None):
 		self.main_points = main_points
 		self.exclude_images = set(exclude_images or [])
 		self.custom_intro_files = custom_intro_files or []
 		for f in self.custom_intro_files:
 			self.exclude_images.add(f)
 
+		self.hash_index = self._load_hash_index() if exclude_near_duplicates else None
+		self.selected_hashes = None  # BK-tree of hashes already used in this video
+		self.usage_ledger = usage_ledger  # Favors images not used by recent videos when set
+		self.orientation = orientation  # e.g. "landscape" to skip vertical/square images (unscanned images are kept)
+
 		self.image_database = self._load_image_summary()
 		self.missing_topics = []
 		self.intro_images = []
@@ -32,8 +57,64 @@ class ImageSelector:
 			print("❌ ERROR: Image summary file not found! Run generate_image_summary.py first.")
 			sys.exit(1)
 
-		with open(IMAGE_SUMMARY_FILE, "r", encoding="utf-8") as f:
-			return json.load(f)
+		self.alias_index = get_alias_index()
+		return self.alias_index.image_database
+
+	def _load_hash_index(self):
+		if not os.path.exists(IMAGE_HASH_INDEX_FILE):
+			print("⚠️ WARNING: Image hash index not found. Near-duplicate images won't be excluded. Run image_hash_index.py first.")
+			return None
+
+		from image_hash_index import ImageHashIndex
+		return ImageHashIndex()
+
+	def _filter_orientation(self, images):
+		from image_metadata_index import get_metadata_index, orientation_of
+		metadata_index = get_metadata_index()
+		kept = []
+		for img in images:
+			metadata = metadata_index.get(img)
+			if metadata is None or orientation_of(metadata) == self.orientation:
+				kept.append(img)
+		return kept
+
+	def _sample_images(self, candidates, amount):
+		"""
+		Picks images least recently used by other videos first (randomly without a usage ledger), skipping
+		near-duplicates of images already picked for this video.
+		Falls back to near-duplicates only when a topic doesn't have enough distinct images.
+		"""
+		if self.usage_ledger:
+			ordered = self.usage_ledger.least_recently_used(candidates)
+		else:
+			ordered = iter(random.sample(candidates, len(candidates)))
+
+		if not self.hash_index:
+			return list(itertools.islice(ordered, amount))
+
+		from image_hash_index import BKTree
+		if self.selected_hashes is None:
+			self.selected_hashes = BKTree()
+
+		selected = []
+		near_duplicates = []
+		for img in ordered:
+			if len(selected) == amount:
+				break
+			image_hash = self.hash_index.get_hash(img)
+			if image_hash is not None and self.selected_hashes.query(image_hash, NEAR_DUPLICATE_DISTANCE):
+				near_duplicates.append(img)
+				continue
+			if image_hash is not None:
+				self.selected_hashes.add(image_hash, img)
+			selected.append(img)
+
+		if len(selected) < amount:
+			print(f"⚠️ Only {len(selected)} distinct images available, reusing {amount - len(selected)} near-duplicates.")
+			selected.extend(near_duplicates[:amount - len(selected)])
+		else:
+			print(f"   → {len(near_duplicates)} near-duplicate images skipped")
+		return selected
 
 	def pick_images(self, main_points_amount):
 		print("DEBUG: Starting image selection with:")
@@ -48,13 +129,15 @@ class ImageSelector:
 			print(f"🔍 Topic '{topic}' ({topic_key}) has {len(matching_images)} total matches before exclusions")
 
 			filtered_images = [img for img in matching_images if img not in self.exclude_images]
+			if self.orientation:
+				filtered_images = self._filter_orientation(filtered_images)
 			print(f"   → {len(filtered_images)} images after exclusion")
 
 			if len(filtered_images) < IMAGES_PER_TOPIC:
 				self.missing_topics.append(f"{topic} ({len(filtered_images)} found)")
 				continue
 
-			selected_images = random.sample(filtered_images, IMAGES_PER_TOPIC)
+			selected_images = self._sample_images(filtered_images, IMAGES_PER_TOPIC)
 
 			# Add custom intro file or use first image
 			if i < len(self.custom_intro_files):
@@ -106,15 +189,8 @@ class ImageSelector:
 
 
 	def _get_images_for_topic(self, topic_key):
-		normalized_db = {normalize_text(k): (k, v) for k, v in self.image_database.items()}
-
-		if topic_key in normalized_db:
-			original_key, images = normalized_db[topic_key]
-			return [os.path.join(LOCAL_IMAGE_DB, original_key, img) for img in images]
-
-		for stored_key, images in self.image_database.items():
-			stored_variants = [normalize_text(v) for v in stored_key.split(" - ")]
-			if topic_key in stored_variants:
-				return [os.path.join(LOCAL_IMAGE_DB, stored_key, img) for img in images]
-
-		return []
+		# Exact names and aliases only: a near match may be another subject ("Pine" -> "Pin"), which the bulk check reports.
+		folder, _ = self.alias_index.resolve(topic_key, fuzzy=False)
+		if not folder:
+			return []
+		return [os.path.join(LOCAL_IMAGE_DB, folder, img) for img in self.image_database[folder]]
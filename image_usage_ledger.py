@@ -0,0 +1,126 @@
+import heapq
+import json
+import os
+import random
+import threading
+import time
+
+from constants import IMAGE_USAGE_LEDGER_FILE, LOCAL_IMAGE_DB
+from utils import file_lock
+
+LRU_JITTER = 3 * 24 * 60 * 60  # seconds; images used within a few days of each other are treated as equally fresh
+FRESH_WINDOW = 30 * 24 * 60 * 60  # seconds; images used more recently than this count as "recently used"
+
+
+class ImageUsageLedger:
+	"""
+	Append-only JSONL record of which library images went into which rendered video.
+	Keeps the last use time and use count per image in memory, so selection can favor the least recently used.
+	"""
+
+	def __init__(self, ledger_path=IMAGE_USAGE_LEDGER_FILE, image_db=LOCAL_IMAGE_DB):
+		self.ledger_path = ledger_path
+		self.image_db = image_db
+		self._lock = threading.Lock()
+		self.last_used = {}  # relative path -> timestamp
+		self.use_count = {}  # relative path -> number of videos
+		self._mtime = None
+		self.reload()
+
+	def relative_path(self, image_path):
+		return os.path.relpath(image_path, self.image_db).replace("\\", "/")
+
+	def reload(self):
+		"""Re-reads the ledger if another process appended to it."""
+		try:
+			mtime = os.stat(self.ledger_path).st_mtime
+		except FileNotFoundError:
+			return
+		if mtime == self._mtime:
+			return
+
+		last_used = {}
+		use_count = {}
+		with open(self.ledger_path, "r", encoding="utf-8") as f:
+			for line in f:
+				try:
+					entry = json.loads(line)
+				except json.JSONDecodeError:
+					continue
+				for image in entry["images"]:
+					last_used[image] = max(last_used.get(image, 0), entry["ts"])
+					use_count[image] = use_count.get(image, 0) + 1
+
+		with self._lock:
+			self.last_used = last_used
+			self.use_count = use_count
+			self._mtime = mtime
+
+	def record_video(self, video_name, image_paths, timestamp=None):
+		"""Records the library images used by a rendered video. Images outside the library are ignored."""
+		timestamp = timestamp or time.time()
+		images = sorted({
+			self.relative_path(path) for path in image_paths
+			if os.path.abspath(path).startswith(os.path.abspath(self.image_db) + os.sep)
+		})
+		if not images:
+			return
+
+		with file_lock(self.ledger_path):
+			self.reload()  # Appends of other processes first, or the mtime below would hide them.
+			with self._lock:
+				with open(self.ledger_path, "a", encoding="utf-8") as f:
+					f.write(json.dumps({"video": video_name, "ts": timestamp, "images": images}, ensure_ascii=False) + "\n")
+				for image in images:
+					self.last_used[image] = timestamp
+					self.use_count[image] = self.use_count.get(image, 0) + 1
+				self._mtime = os.stat(self.ledger_path).st_mtime  # Our own append is already applied in memory.
+		print(f"📒 Recorded {len(images)} images used by video: {video_name}")
+
+	def least_recently_used(self, image_paths):
+		"""
+		Yields image paths from least to most recently used, with random order among equally fresh images.
+		Builds a heap once (O(n)); every image taken from the generator costs O(log n).
+		"""
+		heap = [
+			(self.last_used.get(self.relative_path(path), 0) + random.uniform(0, LRU_JITTER), path)
+			for path in image_paths
+		]
+		heapq.heapify(heap)
+		while heap:
+			yield heapq.heappop(heap)[1]
+
+	def topic_freshness(self, image_database, now=None):
+		"""
+		Summarizes per topic folder how many images were never used, used recently, and when the topic's
+		freshest image was last used.
+		:param image_database: {topic folder: [image file names]} as stored in the image summary.
+		"""
+		now = now or time.time()
+		report = {}
+		for topic, images in image_database.items():
+			last_uses = [self.last_used.get(f"{topic}/{img}", 0) for img in images]
+			never_used = sum(1 for ts in last_uses if not ts)
+			recently_used = sum(1 for ts in last_uses if ts and now - ts < FRESH_WINDOW)
+			report[topic] = {
+				"total": len(images),
+				"never_used": never_used,
+				"recently_used": recently_used,
+				"fresh_percent": round((len(images) - recently_used) / len(images) * 100, 1) if images else 0,
+				"last_used": max(last_uses) if last_uses else 0,
+			}
+		return report
+
+
+_LEDGER = None
+_LEDGER_LOCK = threading.Lock()
+
+def get_usage_ledger():
+	"""Returns the process-wide ledger, reloading it if the file changed on disk."""
+	global _LEDGER
+	with _LEDGER_LOCK:
+		if _LEDGER is None:
+			_LEDGER = ImageUsageLedger()
+		else:
+			_LEDGER.reload()
+		return _LEDGER
@@ -0,0 +1,248 @@
+import json
+import os
+import re
+import socket
+import threading
+import time
+import uuid
+
+from constants import JOB_EVENTS_FOLDER, JOB_STALE_AFTER, SSE_KEEP_ALIVE_INTERVAL
+
+MAX_FINISHED_JOBS = 50  # finished jobs kept in memory for late subscribers
+LOG_POLL_INTERVAL = 0.5  # seconds between reads of the event log of a job running in another process
+JOB_ID_PATTERN = re.compile(r"[0-9a-f]{12}")
+HEARTBEAT_INTERVAL = SSE_KEEP_ALIVE_INTERVAL  # seconds between touches of the logs of running jobs
+
+
+def process_alive(pid):
+	""":return: Whether a process of this host is running, or None where it can't be checked safely (Windows)."""
+	if os.name == "nt":
+		return None  # os.kill would terminate the process
+	try:
+		os.kill(pid, 0)
+	except ProcessLookupError:
+		return False
+	except PermissionError:
+		return True  # Exists, owned by another user
+	return True
+
+
+class Job:
+	"""
+	A content generation job and the ordered list of progress events it published.
+	Events are also appended to JOB_EVENTS_FOLDER/<id>.jsonl so other server processes can stream them (see StoredJob).
+	The log header records the owner process, and JobRegistry touches the log while the job runs.
+	"""
+
+	def __init__(self, title, category, events_folder=JOB_EVENTS_FOLDER):
+		self.id = uuid.uuid4().hex[:12]
+		self.title = title
+		self.category = category
+		self.created_at = time.time()
+		self.status = "running"
+		self.stage = None
+		self.result = None
+		self.events = []
+		self._condition = threading.Condition()
+		self.log_path = None
+		if events_folder:
+			os.makedirs(events_folder, exist_ok=True)
+			self.log_path = os.path.join(events_folder, f"{self.id}.jsonl")
+			with open(self.log_path, "w", encoding="utf-8") as f:
+				header = {"id": self.id, "title": title, "category": category, "created_at": self.created_at, "pid": os.getpid(), "host": socket.gethostname()}
+				f.write(json.dumps(header, ensure_ascii=False) + "\n")
+
+	@property
+	def finished(self):
+		return self.status in ("done", "error")
+
+	def publish(self, event_type, **data):
+		"""Appends an event and wakes up every subscriber."""
+		with self._condition:
+			if event_type == "stage":
+				self.stage = data.get("stage")
+			event = {"id": len(self.events), "type": event_type, "ts": time.time(), "data": data}
+			self.events.append(event)
+			if self.log_path:
+				with open(self.log_path, "a", encoding="utf-8") as f:
+					f.write(json.dumps(event, ensure_ascii=False) + "\n")
+			self._condition.notify_all()
+		return event
+
+	def finish(self, status, result=None):
+		# Status and final event change together so a subscriber never sees a finished job without its last event.
+		with self._condition:
+			self.result = result
+			self.status = status
+			self.publish(status, result=result)
+
+	def wait_for_events(self, after_id, timeout):
+		"""Returns events newer than after_id, waiting up to timeout seconds for one to arrive."""
+		with self._condition:
+			if len(self.events) <= after_id + 1 and not self.finished:
+				self._condition.wait(timeout)
+			return self.events[after_id + 1:]
+
+	def to_dict(self):
+		return {
+			"id": self.id,
+			"title": self.title,
+			"category": self.category,
+			"status": self.status,
+			"stage": self.stage,
+			"created_at": self.created_at,
+			"result": self.result,
+		}
+
+
+class StoredJob:
+	"""
+	Read-only view of a job started by another server process, followed through its event log.
+	A running job whose owner process is gone, or whose log wasn't written or touched for JOB_STALE_AFTER seconds, is
+	reported as failed with a final "error" event (kept in memory only).
+	"""
+
+	def __init__(self, log_path):
+		self.log_path = log_path
+		self.events = []
+		self.status = "running"
+		self.stage = None
+		self.result = None
+		self._offset = 0
+		self._lock = threading.Lock()
+		with open(log_path, "r", encoding="utf-8") as f:
+			header = json.loads(f.readline())
+		self.id = header["id"]
+		self.title = header["title"]
+		self.category = header["category"]
+		self.created_at = header["created_at"]
+		self.owner_pid = header.get("pid")
+		self.owner_host = header.get("host")
+		self._read_new_events()
+		self._check_owner()
+
+	@property
+	def finished(self):
+		return self.status in ("done", "error")
+
+	def _read_new_events(self):
+		with self._lock:
+			with open(self.log_path, "rb") as f:
+				f.seek(self._offset)
+				data = f.read()
+			complete = data[:data.rfind(b"\n") + 1]  # A line still being written is read next time.
+			lines = complete.decode("utf-8").splitlines()
+			if self._offset == 0:
+				lines = lines[1:]  # Header
+			self._offset += len(complete)
+			for line in lines:
+				event = json.loads(line)
+				self.events.append(event)
+				if event["type"] == "stage":
+					self.stage = event["data"].get("stage")
+				elif event["type"] in ("done", "error"):
+					self.status = event["type"]
+					self.result = event["data"].get("result")
+
+	def _owner_gone(self):
+		""":return: Why the process running the job is considered dead, or None while it seems alive."""
+		if self.owner_pid is not None and self.owner_host == socket.gethostname():
+			if self.owner_pid == os.getpid():
+				return f"the server process (pid {self.owner_pid}) was restarted"  # Jobs of this process are in its registry
+			if process_alive(self.owner_pid) is False:
+				return f"the server process (pid {self.owner_pid}) stopped"
+		try:
+			idle = time.time() - os.stat(self.log_path).st_mtime
+		except FileNotFoundError:
+			return "its event log was removed"
+		if idle > JOB_STALE_AFTER:
+			return f"no sign of life from its server process for {round(idle)} s"
+		return None
+
+	def _check_owner(self):
+		if self.finished:
+			return
+		reason = self._owner_gone()
+		if reason:
+			self._read_new_events()  # The last events written before it died
+			with self._lock:
+				if not self.finished:
+					self.result = f"❌ Job interrupted: {reason}."
+					self.status = "error"
+					self.events.append({"id": len(self.events), "type": "error", "ts": time.time(), "data": {"result": self.result}})
+
+	def wait_for_events(self, after_id, timeout):
+		deadline = time.monotonic() + timeout
+		while True:
+			self._read_new_events()
+			self._check_owner()
+			if len(self.events) > after_id + 1 or self.finished or time.monotonic() >= deadline:
+				return self.events[after_id + 1:]
+			time.sleep(min(LOG_POLL_INTERVAL, max(deadline - time.monotonic(), 0)))
+
+	to_dict = Job.to_dict
+
+
+class JobRegistry:
+	"""Registry of the content jobs of this process; jobs of other server processes are read from their event logs."""
+
+	def __init__(self, events_folder=JOB_EVENTS_FOLDER):
+		self.events_folder = events_folder
+		self._lock = threading.Lock()
+		self._jobs = {}
+		self._heartbeat_pid = None
+
+	def create(self, title, category):
+		job = Job(title, category, self.events_folder)
+		with self._lock:
+			self._jobs[job.id] = job
+			self._prune()
+			if job.log_path and self._heartbeat_pid != os.getpid():
+				self._heartbeat_pid = os.getpid()
+				threading.Thread(target=self._heartbeat, name="job-heartbeat", daemon=True).start()
+		return job
+
+	def _heartbeat(self):
+		"""Touches the logs of running jobs so other processes can tell a long silent stage from a dead process."""
+		while True:
+			time.sleep(HEARTBEAT_INTERVAL)
+			with self._lock:
+				running = [job.log_path for job in self._jobs.values() if not job.finished and job.log_path]
+			for log_path in running:
+				try:
+					os.utime(log_path)
+				except OSError:
+					pass  # Removed meanwhile
+
+	def get(self, job_id):
+		with self._lock:
+			job = self._jobs.get(job_id)
+		if job or not self.events_folder or not JOB_ID_PATTERN.fullmatch(job_id):
+			return job
+		log_path = os.path.join(self.events_folder, f"{job_id}.jsonl")
+		return StoredJob(log_path) if os.path.exists(log_path) else None
+
+	def list(self):
+		with self._lock:
+			jobs = [job.to_dict() for job in self._jobs.values()]
+		if self.events_folder and os.path.isdir(self.events_folder):
+			known = {job["id"] for job in jobs}
+			logs = sorted((entry for entry in os.scandir(self.events_folder) if entry.name.endswith(".jsonl")), key=lambda entry: entry.stat().st_mtime, reverse=True)
+			for entry in logs[:MAX_FINISHED_JOBS]:
+				job_id = entry.name[:-len(".jsonl")]
+				if job_id not in known:
+					try:
+						jobs.append(StoredJob(entry.path).to_dict())
+					except (OSError, ValueError, KeyError):
+						continue  # Removed or being created meanwhile
+		return sorted(jobs, key=lambda job: job["created_at"], reverse=True)
+
+	def _prune(self):
+		finished = sorted((job for job in self._jobs.values() if job.finished), key=lambda job: job.created_at)
+		for job in finished[:max(len(finished) - MAX_FINISHED_JOBS, 0)]:
+			del self._jobs[job.id]
+			if job.log_path and os.path.exists(job.log_path):
+				os.remove(job.log_path)
+
+
+JOB_REGISTRY = JobRegistry()
@@ -1,73 +1,66 @@
-from upload_defaults import (
-	DIABETES_BASE_DESCRIPTION, DIABETES_HASHTAGS, DIABETES_TAGS,
-	GARDENING_BASE_DESCRIPTION, GARDENING_HASHTAGS, GARDENING_TAGS,
-	HEALTH_BASE_DESCRIPTION, HEALTH_HASHTAGS, HEALTH_TAGS,
-)
+from collections import defaultdict
 
-import re
+from channel_profiles import get_channel_profile
 
 class MetadataCreator:
-	def __init__(self, ai_client, category, title_and_mainpoints):
+	def __init__(self, ai_client, category, title_and_mainpoints, title=None, mainpoints=None):
 		"""
-		Initializes metadata creator with video details.
+		Initializes metadata creator with video details. Texts, tags and hashtags come from the channel profile.
 		:param category: Video category (gardening, health, diabetes, etc.).
+		:param title: (Optional) Video title, for the {title} placeholder of the profile templates.
+		:param mainpoints: (Optional) Comma separated main points, for the {chapters} placeholder.
 		"""
 		self.ai_client = ai_client
 		self.category = category
 		self.title_and_mainpoints = title_and_mainpoints
+		self.title = title or title_and_mainpoints
+		self.mainpoints = [point.strip() for point in (mainpoints or "").split(",") if point.strip()]
+		self.profile = get_channel_profile(category)
 
-	def generate_seo_description(self):
+	def _fill_template(self, template, **values):
+		"""Formats a profile template, leaving unknown placeholders empty."""
+		return template.format_map(defaultdict(str, values))
+
+	def generate_seo_description(self, prompt_template):
 		print(f"🔍 Generating SEO description for: {self.title_and_mainpoints}")
 
 		conversation_history = []
-		seo_description_prompt = f"""Write a YouTube video description (under 180 words) that:
-		- Starts with a bold hook in the first line
-		- Includes the exact title and main points: {self.title_and_mainpoints}
-		- Uses SEO keywords related to blood sugar, diabetes-friendly foods, and care after 50
-		- Has 2 short paragraphs, uses emojis tastefully, and ends with a CTA to subscribe
-		"""
+		seo_description_prompt = self._fill_template(prompt_template, title_and_mainpoints=self.title_and_mainpoints, title=self.title)
 
 		conversation_history.append({"role": "user", "content": seo_description_prompt})
 		seo_description_response = self.ai_client.chat.completions.create(
-			model="gpt-4o",
+			model=self.profile["script"]["model"],
 			messages=conversation_history
 		)
 		seo_description = seo_description_response.choices[0].message.content.strip()
 		return seo_description
 
+	def generate_title(self):
+		return self._fill_template(self.profile["templates"]["title"], title=self.title)
+
 	def generate_description(self):
 		"""
-		Creates an SEO-optimized YouTube video description.
+		Creates the YouTube video description from the profile's description template. Profiles with a
+		templates.seo_description prompt get a GPT-written summary on top.
 		:return: Description text.
 		"""
 		print(f"✍🏾 Generating description for video...")
-		seo_description = ""
-		if self.category == "diabetes":
-			base_description = DIABETES_BASE_DESCRIPTION
-			description_hashtags = DIABETES_HASHTAGS
-			seo_description = self.generate_seo_description()
-		elif self.category == "gardening":
-			base_description = GARDENING_BASE_DESCRIPTION
-			description_hashtags = GARDENING_HASHTAGS
-		elif self.category == "health":
-			base_description = HEALTH_BASE_DESCRIPTION
-			description_hashtags = HEALTH_HASHTAGS
-			seo_description = self.generate_seo_description()
+		templates = self.profile["templates"]
+		summary = ""
+		if templates.get("seo_description"):
+			summary = self.generate_seo_description(templates["seo_description"]) + "\n\n"
 
-		description = seo_description + base_description + "\n" + description_hashtags
-		return description
+		return self._fill_template(
+			templates["description"],
+			title=self.title,
+			summary=summary,
+			chapters="\n".join(f"{index}. {point}" for index, point in enumerate(self.mainpoints, 1)),
+			hashtags=" ".join(self.profile["defaults"].get("hashtags", []))
+		)
 
 	def generate_tags(self):
 		"""
 		Creates a list of SEO-friendly tags.
 		:return: List of tags.
 		"""
-		tags = []
-		if self.category == "diabetes":
-			tags = DIABETES_TAGS
-		elif self.category == "gardening":
-			tags = GARDENING_TAGS
-		elif self.category == "health":
-			tags = HEALTH_TAGS
-
-		return tags
+		return list(self.profile["defaults"].get("tags", []))
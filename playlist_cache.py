@@ -0,0 +1,52 @@
+import json
+import os
+import threading
+
+from constants import PLAYLIST_FOLDER
+
+
+class PlaylistCache:
+	"""
+	In-memory copy of the playlists/<channel>_playlists.json files used when rendering pages.
+	Entries are replaced when a refresh stores new playlists, and re-read if another process rewrote the file.
+	"""
+
+	def __init__(self, playlist_folder=PLAYLIST_FOLDER):
+		self.playlist_folder = playlist_folder
+		self._lock = threading.Lock()
+		self._entries = {}  # channel -> (file mtime, playlists)
+
+	def get_path(self, channel):
+		return os.path.join(self.playlist_folder, f"{channel}_playlists.json")
+
+	def get(self, channel):
+		"""Returns the channel playlists as {playlist_id: title}, or an empty dict if none were fetched yet."""
+		file_path = self.get_path(channel)
+		try:
+			mtime = os.stat(file_path).st_mtime
+		except FileNotFoundError:
+			return {}
+
+		with self._lock:
+			entry = self._entries.get(channel)
+			if entry and entry[0] == mtime:
+				return entry[1]
+
+		with open(file_path, "r", encoding="utf-8") as f:
+			playlists = json.load(f)
+		with self._lock:
+			self._entries[channel] = (mtime, playlists)
+		return playlists
+
+	def get_all(self, channels):
+		return {channel: self.get(channel) for channel in channels}
+
+	def invalidate(self, channel=None):
+		with self._lock:
+			if channel is None:
+				self._entries.clear()
+			else:
+				self._entries.pop(channel, None)
+
+
+PLAYLIST_CACHE = PlaylistCache()
@@ -0,0 +1,94 @@
+import googleapiclient.errors
+import os
+import threading
+import time
+
+from constants import PLAYLIST_FOLDER, PLAYLIST_ITEMS_INDEX_TTL, PLAYLIST_ITEMS_PAGE_SIZE
+from utils import atomic_write_json, file_lock, read_json
+
+
+class PlaylistItemsIndex:
+	"""
+	Local index of playlist → video ids for one channel, stored next to the playlists JSON.
+	Membership checks are answered from the index. A playlist is only re-listed once its entry is older than
+	PLAYLIST_ITEMS_INDEX_TTL, and the first page is requested with its last etag so unchanged playlists cost a
+	single list call.
+	"""
+
+	def __init__(self, category):
+		self.category = category
+		self.index_path = os.path.join(PLAYLIST_FOLDER, f"{category}_playlist_items.json")
+		self._lock = threading.Lock()
+		self.index = self._load()
+
+	def _load(self):
+		return read_json(self.index_path, {})
+
+	def save(self):
+		"""Merges with the stored index so playlists refreshed by another server process meanwhile are kept."""
+		with file_lock(self.index_path), self._lock:
+			for playlist_id, entry in (read_json(self.index_path, {}) or {}).items():
+				if entry.get("refreshed_at", 0) > self.index.get(playlist_id, {}).get("refreshed_at", 0):
+					self.index[playlist_id] = entry
+			atomic_write_json(self.index_path, self.index)
+
+	def is_stale(self, playlist_id):
+		entry = self.index.get(playlist_id)
+		return not entry or time.time() - entry.get("refreshed_at", 0) > PLAYLIST_ITEMS_INDEX_TTL
+
+	def contains(self, playlist_id, video_id):
+		entry = self.index.get(playlist_id)
+		return bool(entry) and video_id in entry["video_ids"]
+
+	def add(self, playlist_id, video_id):
+		with self._lock:
+			entry = self.index.setdefault(playlist_id, {"etag": None, "video_ids": [], "refreshed_at": 0})
+			if video_id not in entry["video_ids"]:
+				entry["video_ids"].append(video_id)
+				entry["etag"] = None  # Our own insert changed the playlist; the old etag no longer describes it.
+
+	def refresh(self, youtube, playlist_id, spend_quota=None):
+		"""
+		Re-lists a playlist when its first page changed since the last refresh.
+		:param youtube: Authenticated YouTube API client.
+		:param spend_quota: (Optional) Called with the API method name for every request issued.
+		:return: True if the playlist was re-listed, False if it was unchanged.
+		"""
+		entry = self.index.get(playlist_id, {})
+		video_ids = []
+		first_page_etag = None
+		next_page_token = None
+
+		while True:
+			request = youtube.playlistItems().list(
+				part="contentDetails",
+				playlistId=playlist_id,
+				maxResults=PLAYLIST_ITEMS_PAGE_SIZE,
+				pageToken=next_page_token,
+				fields="etag,nextPageToken,items/contentDetails/videoId"
+			)
+			if next_page_token is None and entry.get("etag"):
+				request.headers["If-None-Match"] = entry["etag"]
+
+			if spend_quota:
+				spend_quota("playlistItems.list")
+			try:
+				response = request.execute()
+			except googleapiclient.errors.HttpError as e:
+				if e.resp.status == 304:
+					with self._lock:
+						self.index[playlist_id]["refreshed_at"] = time.time()
+					return False
+				raise
+
+			if first_page_etag is None:
+				first_page_etag = response.get("etag")
+			video_ids.extend(item["contentDetails"]["videoId"] for item in response.get("items", []))
+
+			next_page_token = response.get("nextPageToken")
+			if not next_page_token:
+				break
+
+		with self._lock:
+			self.index[playlist_id] = {"etag": first_page_etag, "video_ids": video_ids, "refreshed_at": time.time()}
+		return True
@@ -0,0 +1,83 @@
+import importlib
+import importlib.util
+import threading
+
+
+class PluginRegistry:
+	"""
+	Maps plugin names to "module:attribute" import paths and imports them on first use.
+	Keeps heavy dependencies (ffmpeg, edge_tts, googleapiclient...) out of app startup until a stage needs them.
+	"""
+
+	def __init__(self, kind, plugins=None):
+		self.kind = kind
+		self._targets = dict(plugins or {})
+		self._loaded = {}
+		self._lock = threading.RLock()
+
+	def __contains__(self, name):
+		return name in self._targets
+
+	def names(self):
+		return sorted(self._targets)
+
+	def register(self, name, target):
+		"""
+		:param target: "package.module:Attribute", "package.module" to resolve to the module itself, or an
+		already loaded plugin object (e.g. a stand-in used by the benchmarks).
+		"""
+		with self._lock:
+			if isinstance(target, str):
+				self._targets[name] = target
+				self._loaded.pop(name, None)
+			else:
+				self._targets[name] = None
+				self._loaded[name] = target
+
+	def is_available(self, name):
+		"""True when the plugin's module can be found, without importing it."""
+		if name in self._loaded:
+			return True
+		if name not in self._targets:
+			return False
+		module_name = self._targets[name].partition(":")[0]
+		try:
+			return importlib.util.find_spec(module_name) is not None
+		except ImportError:
+			return False
+
+	def get(self, name):
+		with self._lock:
+			if name in self._loaded:
+				return self._loaded[name]
+			if name not in self._targets:
+				raise KeyError(f"❌ Unknown {self.kind} '{name}'. Available: {', '.join(self.names())}")
+
+			module_name, _, attribute = self._targets[name].partition(":")
+			try:
+				module = importlib.import_module(module_name)
+			except ImportError as e:
+				raise ImportError(f"❌ Could not load {self.kind} '{name}' from {module_name}: {e}") from e
+
+			plugin = getattr(module, attribute) if attribute else module
+			self._loaded[name] = plugin
+			return plugin
+
+
+VIDEO_CREATORS = PluginRegistry("video creator", {
+	"gardening": "video_creators.gardening_video_creator:GardeningVideoCreator",
+	"health": "video_creators.health_video_creator:HealthVideoCreator",
+	"diabetes": "video_creators.diabetes_video_creator:DiabetesVideoCreator",
+})
+
+# TTS engines resolve to a provider class, instantiated per TTSEngine (see tts_providers.TTSProvider).
+TTS_PROVIDERS = PluginRegistry("TTS provider", {
+	"edge": "tts_providers:EdgeTTSProvider",
+	"google": "tts_providers:GoogleTTSProvider",
+	"kokoro": "tts_providers:KokoroTTSProvider",
+	"openvoice": "tts_providers:OpenVoiceTTSProvider",
+})
+
+UPLOADERS = PluginRegistry("uploader", {
+	"youtube": "youtube_uploader:YouTubeUploader",
+})
@@ -0,0 +1,212 @@
+"""
+Opt-in profiler of content jobs. A sampling thread records the Python stack of every thread inside a stage each
+PROFILE_SAMPLE_INTERVAL, so a slow stage shows whether its time goes to building ffmpeg graphs, waiting for ffprobe,
+OpenAI or TTS responses, or waiting for ffmpeg itself. Child processes (ffmpeg, ffprobe, OpenVoice) are accounted
+separately: their CPU time and peak memory per stage, and per ffmpeg pass of the renderer.
+
+Profiles are saved in PROFILE_FOLDER/<job id>/: profile.json (stage summaries) and <stage>.folded (collapsed stacks,
+also readable by speedscope or flamegraph.pl). GET /jobs/<job id>/profile draws them as flame graphs.
+"""
+import collections
+import os
+import sys
+import threading
+import time
+
+from constants import PROFILE_FOLDER, PROFILE_MIN_FRACTION, PROFILE_SAMPLE_INTERVAL
+from utils import atomic_write_json, atomic_write_text, read_json
+
+try:
+	import resource
+except ImportError:  # Windows
+	resource = None
+
+MAX_STACK_DEPTH = 200
+TOP_FUNCTIONS = 15
+
+
+def child_usage():
+	"""
+	CPU seconds and peak RSS (bytes) of the child processes this process has waited for so far, or None where the OS
+	doesn't report them. Process-wide: includes the children of other jobs running at the same time.
+	"""
+	if resource is None:
+		return None
+	usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+	return {"cpu": usage.ru_utime + usage.ru_stime, "max_rss": usage.ru_maxrss * (1 if sys.platform == "darwin" else 1024)}
+
+def frame_name(code):
+	return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+def folded_stack(frame):
+	"""Stack of a frame, outermost call first, joined by ";" (collapsed stack format)."""
+	names = []
+	while frame is not None and len(names) < MAX_STACK_DEPTH:
+		names.append(frame_name(frame.f_code))
+		frame = frame.f_back
+	return ";".join(reversed(names))
+
+def mb(size):
+	return round(size / 1024 / 1024, 1) if size is not None else None
+
+
+class PipelineProfiler:
+	"""
+	Profile of one job. Threads of the job call enter(stage) when they start a stage (the pipeline thread at every
+	"stage" event) and leave() when done; finish() stops sampling and saves the profile.
+	"""
+
+	def __init__(self, job_id, folder=PROFILE_FOLDER, interval=PROFILE_SAMPLE_INTERVAL):
+		self.job_id = job_id
+		self.folder = os.path.join(folder, job_id)
+		self.interval = interval
+		self.stages = []  # Summaries of finished stages, in order
+		self.finished = False
+		self._lock = threading.Lock()
+		self._active = {}  # thread id -> state of the stage the thread is in
+		self._stacks = {}  # stage -> Counter of folded stacks
+		self._processes = collections.defaultdict(list)  # stage -> child processes reported by the stage
+		self._last_stage = None
+		self._stop = threading.Event()
+		self._sampler = threading.Thread(target=self._sample, name=f"profiler-{job_id}", daemon=True)
+		self._sampler.start()
+
+	def enter(self, stage):
+		"""Starts profiling stage in the calling thread, ending the stage the thread was in."""
+		self.leave()
+		state = {"stage": stage, "started": time.perf_counter(), "cpu": time.thread_time(), "children": child_usage()}
+		with self._lock:
+			self._stacks.setdefault(stage, collections.Counter())
+			self._active[threading.get_ident()] = state
+			self._last_stage = stage
+
+	def leave(self):
+		"""Ends the stage of the calling thread, if any, and records its summary."""
+		with self._lock:
+			state = self._active.pop(threading.get_ident(), None)
+		if state is None:
+			return
+		children = child_usage()
+		before = state["children"]
+		summary = {
+			"stage": state["stage"],
+			"seconds": round(time.perf_counter() - state["started"], 3),
+			"cpu_seconds": round(time.thread_time() - state["cpu"], 3),  # Python and C extensions in this thread
+			"children_cpu_seconds": round(children["cpu"] - before["cpu"], 3) if children else None,
+			# Peak of all children waited for so far: only reported when a child of this stage raised it.
+			"children_peak_rss_mb": mb(children["max_rss"]) if children and children["max_rss"] > before["max_rss"] else None,
+		}
+		with self._lock:
+			self.stages.append(summary)
+
+	def run(self, stage, function, *args):
+		"""Calls function(*args) as stage of the calling thread (for stages running in a thread of their own)."""
+		self.enter(stage)
+		try:
+			return function(*args)
+		finally:
+			self.leave()
+
+	def record_process(self, label=None, seconds=None, cpu_seconds=None, peak_rss_mb=None, **details):
+		"""
+		Adds a child process measured by its caller (e.g. an ffmpeg pass) to the stage of the calling thread, or to the
+		last stage entered when called from a pool thread of a stage (e.g. Shorts rendering in parallel).
+		"""
+		with self._lock:
+			state = self._active.get(threading.get_ident())
+			stage = state["stage"] if state else self._last_stage
+			self._processes[stage].append({"label": label, "seconds": seconds, "cpu_seconds": cpu_seconds, "peak_rss_mb": peak_rss_mb, **details})
+
+	def _sample(self):
+		while not self._stop.wait(self.interval):
+			with self._lock:
+				active = {thread_id: state["stage"] for thread_id, state in self._active.items()}
+			if not active:
+				continue
+			frames = sys._current_frames()
+			samples = [(stage, folded_stack(frames[thread_id])) for thread_id, stage in active.items() if thread_id in frames]
+			del frames  # Holds every thread's frames alive
+			with self._lock:
+				for stage, stack in samples:
+					self._stacks[stage][stack] += 1
+
+	def finish(self):
+		"""
+		Ends every stage still open, stops sampling and saves the profile.
+		:return: The saved summary, or None when already finished.
+		"""
+		if self.finished:
+			return None
+		self.finished = True
+		self.leave()
+		with self._lock:
+			open_stages = list(self._active.values())
+			self._active.clear()
+		for state in open_stages:  # Threads that didn't leave (e.g. a stage that raised); their CPU time is unknown here.
+			self.stages.append({"stage": state["stage"], "seconds": round(time.perf_counter() - state["started"], 3)})
+		self._stop.set()
+		self._sampler.join()
+
+		os.makedirs(self.folder, exist_ok=True)
+		for summary in self.stages:
+			stacks = self._stacks.get(summary["stage"], {})
+			summary["samples"] = sum(stacks.values())
+			summary["top_functions"] = top_functions(stacks)
+			summary["processes"] = self._processes.get(summary["stage"], [])
+		for stage, stacks in self._stacks.items():
+			atomic_write_text(os.path.join(self.folder, f"{stage}.folded"), "".join(f"{stack} {count}\n" for stack, count in stacks.most_common()))
+		profile = {
+			"job_id": self.job_id,
+			"interval": self.interval,
+			"stages": self.stages,
+			"unattributed_processes": self._processes.get(None, []),
+		}
+		atomic_write_json(os.path.join(self.folder, "profile.json"), profile)
+		stage_times = ", ".join(f"{summary['stage']} {summary['seconds']}s" for summary in self.stages)
+		print(f"🔬 Profile saved: {self.folder} ({stage_times})")
+		return profile
+
+
+def top_functions(stacks, limit=TOP_FUNCTIONS):
+	""":return: The functions most often at the top of the stack (self), with how often they were anywhere in it (total)."""
+	total = collections.Counter()
+	own = collections.Counter()
+	for stack, count in stacks.items():
+		names = stack.split(";")
+		own[names[-1]] += count
+		for name in set(names):
+			total[name] += count
+	return [{"function": name, "self": count, "total": total[name]} for name, count in own.most_common(limit)]
+
+def load_profile(job_id, folder=PROFILE_FOLDER):
+	""":return: The saved summary of a job's profile, or None when the job wasn't profiled."""
+	return read_json(os.path.join(folder, job_id, "profile.json"))
+
+def load_stacks(job_id, stage, folder=PROFILE_FOLDER):
+	stacks = collections.Counter()
+	path = os.path.join(folder, job_id, f"{stage}.folded")
+	if os.path.exists(path):
+		with open(path, "r", encoding="utf-8") as f:
+			for line in f:
+				stack, _, count = line.rstrip("\n").rpartition(" ")
+				stacks[stack] += int(count)
+	return stacks
+
+def flame_tree(stacks, min_fraction=PROFILE_MIN_FRACTION):
+	"""
+	Call tree of collapsed stacks for drawing: {"name", "value", "children"}, children sorted by name so the same
+	calls line up between stages. Frames under min_fraction of all samples are dropped (their time stays in the parent).
+	"""
+	root = {"name": "all", "value": 0, "children": {}}
+	for stack, count in stacks.items():
+		root["value"] += count
+		node = root
+		for name in stack.split(";"):
+			node = node["children"].setdefault(name, {"name": name, "value": 0, "children": {}})
+			node["value"] += count
+
+	threshold = root["value"] * min_fraction
+	def prune(node):
+		children = [prune(child) for child in node["children"].values() if child["value"] >= threshold]
+		return {"name": node["name"], "value": node["value"], "children": sorted(children, key=lambda child: child["name"])}
+	return prune(root)
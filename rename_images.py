@@ -1,67 +1,150 @@
 import os
 import hashlib
 import json
+import re
+import threading
 import time
-from constants import LOCAL_IMAGE_DB, LOG_FILE
 
+from concurrent.futures import ThreadPoolExecutor
+from constants import LOCAL_IMAGE_DB, LOG_FILE, RENAME_JOURNAL_FILE, RENAME_WORKERS
 
-def load_renamed_files():
-	"""Loads the renamed file log to prevent renaming existing files."""
-	if os.path.exists(LOG_FILE):
-		with open(LOG_FILE, "r", encoding="utf-8") as f:
-			return json.load(f)
-	return {}
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg")
+HASHED_NAME_PATTERN = re.compile(r"^[0-9a-f]{10}\.(png|jpg|jpeg)$")
+COMPACT_WASTE_RATIO = 1.5  # Compact once the journal has this many lines per live entry.
 
-def save_renamed_files(log_data):
-	"""Saves the updated renamed file log."""
-	with open(LOG_FILE, "w", encoding="utf-8") as f:
-		json.dump(log_data, f, indent=4, ensure_ascii=False)
 
-def rename_images():
+class RenameJournal:
 	"""
-	Renames only new images in LOCAL_IMAGE_DB using shorter hashed names.
-	Prevents re-renaming files by storing renamed filenames in a log file.
+	Append-only JSONL log of renames, one {"d": folder, "o": original name, "n": new name} entry per line.
+	Each rename is flushed as soon as it happens, so a crash only loses the rename in progress.
 	"""
-	print("🖼 STARTED image rename!")
-	start_time = time.time()
-	renamed_files = load_renamed_files()
-	updated_log = renamed_files.copy()
-
-	for topic_folder in os.listdir(LOCAL_IMAGE_DB):
-		topic_path = os.path.join(LOCAL_IMAGE_DB, topic_folder)
 
-		if os.path.isdir(topic_path):
-			for img in os.listdir(topic_path):
-				if img.endswith((".png", ".jpg", ".jpeg")):
-					original_path = os.path.join(topic_path, img)
+	def __init__(self, journal_path=RENAME_JOURNAL_FILE, legacy_log_path=LOG_FILE):
+		self.journal_path = journal_path
+		self.legacy_log_path = legacy_log_path
+		self._lock = threading.Lock()
+		self.entries = {}  # folder -> {new name: original name}
+		self.line_count = 0
+		self._load()
+		self._file = open(self.journal_path, "a", encoding="utf-8")
 
-					# ✅ Skip renaming if the file is already in the log
-					if original_path in renamed_files:
+	def _load(self):
+		if os.path.exists(self.journal_path):
+			with open(self.journal_path, "r", encoding="utf-8") as f:
+				for line in f:
+					line = line.strip()
+					if not line:
 						continue
+					try:
+						entry = json.loads(line)
+					except json.JSONDecodeError:
+						continue  # Partial last line from a crash.
+					self._apply(entry["d"], entry["o"], entry["n"])
+					self.line_count += 1
+
+		needs_compaction = self.line_count > COMPACT_WASTE_RATIO * max(self.live_count(), 1)
+		if self.legacy_log_path and os.path.exists(self.legacy_log_path):
+			self._migrate_legacy_log()
+			needs_compaction = True
+		if needs_compaction:
+			self.compact()
+
+	def _migrate_legacy_log(self):
+		print(f"📦 Migrating {self.legacy_log_path} into {self.journal_path}...")
+		with open(self.legacy_log_path, "r", encoding="utf-8") as f:
+			legacy_log = json.load(f)
+		for original_path, new_path in legacy_log.items():
+			folder = os.path.basename(os.path.dirname(new_path))
+			self._apply(folder, os.path.basename(original_path), os.path.basename(new_path))
+		os.replace(self.legacy_log_path, self.legacy_log_path + ".migrated")
+
+	def _apply(self, folder, original_name, new_name):
+		renamed = self.entries.setdefault(folder, {})
+		# Collapse chains (a → b, b → c) left by older runs that renamed already renamed files.
+		renamed[new_name] = renamed.pop(original_name, original_name)
+
+	def live_count(self):
+		return sum(len(renamed) for renamed in self.entries.values())
+
+	def compact(self):
+		"""Rewrites the journal with one line per live rename."""
+		temp_path = self.journal_path + ".tmp"
+		with open(temp_path, "w", encoding="utf-8") as f:
+			for folder, renamed in self.entries.items():
+				for new_name, original_name in renamed.items():
+					f.write(json.dumps({"d": folder, "o": original_name, "n": new_name}, ensure_ascii=False) + "\n")
+		os.replace(temp_path, self.journal_path)
+		self.line_count = self.live_count()
+		print(f"🗜️ Rename journal compacted to {self.line_count} entries.")
+
+	def renamed_names(self, folder):
+		return set(self.entries.get(folder, {}))
+
+	def record(self, folder, original_name, new_name):
+		with self._lock:
+			self._apply(folder, original_name, new_name)
+			self._file.write(json.dumps({"d": folder, "o": original_name, "n": new_name}, ensure_ascii=False) + "\n")
+			self._file.flush()
+			self.line_count += 1
 
-					# ✅ Generate a unique filename (10-char hash + extension)
-					file_extension = os.path.splitext(img)[-1]
-					short_filename = hashlib.md5(img.encode()).hexdigest()[:10] + file_extension
-					new_path = os.path.join(topic_path, short_filename)
+	def close(self):
+		with self._lock:
+			self._file.flush()
+			os.fsync(self._file.fileno())
+			self._file.close()
 
-					# ✅ Ensure unique filename within the same folder
-					counter = 1
-					while os.path.exists(new_path):
-						short_filename = hashlib.md5((img + str(counter)).encode()).hexdigest()[:10] + file_extension
-						new_path = os.path.join(topic_path, short_filename)
-						counter += 1
 
-					# ✅ Rename file
-					os.rename(original_path, new_path)
-					# print(f"✅ Renamed: {img} → {short_filename}")
+def rename_folder(topic_folder, journal):
+	"""Renames new images of one topic folder. Returns the number of renamed files."""
+	topic_path = os.path.join(LOCAL_IMAGE_DB, topic_folder)
+	already_renamed = journal.renamed_names(topic_folder)
+	existing_names = set(os.listdir(topic_path))
+	renamed_count = 0
+
+	for img in sorted(existing_names):
+		if not img.endswith(IMAGE_EXTENSIONS):
+			continue
+
+		# ✅ Skip files renamed by a previous run
+		if img in already_renamed or HASHED_NAME_PATTERN.match(img):
+			continue
+
+		# ✅ Generate a unique filename (10-char hash + extension) within the same folder
+		file_extension = os.path.splitext(img)[-1]
+		short_filename = hashlib.md5(img.encode()).hexdigest()[:10] + file_extension
+		counter = 1
+		while short_filename in existing_names:
+			short_filename = hashlib.md5((img + str(counter)).encode()).hexdigest()[:10] + file_extension
+			counter += 1
+
+		# ✅ Rename file and log it right away
+		os.rename(os.path.join(topic_path, img), os.path.join(topic_path, short_filename))
+		existing_names.discard(img)
+		existing_names.add(short_filename)
+		journal.record(topic_folder, img, short_filename)
+		renamed_count += 1
+
+	return renamed_count
+
+def rename_images():
+	"""
+	Renames only new images in LOCAL_IMAGE_DB using shorter hashed names.
+	Prevents re-renaming files by storing renamed filenames in an append-only journal.
+	"""
+	print("🖼 STARTED image rename!")
+	start_time = time.time()
+	journal = RenameJournal()
 
-					# ✅ Update log
-					updated_log[original_path] = new_path
+	topic_folders = [entry.name for entry in os.scandir(LOCAL_IMAGE_DB) if entry.is_dir()]
+	try:
+		with ThreadPoolExecutor(max_workers=RENAME_WORKERS) as executor:
+			renamed_total = sum(executor.map(lambda folder: rename_folder(folder, journal), topic_folders))
+	finally:
+		journal.close()
 
-	# ✅ Save updated log
-	save_renamed_files(updated_log)
 	end_time = time.time()
 	total_time = end_time - start_time
+	print(f"✅ Renamed {renamed_total} images across {len(topic_folders)} folders.")
 	print(f"⏳ Image rename time: {round(total_time, 1)} s")
 
 if __name__ == "__main__":
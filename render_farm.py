@@ -0,0 +1,269 @@
+import hashlib
+import os
+import threading
+import time
+import uuid
+
+from constants import RENDER_HEARTBEAT_INTERVAL, RENDER_TASK_MAX_ATTEMPTS, RENDER_WORKER_TIMEOUT
+
+
+class RenderFarm:
+	"""
+	Coordinator side of the render farm. Render workers (render_worker.py, on this or other machines) register, send
+	heartbeats and claim segment tasks over HTTP; the assets a task needs are served by content hash and finished
+	segments are uploaded back. Tasks held by a worker that stops sending heartbeats go back to the queue.
+	State lives in memory: tasks only exist while the render that submitted them is waiting for them.
+	"""
+
+	def __init__(self, worker_timeout=RENDER_WORKER_TIMEOUT, max_attempts=RENDER_TASK_MAX_ATTEMPTS, heartbeat_interval=RENDER_HEARTBEAT_INTERVAL):
+		self.worker_timeout = worker_timeout
+		self.heartbeat_interval = heartbeat_interval
+		self.max_attempts = max_attempts
+		self._condition = threading.Condition()
+		self._workers = {}
+		self._tasks = {}
+		self._queue = []  # Pending task ids, oldest first
+		self._assets = {}  # content hash -> local path
+		self._asset_hashes = {}  # (path, size, mtime) -> content hash
+
+	# 🖥️ Workers
+
+	def register_worker(self, name, info=None):
+		worker = {
+			"id": uuid.uuid4().hex[:12],
+			"name": name,
+			"info": info or {},
+			"registered_at": time.time(),
+			"last_seen": time.time(),
+			"completed": 0,
+			"failed": 0,
+		}
+		with self._condition:
+			self._workers[worker["id"]] = worker
+		print(f"🖥️ Render worker registered: {name} ({worker['id']})")
+		return {"worker_id": worker["id"], "heartbeat_interval": self.heartbeat_interval}
+
+	def heartbeat(self, worker_id):
+		""":raises KeyError: When the worker is unknown (never registered, or declared dead) and must register again."""
+		with self._condition:
+			self._workers[worker_id]["last_seen"] = time.time()
+			self._reap()
+
+	def deregister_worker(self, worker_id):
+		with self._condition:
+			worker = self._workers.pop(worker_id, None)
+			if worker:
+				print(f"👋 Render worker left: {worker['name']}")
+				self._requeue_tasks_of(worker_id, "worker left")
+
+	def live_workers(self):
+		with self._condition:
+			self._reap()
+			return list(self._workers.values())
+
+	def _reap(self):
+		"""Drops workers that missed their heartbeats and puts their tasks back in the queue. Caller holds the lock."""
+		now = time.time()
+		for worker_id, worker in list(self._workers.items()):
+			if now - worker["last_seen"] > self.worker_timeout:
+				print(f"💀 Render worker {worker['name']} missed its heartbeats, reassigning its tasks")
+				del self._workers[worker_id]
+				self._requeue_tasks_of(worker_id, "worker died")
+
+	def _requeue_tasks_of(self, worker_id, reason):
+		for task in self._tasks.values():
+			if task["status"] == "assigned" and task["worker_id"] == worker_id:
+				task["status"] = "pending"
+				task["worker_id"] = None
+				task["error"] = reason
+				self._queue.insert(0, task["id"])  # Reassigned work goes first: the render is already waiting on it.
+		self._condition.notify_all()
+
+	# 📦 Assets
+
+	def add_asset(self, path):
+		"""Makes a file downloadable by workers. :return: Its content hash."""
+		stat = os.stat(path)
+		key = (os.path.abspath(path), stat.st_size, stat.st_mtime)
+		with self._condition:
+			content_hash = self._asset_hashes.get(key)
+		if content_hash is None:
+			digest = hashlib.sha256()
+			with open(path, "rb") as f:
+				for chunk in iter(lambda: f.read(1024 * 1024), b""):
+					digest.update(chunk)
+			content_hash = digest.hexdigest()
+		with self._condition:
+			self._asset_hashes[key] = content_hash
+			self._assets[content_hash] = key[0]
+		return content_hash
+
+	def asset_path(self, content_hash):
+		with self._condition:
+			return self._assets.get(content_hash)
+
+	# 🧩 Tasks
+
+	def submit(self, spec, asset_paths, result_path):
+		"""
+		Queues a task for the workers.
+		:param spec: JSON-serializable description of the work (see BaseVideoCreator.segment_spec).
+		:param asset_paths: Local files the spec refers to; workers get them by content hash.
+		:param result_path: Where the uploaded result is saved on this machine.
+		:return: Task id.
+		"""
+		assets = {path: self.add_asset(path) for path in dict.fromkeys(asset_paths)}
+		task = {
+			"id": uuid.uuid4().hex[:12],
+			"spec": spec,
+			"assets": assets,
+			"result_path": result_path,
+			"status": "pending",
+			"worker_id": None,
+			"assigned_to": [],  # Every worker the task was handed to; only they may upload its result
+			"attempts": 0,
+			"error": None,
+			"stats": None,
+		}
+		with self._condition:
+			self._tasks[task["id"]] = task
+			self._queue.append(task["id"])
+			self._condition.notify_all()
+		return task["id"]
+
+	def _take(self, worker_id):
+		while self._queue:
+			task = self._tasks.get(self._queue.pop(0))
+			if task and task["status"] == "pending":
+				task["status"] = "assigned"
+				task["worker_id"] = worker_id
+				task["assigned_to"].append(worker_id)
+				task["attempts"] += 1
+				task["assigned_at"] = time.time()
+				return task
+		return None
+
+	def claim(self, worker_id):
+		"""
+		Assigns the oldest pending task to a worker.
+		:return: {"id", "spec", "assets"} or None when there is no work.
+		:raises KeyError: When the worker is unknown.
+		"""
+		with self._condition:
+			self._workers[worker_id]["last_seen"] = time.time()
+			self._reap()
+			task = self._take(worker_id)
+		if task is None:
+			return None
+		print(f"📤 Task {task['id']} → {self._workers.get(worker_id, {}).get('name', worker_id)} (attempt {task['attempts']})")
+		return {"id": task["id"], "spec": task["spec"], "assets": task["assets"]}
+
+	def complete(self, task_id, worker_id, stream, stats=None):
+		"""
+		Saves the result a worker uploads. The first result of a task wins: a worker declared dead may still finish
+		a task that was reassigned, and whichever copy arrives first is kept.
+		:param stats: (Optional) What the worker measured, e.g. {"peak_rss": bytes, "open_inputs": count}.
+		:return: True when the result was accepted.
+		:raises PermissionError: When the task was never assigned to worker_id.
+		"""
+		with self._condition:
+			task = self._tasks.get(task_id)
+			if task is None or task["status"] == "done":
+				return False
+			if worker_id not in task["assigned_to"]:
+				raise PermissionError(f"❌ Task {task_id} is not assigned to worker {worker_id}")
+
+		os.makedirs(os.path.dirname(task["result_path"]) or ".", exist_ok=True)
+		temp_path = f"{task['result_path']}.{worker_id}.part"
+		with open(temp_path, "wb") as f:
+			for chunk in iter(lambda: stream.read(1024 * 1024), b""):
+				f.write(chunk)
+		if os.path.getsize(temp_path) == 0:
+			os.remove(temp_path)
+			raise ValueError("❌ Empty render result")
+
+		with self._condition:
+			if task["status"] == "done":
+				os.remove(temp_path)
+				return False
+			os.replace(temp_path, task["result_path"])
+			task["status"] = "done"
+			task["worker_id"] = worker_id
+			task["stats"] = stats
+			if worker_id in self._workers:
+				self._workers[worker_id]["completed"] += 1
+				self._workers[worker_id]["last_seen"] = time.time()
+			self._condition.notify_all()
+		return True
+
+	def fail(self, task_id, worker_id, error):
+		"""Puts a failed task back in the queue, or fails it for good after max_attempts."""
+		with self._condition:
+			task = self._tasks.get(task_id)
+			if task is None or task["status"] != "assigned" or task["worker_id"] != worker_id:
+				return
+			print(f"⚠️ Task {task_id} failed on {worker_id}: {error}")
+			task["error"] = error
+			task["worker_id"] = None
+			if worker_id in self._workers:
+				self._workers[worker_id]["failed"] += 1
+			if task["attempts"] >= self.max_attempts:
+				task["status"] = "failed"
+			else:
+				task["status"] = "pending"
+				self._queue.append(task_id)
+			self._condition.notify_all()
+
+	def wait(self, task_ids, local_render=None, poll_interval=1):
+		"""
+		Blocks until every task is done, then forgets them.
+		:param local_render: (Optional) Called as local_render(spec, result_path) to render pending tasks on this machine
+			while no worker is alive, so a render never stalls on an empty farm.
+		:return: The finished tasks, in the order of task_ids.
+		:raises RuntimeError: When a task failed max_attempts times.
+		"""
+		try:
+			while True:
+				with self._condition:
+					self._reap()
+					tasks = [self._tasks[task_id] for task_id in task_ids]
+					failed = next((task for task in tasks if task["status"] == "failed"), None)
+					if failed:
+						raise RuntimeError(f"❌ Render task {failed['id']} failed {failed['attempts']} times: {failed['error']}")
+					if all(task["status"] == "done" for task in tasks):
+						return tasks
+
+					local_task = self._take("local") if local_render and not self._workers else None
+					if local_task is None:
+						self._condition.wait(poll_interval)
+						continue
+
+				print(f"🏠 No render worker alive: rendering task {local_task['id']} here")
+				try:
+					local_render(local_task["spec"], local_task["result_path"])
+				except Exception as e:
+					self.fail(local_task["id"], "local", f"{type(e).__name__}: {e}")
+					continue
+				with self._condition:
+					local_task["status"] = "done"
+					self._condition.notify_all()
+		finally:
+			with self._condition:
+				for task_id in task_ids:
+					task = self._tasks.pop(task_id, None)
+					if task and task_id in self._queue:
+						self._queue.remove(task_id)
+
+	def status(self):
+		with self._condition:
+			self._reap()
+			return {
+				"workers": [dict(worker) for worker in self._workers.values()],
+				"tasks": [
+					{key: task[key] for key in ("id", "status", "worker_id", "attempts", "error")}
+					for task in self._tasks.values()
+				],
+			}
+
+
+RENDER_FARM = RenderFarm()
@@ -0,0 +1,199 @@
+"""
+Render worker daemon: registers with the app's render farm, pulls render segments, fetches the assets they need by
+content hash and uploads the finished segments back.
+
+Usage (on any machine with ffmpeg and the project's requirements):
+	python render_worker.py --coordinator http://render-app:5000 --name box-1
+
+The app only hands out work while at least one worker is alive, and reassigns the tasks of workers that stop
+sending heartbeats. Set RENDER_FARM_TOKEN to the same value on the app and the workers to require a shared secret.
+"""
+import argparse
+import hashlib
+import json
+import os
+import platform
+import signal
+import socket
+import threading
+import time
+import traceback
+
+import requests
+
+from constants import RENDER_FARM_TOKEN, RENDER_WORKER_CACHE_FOLDER
+from video_creators.base_video_creator import BaseVideoCreator
+
+POLL_INTERVAL = 2  # seconds between claims while the farm has no work
+RETRY_INTERVAL = 5  # seconds before contacting an unreachable coordinator again
+
+
+class SegmentRenderer(BaseVideoCreator):
+	"""The picture-building half of BaseVideoCreator: renders segment specs, no narration, audio or subtitles."""
+
+	def __init__(self, progress_callback=None):
+		self.logo_path = None
+		self.narration_duration = None
+		self.progress_callback = progress_callback
+		self.render_farm = None
+		self._render_stats = None
+
+
+def localize(value, local_paths):
+	"""Replaces every coordinator path in a spec by the local copy of the asset."""
+	if isinstance(value, dict):
+		return {key: localize(item, local_paths) for key, item in value.items()}
+	if isinstance(value, list):
+		return [localize(item, local_paths) for item in value]
+	if isinstance(value, str):
+		return local_paths.get(value, value)
+	return value
+
+
+class RenderWorker:
+	def __init__(self, coordinator, name, cache_folder=RENDER_WORKER_CACHE_FOLDER, token=RENDER_FARM_TOKEN):
+		self.coordinator = coordinator.rstrip("/")
+		self.name = name
+		self.cache_folder = cache_folder
+		self.session = requests.Session()
+		self.heartbeat_session = requests.Session()  # Heartbeats keep going from their own thread while a task renders.
+		if token:
+			self.session.headers["X-Render-Token"] = token
+			self.heartbeat_session.headers["X-Render-Token"] = token
+		self.worker_id = None
+		self.heartbeat_interval = 5
+		self.renderer = SegmentRenderer()
+		self._stop = threading.Event()
+		self._lock = threading.Lock()
+
+	def url(self, path):
+		return f"{self.coordinator}{path}"
+
+	def register(self):
+		response = self.session.post(self.url("/render/workers"), json={
+			"name": self.name,
+			"info": {"host": socket.gethostname(), "pid": os.getpid(), "cpus": os.cpu_count(), "platform": platform.platform()},
+		}, timeout=30)
+		response.raise_for_status()
+		data = response.json()
+		with self._lock:
+			self.worker_id = data["worker_id"]
+			self.heartbeat_interval = data["heartbeat_interval"]
+		print(f"🖥️ Registered with {self.coordinator} as {self.name} ({self.worker_id})")
+
+	def _heartbeat_loop(self):
+		while not self._stop.wait(self.heartbeat_interval):
+			try:
+				response = self.heartbeat_session.post(self.url(f"/render/workers/{self.worker_id}/heartbeat"), timeout=30)
+				if response.status_code == 404:
+					print("⚠️ Coordinator forgot this worker (restarted, or declared it dead): registering again")
+					self.register()
+			except requests.RequestException as e:
+				print(f"⚠️ Heartbeat failed: {e}")
+
+	def fetch_assets(self, assets):
+		"""Downloads the assets of a task that aren't cached yet. :return: {coordinator path: local path}"""
+		local_paths = {}
+		os.makedirs(self.cache_folder, exist_ok=True)
+		for remote_path, content_hash in assets.items():
+			local_path = os.path.join(self.cache_folder, content_hash + os.path.splitext(remote_path)[1].lower())
+			if not os.path.exists(local_path):
+				digest = hashlib.sha256()
+				temp_path = f"{local_path}.part"
+				with self.session.get(self.url(f"/render/assets/{content_hash}"), stream=True, timeout=60) as response:
+					response.raise_for_status()
+					with open(temp_path, "wb") as f:
+						for chunk in response.iter_content(1024 * 1024):
+							digest.update(chunk)
+							f.write(chunk)
+				if digest.hexdigest() != content_hash:
+					os.remove(temp_path)
+					raise ValueError(f"❌ Asset {content_hash} arrived corrupted")
+				os.replace(temp_path, local_path)
+			local_paths[remote_path] = local_path
+		return local_paths
+
+	def run_task(self, task):
+		label = task["spec"].get("label") or task["id"]
+		print(f"🧩 Task {task['id']}: {label} ({len(task['assets'])} assets)")
+		output_path = os.path.join(self.cache_folder, "output", f"{task['id']}.mp4")
+		os.makedirs(os.path.dirname(output_path), exist_ok=True)
+		try:
+			spec = localize(task["spec"], self.fetch_assets(task["assets"]))
+			self.renderer._render_stats = {"passes": 0, "max_open_inputs": 0, "peak_rss_bytes": None}
+			self.renderer.render_spec(spec, output_path)
+			stats = {"peak_rss": self.renderer._render_stats["peak_rss_bytes"], "open_inputs": self.renderer._render_stats["max_open_inputs"]}
+
+			with open(output_path, "rb") as f:
+				response = self.session.put(
+					self.url(f"/render/tasks/{task['id']}/result"),
+					data=f,
+					headers={"X-Worker-Id": self.worker_id, "X-Render-Stats": json.dumps(stats), "Content-Type": "application/octet-stream"},
+					timeout=600
+				)
+			response.raise_for_status()
+			print(f"✅ Task {task['id']} uploaded{'' if response.json().get('accepted') else ' (already done by another worker)'}")
+		except Exception as e:
+			traceback.print_exc()
+			try:
+				self.session.post(self.url(f"/render/tasks/{task['id']}/fail"), json={"worker_id": self.worker_id, "error": f"{type(e).__name__}: {e}"}, timeout=30)
+			except requests.RequestException:
+				pass  # The coordinator reassigns the task once this worker is declared dead.
+		finally:
+			if os.path.exists(output_path):
+				os.remove(output_path)
+
+	def run(self, max_tasks=None):
+		"""Claims and renders tasks until interrupted (or max_tasks were rendered)."""
+		while self.worker_id is None:
+			try:
+				self.register()
+			except requests.RequestException as e:
+				print(f"⚠️ Coordinator unreachable ({e}), retrying in {RETRY_INTERVAL}s")
+				time.sleep(RETRY_INTERVAL)
+		threading.Thread(target=self._heartbeat_loop, name="render-worker-heartbeat", daemon=True).start()
+
+		done = 0
+		try:
+			while max_tasks is None or done < max_tasks:
+				try:
+					response = self.session.post(self.url(f"/render/workers/{self.worker_id}/claim"), timeout=30)
+					if response.status_code == 404:
+						self.register()
+						continue
+					response.raise_for_status()
+				except requests.RequestException as e:
+					print(f"⚠️ Claim failed ({e}), retrying in {RETRY_INTERVAL}s")
+					time.sleep(RETRY_INTERVAL)
+					continue
+
+				if response.status_code == 204:
+					time.sleep(POLL_INTERVAL)
+					continue
+				self.run_task(response.json())
+				done += 1
+		except KeyboardInterrupt:
+			print("🛑 Stopping render worker")
+		finally:
+			self._stop.set()
+			try:
+				self.session.delete(self.url(f"/render/workers/{self.worker_id}"), timeout=10)
+			except requests.RequestException:
+				pass
+
+
+def _stop_on_sigterm(signum, frame):
+	raise KeyboardInterrupt  # Deregister on `kill` too, so the coordinator requeues our task right away.
+
+def main():
+	parser = argparse.ArgumentParser(description="Render segments for the content app's render farm.")
+	parser.add_argument("--coordinator", default=os.getenv("RENDER_COORDINATOR", "http://127.0.0.1:5000"), help="Base URL of the app.")
+	parser.add_argument("--name", default=f"{socket.gethostname()}-{os.getpid()}")
+	parser.add_argument("--cache", default=RENDER_WORKER_CACHE_FOLDER, help="Folder for downloaded assets.")
+	parser.add_argument("--max-tasks", type=int, help="Exit after rendering this many tasks.")
+	args = parser.parse_args()
+	signal.signal(signal.SIGTERM, _stop_on_sigterm)
+	RenderWorker(args.coordinator, args.name, args.cache).run(args.max_tasks)
+
+if __name__ == "__main__":
+	main()
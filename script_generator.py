@@ -1,9 +1,8 @@
 import os
 import time
 
-from channels_presets import PROMPT_JARDINAGEM
-
-from constants import SCRIPT_FOLDER
+from channel_profiles import get_channel_profile
+from artifact_store import video_folder
 
 
 class ScriptGenerator:
@@ -14,7 +13,17 @@ class ScriptGenerator:
 		self.formatted_title = formatted_title
 		self.mainpoints = mainpoints
 		self.client = client
-		self.script_folder = SCRIPT_FOLDER
+		self.script_folder = video_folder(formatted_title)
+
+	def get_configuration_prompt(self, profile):
+		"""System prompt of the channel: the profile's script.prompt_file, or its inline script_prompt."""
+		prompt_file = profile["script"].get("prompt_file")
+		if prompt_file:
+			with open(prompt_file, "r", encoding="utf-8") as f:
+				return f.read().strip()
+		if profile.get("script_prompt"):
+			return profile["script_prompt"].replace("{topic}", self.title)
+		raise ValueError(f"❌ Channel profile '{self.category}' has no script prompt.")
 
 	def generate_script(self):
 		"""
@@ -37,6 +46,7 @@ class ScriptGenerator:
 			return script_path  # Return existing script PATH.
 
 		print(f"🚀 Generating new script for: {self.formatted_title}")
+		os.makedirs(self.script_folder, exist_ok=True)
 
 		title_and_mainpoints = self.formatted_title + self.mainpoints
 		final_script = ""
@@ -46,9 +56,10 @@ class ScriptGenerator:
 		}
 
 		script_start_instructions = {"role": "user", "content": f"Now grab the {self.main_points_amount} main points for the theme {title_and_mainpoints} and list them separated by '/'."}
-		if self.category == 'gardening':
-			configuration_prompt = PROMPT_JARDINAGEM
-			words_per_main_point = 450
+		profile = get_channel_profile(self.category)
+		configuration_prompt = self.get_configuration_prompt(profile)
+		words_per_main_point = profile["script"]["words_per_main_point"]
+		model = profile["script"]["model"]
 
 		# Define the system instructions (this is where we input the behavior described in the custom GPT)
 		configuration_instructions = {
@@ -60,7 +71,7 @@ class ScriptGenerator:
 		conversation_history = [configuration_instructions, script_start_instructions]
 		# GPT gets instructions on its role, and the first task to list main points.
 		response_main_points = self.client.chat.completions.create(
-			model="gpt-4o",
+			model=model,
 			messages=conversation_history,
 		)
 		# Holds the list of main points/arguments for the script.
@@ -69,11 +80,11 @@ class ScriptGenerator:
 		conversation_history.append({"role": "assistant", "content": main_points})
 		print(f"Main points: {main_points}")
 
-		intro_prompt = f"Write an intro with 60 words for the title {title_and_mainpoints}, using instructions from the cofiguration prompt to convince the viewer to stay until the end of video. You should only write the intro and then wait for more instructions."
+		intro_prompt = f"Write an intro with {profile['script']['intro_words']} words for the title {title_and_mainpoints}, using instructions from the cofiguration prompt to convince the viewer to stay until the end of video. You should only write the intro and then wait for more instructions."
 		conversation_history.append({"role": "user", "content": intro_prompt})
 		# GPT writes intro.
 		intro_response = self.client.chat.completions.create(
-			model="gpt-4o",
+			model=model,
 			messages=conversation_history
 		)
 		intro = intro_response.choices[0].message.content.strip()
@@ -92,7 +103,7 @@ class ScriptGenerator:
 			conversation_history.append({"role": "user", "content": f"Now write {words_per_main_point} words for main point {counter}."})
 			# GPT writes main points one at a time.
 			partial_response = self.client.chat.completions.create(
-				model="gpt-4o",
+				model=model,
 				messages=conversation_history
 			)
 			current_script = partial_response.choices[0].message.content.strip()
@@ -107,7 +118,7 @@ class ScriptGenerator:
 
 		conversation_history.append({"role": "user", "content": "Now write the conclusion following instructions from the cofiguration prompt."})
 		conclusion_response = self.client.chat.completions.create(
-			model="gpt-4o",
+			model=model,
 			messages=conversation_history
 
 		)
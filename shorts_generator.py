@@ -0,0 +1,137 @@
+import hashlib
+import os
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+
+from artifact_store import video_folder
+from channel_profiles import get_channel_profile
+from constants import (
+	AUDIO_EXTENSION, BGM_FOLDER, FONTS_FOLDER, SHORTS_FOLDER, SHORTS_FRAME_FOLDER, SHORTS_HEIGHT,
+	SHORTS_WIDTH, SHORTS_WORKERS, SUBTITLE_EXTENSION, TOPIC_IMAGES_PER_SUBPART, VIDEO_EXTENSION
+)
+from image_selector import load_selection
+
+
+class ShortsGenerator:
+	"""
+	Cuts one vertical Short per main point out of what a finished video already has: the subpart narration
+	(scripts/<title>/<title>_<n>.mp3), its subtitles (<title>_<n>.srt) and the images picked for the subpart
+	(<title>_images.json). Nothing is scripted or narrated again; images are framed to 9:16 once and cached.
+	"""
+
+	def __init__(self, category, formatted_title, progress_callback=None, workers=SHORTS_WORKERS):
+		profile = get_channel_profile(category)
+		self.formatted_title = formatted_title
+		self.logo_path = profile.get("style", {}).get("watermark")
+		self.bgm_path = f"{BGM_FOLDER}/{category}_bgm.mp3"
+		self.progress_callback = progress_callback  # Called as callback(event_type, **data)
+		self.workers = workers
+
+	def subparts(self):
+		"""
+		Artifacts of every main point of the video.
+		:return: [{"index", "audio", "subtitles" (None without subtitles), "images"}]
+		"""
+		selection = load_selection(self.formatted_title)
+		if selection is None:
+			raise FileNotFoundError(f"❌ No image selection recorded for '{self.formatted_title}'. Run the images stage for this video first.")
+
+		subparts = []
+		index = 1
+		while True:
+			base_path = os.path.join(video_folder(self.formatted_title), f"{self.formatted_title}_{index}")
+			if not os.path.exists(base_path + AUDIO_EXTENSION):
+				break
+			subtitles = base_path + SUBTITLE_EXTENSION
+			subparts.append({
+				"index": index,
+				"audio": base_path + AUDIO_EXTENSION,
+				"subtitles": subtitles if os.path.exists(subtitles) and os.path.getsize(subtitles) else None,
+				"images": selection["main_topic"][(index - 1) * TOPIC_IMAGES_PER_SUBPART:index * TOPIC_IMAGES_PER_SUBPART],
+			})
+			index += 1
+
+		if not subparts:
+			raise FileNotFoundError(f"❌ No subpart narration found for '{self.formatted_title}' in {video_folder(self.formatted_title)}")
+		return subparts
+
+	def prepare_frame(self, image_path):
+		"""
+		Fits an image inside a SHORTS_WIDTH x SHORTS_HEIGHT frame over a blurred copy of itself, like
+		convert_vertical_to_horizontal does the other way round. Cached by path, size and modification time.
+		:return: Path of the frame.
+		"""
+		stat = os.stat(image_path)
+		key = hashlib.sha256(f"{os.path.abspath(image_path)}|{stat.st_size}|{stat.st_mtime}|{SHORTS_WIDTH}x{SHORTS_HEIGHT}".encode("utf-8"))
+		frame_path = os.path.join(SHORTS_FRAME_FOLDER, f"{key.hexdigest()[:20]}.jpg")
+		if os.path.exists(frame_path):
+			return frame_path
+
+		from PIL import Image
+		from convert_vertical_to_horizontal import blur_fill
+
+		with Image.open(image_path) as img:
+			img = img.convert("RGB")
+			scale = min(SHORTS_WIDTH / img.width, SHORTS_HEIGHT / img.height)
+			fitted = img.resize((max(1, round(img.width * scale)), max(1, round(img.height * scale))), Image.LANCZOS)
+			frame = blur_fill(fitted, SHORTS_WIDTH, SHORTS_HEIGHT)
+
+		os.makedirs(SHORTS_FRAME_FOLDER, exist_ok=True)
+		temp_path = f"{frame_path}.tmp.jpg"
+		frame.save(temp_path, quality=92)
+		os.replace(temp_path, frame_path)
+		return frame_path
+
+	def prepare_frames(self, image_paths):
+		from video_creators.base_video_creator import VIDEO_EXTENSIONS
+
+		videos = [path for path in image_paths if path.lower().endswith(VIDEO_EXTENSIONS)]
+		if videos:
+			print(f"⚠️ Skipping {len(videos)} video clip(s): Shorts are built from still images only")
+		return [self.prepare_frame(path) for path in image_paths if path not in videos]
+
+	def output_path(self, index):
+		return os.path.join(SHORTS_FOLDER, f"{self.formatted_title}_short_{index}{VIDEO_EXTENSION}")
+
+	def create_short(self, subpart):
+		from video_creators.shorts_video_creator import ShortsVideoCreator
+
+		label = f"Short {subpart['index']}"
+
+		def on_progress(event_type, **data):
+			if self.progress_callback:
+				self.progress_callback(event_type, **(dict(data, label=label) if event_type == "ffmpeg_progress" else data))
+
+		frames = self.prepare_frames(subpart["images"])
+		if not frames:
+			print(f"⚠️ No images for main point {subpart['index']}, skipping its Short")
+			return None
+
+		creator = ShortsVideoCreator(
+			narration_audio=subpart["audio"],
+			subtitle_file=subpart["subtitles"],
+			output_file=self.output_path(subpart["index"]),
+			frames=frames,
+			bgm_audio=self.bgm_path if os.path.exists(self.bgm_path) else None,
+			font_path=FONTS_FOLDER,
+			logo_path=self.logo_path,
+			progress_callback=on_progress
+		)
+		path = creator.create_video()
+		if self.progress_callback:
+			self.progress_callback("short_done", index=subpart["index"], path=path, seconds=round(creator.narration_duration, 1))
+		return path
+
+	def generate(self):
+		"""Renders the Shorts of every main point, SHORTS_WORKERS at a time. :return: Paths of the Shorts."""
+		print(f"✂️ STARTED Shorts creation for: {self.formatted_title}")
+		start_time = time.time()
+		subparts = self.subparts()
+		os.makedirs(SHORTS_FOLDER, exist_ok=True)
+
+		with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="shorts") as executor:
+			paths = [path for path in executor.map(self.create_short, subparts) if path]
+
+		print(f"✅ {len(paths)} Shorts created in {round(time.time() - start_time, 1)} s")
+		return paths
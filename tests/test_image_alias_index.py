@@ -0,0 +1,24 @@
+from image_alias_index import ImageAliasIndex
+
+DATABASE = {
+	"Pin - alfiler": ["pin.jpg"],
+	"Pine - pino": ["pine.jpg"],
+	"Naranja - orange": ["naranja.jpg"],
+	"Orange": ["orange.jpg"],
+	"Tomate - tomato": ["tomate.jpg"],
+}
+
+
+def test_full_folder_name_wins_over_alias():
+	index = ImageAliasIndex(DATABASE)
+	assert index.resolve("orange") == ("Orange", "exact")
+	assert index.resolve("naranja") == ("Naranja - orange", "exact")
+
+
+def test_selection_ignores_near_matches():
+	index = ImageAliasIndex(DATABASE)
+	assert index.resolve("Pines") == ("Pin - alfiler", "fuzzy")  # "pine" and "pin" share a fuzzy key
+	assert index.resolve("Pines", fuzzy=False) == (None, None)
+	assert index.images_for_topic("Pines") == []
+	assert index.images_for_topic("Pine") == ["pine.jpg"]
+	assert index.images_for_topic("Tomates") == []
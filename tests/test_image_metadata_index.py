@@ -0,0 +1,30 @@
+import json
+import os
+
+from PIL import Image
+
+import image_metadata_index
+from convert_vertical_to_horizontal import convert_all_in_folder
+from image_metadata_index import ImageMetadataIndex
+
+
+def make_images(folder, size):
+	os.makedirs(folder)
+	for i in range(2):
+		Image.new("RGB", size, "green").save(os.path.join(folder, f"{i}.jpg"))
+
+
+def test_converter_keeps_entries_saved_by_other_processes(tmp_path, monkeypatch):
+	monkeypatch.chdir(tmp_path)  # IMAGE_METADATA_FILE is relative
+	monkeypatch.setattr(image_metadata_index, "_INDEX", None)
+	make_images("library/tomato", (400, 300))
+	make_images("library/basil", (300, 400))
+
+	image_metadata_index.get_metadata_index()  # This process loads the (empty) sidecar once
+	ImageMetadataIndex(image_db="library").scan(["library/tomato"])  # Another process scans a folder meanwhile
+
+	assert convert_all_in_folder(os.path.abspath("library/basil")) == (2, 0)
+	with open("image_metadata.json", "r", encoding="utf-8") as f:
+		keys = json.load(f)
+	assert sum(1 for key in keys if "tomato" in key) == 2
+	assert all(image_metadata_index.needs_horizontal_conversion(entry) is False for key, entry in keys.items() if "basil" in key)
@@ -0,0 +1,46 @@
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+
+from job_events import JobRegistry, StoredJob
+
+
+def write_log(folder, job_id, pid, events=()):
+	path = os.path.join(folder, f"{job_id}.jsonl")
+	with open(path, "w", encoding="utf-8") as f:
+		header = {"id": job_id, "title": "Title", "category": "test", "created_at": time.time(), "pid": pid, "host": socket.gethostname()}
+		f.write(json.dumps(header) + "\n")
+		for i, event_type in enumerate(events):
+			f.write(json.dumps({"id": i, "type": event_type, "ts": time.time(), "data": {"stage": "tts"}}) + "\n")
+	return path
+
+
+def dead_pid():
+	process = subprocess.Popen([sys.executable, "-c", "pass"])
+	process.wait()
+	return process.pid
+
+
+def test_running_job_of_live_process(tmp_path):
+	job = StoredJob(write_log(tmp_path, "a" * 12, os.getppid(), ["stage"]))
+	assert job.status == "running"
+	assert job.wait_for_events(0, timeout=0.1) == []
+
+
+def test_job_of_dead_process_is_errored(tmp_path):
+	job = StoredJob(write_log(tmp_path, "b" * 12, dead_pid(), ["stage"]))
+	assert job.status == "error"
+	events = job.wait_for_events(-1, timeout=1)
+	assert [event["type"] for event in events] == ["stage", "error"]
+	assert "stopped" in events[-1]["data"]["result"]
+
+
+def test_stale_log_is_errored(tmp_path):
+	path = write_log(tmp_path, "c" * 12, None, ["stage"])
+	stale = time.time() - 3600
+	os.utime(path, (stale, stale))
+	assert StoredJob(path).status == "error"
+	assert JobRegistry(str(tmp_path)).list()[0]["status"] == "error"
@@ -0,0 +1,140 @@
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+from PIL import Image
+from werkzeug.serving import make_server
+
+from conftest import ROOT_DIR
+
+pytestmark = pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="needs ffmpeg")
+
+WORKERS = 3
+SEGMENTS = 6
+SEGMENT_SECONDS = 6
+
+
+@pytest.fixture
+def coordinator(monkeypatch):
+	"""The app's /render/* routes, served on a free local port by a fresh RenderFarm with short heartbeats."""
+	monkeypatch.setenv("OPEN_AI_API_KEY", "test")
+	import app as app_module
+	from render_farm import RenderFarm
+
+	farm = RenderFarm(worker_timeout=2, heartbeat_interval=0.5)
+	monkeypatch.setattr(app_module, "RENDER_FARM", farm)
+	server = make_server("127.0.0.1", 0, app_module.app, threaded=True)
+	threading.Thread(target=server.serve_forever, daemon=True).start()
+	yield farm, f"http://127.0.0.1:{server.server_port}"
+	server.shutdown()
+
+
+def start_worker(url, name, folder):
+	return subprocess.Popen(
+		[sys.executable, os.path.join(ROOT_DIR, "render_worker.py"), "--coordinator", url, "--name", name, "--cache", os.path.join(folder, name)],
+		cwd=folder,
+		env=dict(os.environ, PYTHONPATH=ROOT_DIR),
+		stdout=subprocess.DEVNULL,
+		stderr=subprocess.DEVNULL,
+	)
+
+def wait_until(condition, timeout, message):
+	deadline = time.monotonic() + timeout
+	while time.monotonic() < deadline:
+		result = condition()
+		if result:
+			return result
+		time.sleep(0.05)
+	raise AssertionError(message)
+
+def submit_segments(farm, folder):
+	from video_creators.base_video_creator import BaseVideoCreator
+
+	images = []
+	for index, color in enumerate(["red", "green", "blue"]):
+		path = os.path.join(folder, f"image_{index}.jpg")
+		Image.new("RGB", (1600, 900), color).save(path)
+		images.append(path)
+	timeline = {"background": None, "plate": None, "overlays": []}
+	task_ids, result_paths = [], []
+	for index in range(SEGMENTS):
+		start, end = index * SEGMENT_SECONDS, (index + 1) * SEGMENT_SECONDS
+		sequences = [{"images": images, "start": start, "duration": SEGMENT_SECONDS, "motion": "bounce_vertical"}]
+		spec, paths = BaseVideoCreator.segment_spec(timeline, start, end, sequences, label=f"Segment {index + 1}/{SEGMENTS}")
+		result_paths.append(os.path.join(folder, "segments", f"segment_{index}.mp4"))
+		task_ids.append(farm.submit(spec, paths, result_paths[-1]))
+	return task_ids, result_paths
+
+
+def test_killed_worker_tasks_are_requeued_and_render_completes(coordinator, tmp_path):
+	farm, url = coordinator
+	folder = str(tmp_path)
+	workers = [start_worker(url, f"worker-{index}", folder) for index in range(WORKERS)]
+	try:
+		wait_until(lambda: len(farm.live_workers()) == WORKERS, 60, "workers didn't register")
+		task_ids, result_paths = submit_segments(farm, folder)
+
+		finished = {}
+		waiter = threading.Thread(target=lambda: finished.update(tasks=farm.wait(task_ids)), daemon=True)
+		waiter.start()
+
+		# Kill (SIGKILL: no deregistration, only missed heartbeats) the first worker seen rendering a task.
+		names = {worker["id"]: worker["name"] for worker in farm.live_workers()}
+		victim_task = wait_until(
+			lambda: next((task for task in farm.status()["tasks"] if task["status"] == "assigned"), None),
+			60, "no task was claimed"
+		)
+		victim_id = victim_task["worker_id"]
+		victim_tasks = {task["id"] for task in farm.status()["tasks"] if task["worker_id"] == victim_id}
+		victim = workers[int(names[victim_id].split("-")[1])]
+		victim.send_signal(signal.SIGKILL)
+		victim.wait()
+
+		waiter.join(180)
+		assert not waiter.is_alive(), "render didn't complete"
+		assert victim_id not in {worker["id"] for worker in farm.live_workers()}
+		tasks = {task["id"]: task for task in finished["tasks"]}
+		for task_id in victim_tasks:
+			task = tasks[task_id]
+			assert task["assigned_to"][0] == victim_id
+			assert task["attempts"] >= 2, "the killed worker's task wasn't requeued"
+			assert task["worker_id"] != victim_id
+		for path in result_paths:
+			assert os.path.getsize(path) > 0
+	finally:
+		for worker in workers:
+			if worker.poll() is None:
+				worker.terminate()
+				worker.wait(30)
+
+
+def test_result_from_unassigned_worker_is_rejected(coordinator, tmp_path):
+	import requests
+
+	farm, url = coordinator
+	worker = farm.register_worker("assigned")["worker_id"]
+	intruder = farm.register_worker("intruder")["worker_id"]
+	task_id = farm.submit({"label": "x"}, [], str(tmp_path / "result.mp4"))
+	assert farm.claim(worker)["id"] == task_id
+
+	response = requests.put(f"{url}/render/tasks/{task_id}/result", data=b"data", headers={"X-Worker-Id": intruder}, timeout=10)
+	assert response.status_code == 403
+	response = requests.put(f"{url}/render/tasks/{task_id}/result", data=b"data", headers={"X-Worker-Id": worker}, timeout=10)
+	assert response.json() == {"accepted": True}
+
+
+def test_render_routes_need_a_token_beyond_localhost(coordinator, monkeypatch):
+	import app as app_module
+
+	client = app_module.app.test_client()
+	assert client.get("/render/status").status_code == 200
+	monkeypatch.setattr(app_module, "APP_HOST", "0.0.0.0")
+	assert client.get("/render/status").status_code == 403
+	monkeypatch.setattr(app_module, "RENDER_FARM_TOKEN", "secret")
+	assert client.get("/render/status").status_code == 403
+	assert client.get("/render/status", headers={"X-Render-Token": "secret"}).status_code == 200
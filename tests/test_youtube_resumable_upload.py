@@ -0,0 +1,209 @@
+import http.server
+import json
+import os
+import re
+import threading
+import uuid
+
+import pytest
+from googleapiclient.http import HttpRequest, MediaFileUpload, build_http
+
+import youtube_uploader
+from youtube_uploader import YouTubeUploader
+
+CHUNK_SIZE = 256 * 1024
+VIDEO_SIZE = 4 * CHUNK_SIZE + 1000
+
+
+class FakeUploadServer(http.server.ThreadingHTTPServer):
+	"""
+	Local stand-in for the YouTube resumable upload endpoint: POST starts a session (Location header), PUT sends a
+	chunk ("Content-Range: bytes a-b/total") or asks for the progress ("bytes */total"). Scripted failures replace
+	the next PUT responses: an HTTP status, or "drop" to close the connection without answering.
+	"""
+
+	def __init__(self):
+		super().__init__(("127.0.0.1", 0), FakeUploadHandler)
+		self.sessions = {}  # session id -> bytes received
+		self.failures = []
+		self.requests = []  # (method, Content-Range) of every request
+		self.lock = threading.Lock()
+
+	@property
+	def url(self):
+		return f"http://127.0.0.1:{self.server_port}"
+
+
+class FakeUploadHandler(http.server.BaseHTTPRequestHandler):
+	protocol_version = "HTTP/1.1"
+	timeout = 1  # Like a real server, gives up on a body that never arrives (httplib2 resends a dropped chunk without it).
+
+	def log_message(self, *args):
+		pass
+
+	def reply(self, status, headers=None, body=b""):
+		self.send_response(status)
+		for key, value in (headers or {}).items():
+			self.send_header(key, value)
+		self.send_header("Content-Length", str(len(body)))
+		self.end_headers()
+		self.wfile.write(body)
+
+	def do_POST(self):
+		self.rfile.read(int(self.headers.get("Content-Length") or 0))
+		session_id = uuid.uuid4().hex
+		with self.server.lock:
+			self.server.requests.append(("POST", None))
+			self.server.sessions[session_id] = bytearray()
+		self.reply(200, {"Location": f"{self.server.url}/session/{session_id}"})
+
+	def do_PUT(self):
+		try:
+			body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+		except TimeoutError:
+			self.close_connection = True
+			return
+		content_range = self.headers.get("Content-Range")
+		session_id = self.path.rsplit("/", 1)[-1]
+		with self.server.lock:
+			self.server.requests.append(("PUT", content_range))
+			failure = self.server.failures.pop(0) if self.server.failures else None
+			received = self.server.sessions.get(session_id)
+		if failure == "drop":
+			self.close_connection = True
+			self.connection.shutdown(2)
+			return
+		if failure:
+			return self.reply(failure, {"Content-Type": "application/json"}, b'{"error": {"message": "scripted failure"}}')
+		if received is None:
+			return self.reply(404, {"Content-Type": "application/json"}, b'{"error": {"message": "session expired"}}')
+
+		match = re.fullmatch(r"bytes (\d+)-(\d+)/(\d+)", content_range or "")
+		if match:
+			start, _, total = map(int, match.groups())
+			if start == len(received):
+				received.extend(body)
+		else:
+			total = int(content_range.rsplit("/", 1)[-1])
+		if len(received) >= total:
+			return self.reply(200, {"Content-Type": "application/json"}, json.dumps({"id": "video123"}).encode())
+		self.reply(308, {"Range": f"bytes=0-{len(received) - 1}"} if received else {})
+
+
+@pytest.fixture
+def server():
+	server = FakeUploadServer()
+	threading.Thread(target=server.serve_forever, daemon=True).start()
+	yield server
+	server.shutdown()
+
+@pytest.fixture
+def video(tmp_path, monkeypatch):
+	monkeypatch.chdir(tmp_path)  # upload_sessions/ is relative to the working dir
+	path = tmp_path / "video.mp4"
+	path.write_bytes(os.urandom(VIDEO_SIZE))
+	return str(path)
+
+@pytest.fixture
+def sleeps(monkeypatch):
+	"""Backoff sleeps, recorded instead of slept (jitter pinned to its maximum)."""
+	recorded = []
+	monkeypatch.setattr(youtube_uploader.time, "sleep", recorded.append)
+	monkeypatch.setattr(youtube_uploader.random, "uniform", lambda low, high: high)
+	return recorded
+
+def make_uploader():
+	uploader = YouTubeUploader.__new__(YouTubeUploader)  # No OAuth: the request is built against the fake server.
+	uploader.category = "test"
+	return uploader
+
+def make_request(server, video_path):
+	media = MediaFileUpload(video_path, mimetype="video/mp4", chunksize=CHUNK_SIZE, resumable=True)
+	return HttpRequest(
+		build_http(), lambda response, content: json.loads(content), f"{server.url}/upload?uploadType=resumable",
+		method="POST", body="{}", headers={"content-type": "application/json"}, resumable=media
+	)
+
+def uploaded_bytes(server):
+	(received,) = [bytes(data) for data in server.sessions.values() if len(data) == VIDEO_SIZE]
+	return received
+
+
+class Crash(Exception):
+	pass
+
+
+def test_resumes_persisted_session_after_restart(server, video, sleeps):
+	uploader = make_uploader()
+	session_path = uploader._get_upload_session_path(video)
+
+	def crash_after_two_chunks(uploaded, total, speed):
+		if uploaded >= 2 * CHUNK_SIZE:
+			raise Crash()
+
+	with pytest.raises(Crash):
+		uploader._execute_resumable_upload(make_request(server, video), video, crash_after_two_chunks)
+	assert os.path.exists(session_path)
+	stored_uri = json.load(open(session_path))["resumable_uri"]
+
+	# A new process builds a new request: it must ask the stored session for its progress, not start over.
+	server.requests.clear()
+	progress = []
+	response = make_uploader()._execute_resumable_upload(make_request(server, video), video, lambda uploaded, total, speed: progress.append(uploaded))
+
+	assert response == {"id": "video123"}
+	assert server.requests[0] == ("PUT", f"bytes */{VIDEO_SIZE}")  # Status query: relies on HttpRequest._in_error_state
+	assert ("POST", None) not in server.requests
+	assert server.requests[1] == ("PUT", f"bytes {2 * CHUNK_SIZE}-{3 * CHUNK_SIZE - 1}/{VIDEO_SIZE}")
+	assert stored_uri.endswith(next(session_id for session_id, data in server.sessions.items() if len(data) == VIDEO_SIZE))
+	assert uploaded_bytes(server) == open(video, "rb").read()
+	assert progress[0] == 3 * CHUNK_SIZE and progress[-1] == VIDEO_SIZE  # The status query and next chunk are one next_chunk() call
+	assert not os.path.exists(session_path)
+	assert sleeps == []
+
+
+def test_retries_server_errors_with_capped_backoff(server, video, sleeps, monkeypatch):
+	monkeypatch.setattr(youtube_uploader, "UPLOAD_MAX_BACKOFF", 8)
+	server.failures = [503, 500, 502, 504, 503]
+
+	response = make_uploader()._execute_resumable_upload(make_request(server, video), video)
+
+	assert response == {"id": "video123"}
+	assert sleeps == [2, 4, 8, 8, 8]
+	assert uploaded_bytes(server) == open(video, "rb").read()
+
+
+def test_retries_dropped_connections(server, video, sleeps):
+	server.failures = ["drop"] * 4  # httplib2 resends once on its own; the rest reaches the retry loop
+
+	response = make_uploader()._execute_resumable_upload(make_request(server, video), video)
+
+	assert response == {"id": "video123"}
+	assert len(sleeps) >= 1
+	assert uploaded_bytes(server) == open(video, "rb").read()
+
+
+def test_gives_up_after_max_retries(server, video, sleeps, monkeypatch):
+	monkeypatch.setattr(youtube_uploader, "UPLOAD_MAX_RETRIES", 3)
+	server.failures = [503] * 10
+
+	with pytest.raises(RuntimeError, match="after 3 retries"):
+		make_uploader()._execute_resumable_upload(make_request(server, video), video)
+	assert len(sleeps) == 3
+
+
+@pytest.mark.parametrize("status", [404, 410])
+def test_expired_session_starts_a_new_one(server, video, sleeps, status):
+	uploader = make_uploader()
+	session_path = uploader._get_upload_session_path(video)
+	uploader._save_upload_session(session_path, video, f"{server.url}/session/expired")
+	server.failures = [status]
+
+	response = uploader._execute_resumable_upload(make_request(server, video), video)
+
+	assert response == {"id": "video123"}
+	assert server.requests[0] == ("PUT", f"bytes */{VIDEO_SIZE}")
+	assert server.requests[1] == ("POST", None)
+	assert uploaded_bytes(server) == open(video, "rb").read()
+	assert not os.path.exists(session_path)
+	assert sleeps == []
@@ -0,0 +1,314 @@
+"""
+Thumbnail engine: composes the video title (Heavitas), a topic image and the channel branding (brand color,
+watermark) into THUMBNAIL_WIDTH x THUMBNAIL_HEIGHT thumbnails, several variants per title for A/B testing.
+
+Usage:
+	python thumbnail_engine.py manifest.json [--workers 4] [--variants 3]
+
+manifest.json lists the videos: [{"title": "...", "category": "gardening", "images": [optional image paths], "text": optional]
+Without "images", the images recorded for the video by the images stage are used.
+"""
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import time
+
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+from channel_profiles import get_channel_profile
+from constants import (
+	THUMBNAIL_CACHE_FOLDER, THUMBNAIL_FOLDER, THUMBNAIL_FONT_FILE, THUMBNAIL_HEIGHT, THUMBNAIL_TIME_BUDGET,
+	THUMBNAIL_VARIANT_FOLDER, THUMBNAIL_VARIANTS, THUMBNAIL_WIDTH, THUMBNAIL_WORKERS, TOPIC_IMAGES_PER_SUBPART
+)
+from utils import format_title
+
+LAYOUTS = ("left", "bottom", "right")  # Variant a, b, c...: where the title sits
+ACCENTS = ((255, 214, 0), (255, 140, 40), (140, 235, 90))  # Color of the first title line per variant
+DEFAULT_BRAND_COLOR = "#101010"
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp")
+MARGIN = 56
+MAX_FONT_SIZE = 132
+MIN_FONT_SIZE = 44
+FONT_SIZE_STEP = 8
+LINE_SPACING = 0.1  # of the font size
+STROKE_RATIO = 0.06  # outline width, of the font size
+LOGO_WIDTH = 220
+
+
+# 🔤 Text. Fonts, word widths and rasterized lines are cached per worker process: titles of a manifest share sizes
+# and words, and the variants of a title often lay out the same lines.
+
+@lru_cache(maxsize=None)
+def get_font(size):
+	from PIL import ImageFont
+	return ImageFont.truetype(THUMBNAIL_FONT_FILE, size)
+
+@lru_cache(maxsize=4096)
+def text_width(text, size):
+	return get_font(size).getlength(text)
+
+@lru_cache(maxsize=None)
+def line_pitch(size):
+	ascent, _ = get_font(size).getmetrics()
+	return ascent + round(size * LINE_SPACING)
+
+@lru_cache(maxsize=256)
+def render_line(text, size, fill):
+	"""Rasterized title line with its outline (RGBA, shared: don't modify it)."""
+	from PIL import Image, ImageDraw
+
+	font = get_font(size)
+	stroke = max(2, round(size * STROKE_RATIO))
+	left, _, right, _ = font.getbbox(text, stroke_width=stroke)
+	ascent, descent = font.getmetrics()
+	line = Image.new("RGBA", (right - left, ascent + descent + 2 * stroke))
+	ImageDraw.Draw(line).text((-left, stroke), text, font=font, fill=fill, stroke_width=stroke, stroke_fill=(0, 0, 0))
+	return line
+
+def wrap_words(words, size, max_width):
+	lines = []
+	for word in words:
+		candidate = f"{lines[-1]} {word}" if lines else word
+		if lines and text_width(candidate, size) <= max_width:
+			lines[-1] = candidate
+		else:
+			lines.append(word)
+	return lines
+
+def fit_title(text, box_width, box_height):
+	"""Largest font size at which the title fits the box. :return: (size, lines)"""
+	words = text.upper().split()
+	for size in range(MAX_FONT_SIZE, MIN_FONT_SIZE - 1, -FONT_SIZE_STEP):
+		lines = wrap_words(words, size, box_width)
+		if len(lines) * line_pitch(size) <= box_height and all(text_width(line, size) <= box_width for line in lines):
+			return size, lines
+	return MIN_FONT_SIZE, wrap_words(words, MIN_FONT_SIZE, box_width)
+
+
+# 🖼️ Images
+
+def source_key(image_path):
+	stat = os.stat(image_path)
+	key = f"{os.path.abspath(image_path)}|{stat.st_size}|{stat.st_mtime}|{THUMBNAIL_WIDTH}x{THUMBNAIL_HEIGHT}"
+	return hashlib.sha256(key.encode("utf-8")).hexdigest()[:20]
+
+@lru_cache(maxsize=32)
+def load_background(image_path, key):
+	"""Topic image cropped and scaled to the thumbnail size, cached in THUMBNAIL_CACHE_FOLDER and in memory."""
+	from PIL import Image, ImageOps
+
+	cached_path = os.path.join(THUMBNAIL_CACHE_FOLDER, f"{key}.jpg")
+	if os.path.exists(cached_path):
+		with Image.open(cached_path) as img:
+			return img.convert("RGB")
+
+	with Image.open(image_path) as img:
+		background = ImageOps.fit(img.convert("RGB"), (THUMBNAIL_WIDTH, THUMBNAIL_HEIGHT), Image.LANCZOS)
+	os.makedirs(THUMBNAIL_CACHE_FOLDER, exist_ok=True)
+	temp_path = f"{cached_path}.{os.getpid()}.tmp.jpg"
+	background.save(temp_path, quality=95)
+	os.replace(temp_path, cached_path)
+	return background
+
+@lru_cache(maxsize=8)
+def load_logo(logo_path, mtime):
+	from PIL import Image
+
+	with Image.open(logo_path) as logo:
+		logo = logo.convert("RGBA")
+		return logo.resize((LOGO_WIDTH, max(1, round(logo.height * LOGO_WIDTH / logo.width))), Image.LANCZOS)
+
+@lru_cache(maxsize=16)
+def brand_panel(layout, color):
+	"""Brand colored gradient behind the title: opaque on the text side, fading into the image."""
+	from PIL import Image
+
+	gradient = Image.linear_gradient("L")  # Black at the top, white at the bottom
+	if layout == "bottom":
+		mask = gradient.point(lambda v: max(0, min(230, (v - 110) * 230 // 70)))
+	else:
+		gradient = gradient.rotate(90)  # Black on the left
+		if layout == "right":
+			gradient = gradient.transpose(Image.FLIP_LEFT_RIGHT)
+		mask = gradient.point(lambda v: max(0, min(230, (180 - v) * 230 // 80)))
+
+	panel = Image.new("RGBA", (THUMBNAIL_WIDTH, THUMBNAIL_HEIGHT), color)
+	panel.putalpha(mask.resize((THUMBNAIL_WIDTH, THUMBNAIL_HEIGHT)))
+	return panel
+
+def text_box(layout):
+	""":return: (left, top, right, bottom, alignment) of the title area."""
+	if layout == "left":
+		return MARGIN, MARGIN, int(THUMBNAIL_WIDTH * 0.56), THUMBNAIL_HEIGHT - MARGIN, "left"
+	if layout == "right":
+		return int(THUMBNAIL_WIDTH * 0.44), MARGIN, THUMBNAIL_WIDTH - MARGIN, THUMBNAIL_HEIGHT - MARGIN, "right"
+	return MARGIN, int(THUMBNAIL_HEIGHT * 0.52), THUMBNAIL_WIDTH - MARGIN, THUMBNAIL_HEIGHT - MARGIN // 2, "center"
+
+
+# 🧩 Rendering (worker processes)
+
+def render_variant(job, index):
+	"""
+	Renders one variant of a thumbnail job. The drop shadow is optional: it's skipped once half of the time budget
+	is spent, so a slow image doesn't push the thumbnail over budget.
+	:return: {"title", "variant", "path", "seconds", "degraded", "over_budget"}
+	"""
+	from PIL import Image, ImageFilter
+
+	start = time.perf_counter()
+	layout = LAYOUTS[index % len(LAYOUTS)]
+	image_path = job["images"][index % len(job["images"])]
+	canvas = load_background(image_path, source_key(image_path)).convert("RGBA")
+	canvas.alpha_composite(brand_panel(layout, tuple(job["brand_color"])))
+
+	left, top, right, bottom, alignment = text_box(layout)
+	size, lines = fit_title(job["text"], right - left, bottom - top)
+	pitch = line_pitch(size)
+	y = top + (bottom - top - len(lines) * pitch) // 2
+	placed = []
+	for line_index, line in enumerate(lines):
+		fill = ACCENTS[index % len(ACCENTS)] if line_index == 0 else (255, 255, 255)
+		raster = render_line(line, size, fill)
+		if alignment == "left":
+			x = left
+		elif alignment == "right":
+			x = right - raster.width
+		else:
+			x = left + (right - left - raster.width) // 2
+		placed.append((raster, x, y + line_index * pitch))
+
+	degraded = time.perf_counter() - start > job["time_budget"] / 2
+	if not degraded:
+		shadow = Image.new("L", canvas.size)
+		for raster, x, line_y in placed:
+			shadow.paste(raster.getchannel("A"), (x + 6, line_y + 6), raster.getchannel("A"))
+		shadow = shadow.filter(ImageFilter.GaussianBlur(8)).point(lambda v: v * 3 // 4)
+		canvas.alpha_composite(Image.merge("RGBA", (*Image.new("RGB", canvas.size).split(), shadow)))
+	for raster, x, line_y in placed:
+		canvas.alpha_composite(raster, (x, line_y))
+
+	if job["logo"]:
+		logo = load_logo(job["logo"], os.path.getmtime(job["logo"]))
+		logo_x = THUMBNAIL_WIDTH - MARGIN // 2 - logo.width if layout == "left" else MARGIN // 2
+		canvas.alpha_composite(logo, (logo_x, MARGIN // 2))
+
+	variant = chr(ord("a") + index)
+	path = os.path.join(THUMBNAIL_VARIANT_FOLDER, f"{job['formatted_title']}_{variant}.jpg")
+	os.makedirs(THUMBNAIL_VARIANT_FOLDER, exist_ok=True)
+	temp_path = f"{path}.{os.getpid()}.tmp.jpg"
+	canvas.convert("RGB").save(temp_path, quality=90)
+	os.replace(temp_path, path)
+
+	seconds = time.perf_counter() - start
+	return {
+		"title": job["title"],
+		"variant": variant,
+		"path": path,
+		"seconds": round(seconds, 3),
+		"degraded": degraded,
+		"over_budget": seconds > job["time_budget"],
+	}
+
+def render_thumbnails(job):
+	"""Every variant of one title, in one worker so they share the cached images and text rasters."""
+	return [render_variant(job, index) for index in range(job["variants"])]
+
+
+# 📋 Manifests (main process)
+
+def thumbnail_job(entry, variants=THUMBNAIL_VARIANTS, time_budget=THUMBNAIL_TIME_BUDGET):
+	"""
+	Resolves a manifest entry into the plain data a worker process renders from: channel branding from the profile,
+	and the topic images (the entry's, or the ones recorded for the video by the images stage).
+	:raises FileNotFoundError: When the entry has no usable image.
+	"""
+	from image_selector import load_selection
+
+	formatted_title = format_title(entry["title"])
+	style = get_channel_profile(entry["category"]).get("style", {})
+	images = entry.get("images")
+	if not images:
+		selection = load_selection(formatted_title)
+		if selection is None:
+			raise FileNotFoundError(f"❌ No images given or recorded for '{entry['title']}'")
+		# The intro has one image per main point; then the first image of every subpart.
+		images = selection["intro"] + selection["main_topic"][::TOPIC_IMAGES_PER_SUBPART]
+	images = [path for path in images if path.lower().endswith(IMAGE_EXTENSIONS) and os.path.exists(path)]
+	if not images:
+		raise FileNotFoundError(f"❌ No usable image for '{entry['title']}'")
+
+	brand_color = style.get("brand_color", DEFAULT_BRAND_COLOR).lstrip("#")
+	logo = style.get("watermark")
+	return {
+		"title": entry["title"],
+		"formatted_title": formatted_title,
+		"text": entry.get("text") or entry["title"],
+		"images": images[:variants],
+		"logo": logo if logo and os.path.exists(logo) else None,
+		"brand_color": [int(brand_color[i:i + 2], 16) for i in (0, 2, 4)],
+		"variants": variants,
+		"time_budget": time_budget,
+	}
+
+def generate_thumbnails(entries, workers=THUMBNAIL_WORKERS, variants=THUMBNAIL_VARIANTS, progress_callback=None):
+	"""
+	Renders the variants of every manifest entry across a process pool (in this process for a single entry).
+	Variant "a" is copied to thumbnails/<title>.jpg, the upload thumbnail, unless a hand-made one is there.
+	:return: Variant results (see render_variant) plus {"title", "error"} for entries that couldn't be rendered.
+	"""
+	print(f"🖼️ STARTED thumbnails for {len(entries)} title(s), {variants} variant(s) each")
+	start_time = time.time()
+	results = []
+	jobs = []
+	for entry in entries:
+		try:
+			jobs.append(thumbnail_job(entry, variants=variants))
+		except (FileNotFoundError, KeyError, ValueError) as e:
+			print(f"⚠️ Skipping thumbnail of {entry.get('title')}: {e}")
+			results.append({"title": entry.get("title"), "error": str(e)})
+
+	if len(jobs) > 1 and workers != 1:
+		executor = ProcessPoolExecutor(max_workers=workers)
+		rendered = executor.map(render_thumbnails, jobs)
+	else:
+		executor = None
+		rendered = map(render_thumbnails, jobs)
+	try:
+		for job, variant_results in zip(jobs, rendered):
+			primary_path = os.path.join(THUMBNAIL_FOLDER, f"{job['formatted_title']}.jpg")
+			if not os.path.exists(primary_path):
+				os.makedirs(THUMBNAIL_FOLDER, exist_ok=True)
+				shutil.copyfile(variant_results[0]["path"], primary_path)
+			results.extend(variant_results)
+			if progress_callback:
+				progress_callback("thumbnail_done", title=job["title"], variants=[result["path"] for result in variant_results])
+	finally:
+		if executor:
+			executor.shutdown()
+
+	rendered_results = [result for result in results if "path" in result]
+	over_budget = [result for result in rendered_results if result["over_budget"]]
+	for result in over_budget:
+		print(f"⚠️ Thumbnail over the {THUMBNAIL_TIME_BUDGET}s budget: {result['path']} ({result['seconds']}s)")
+	slowest = max((result["seconds"] for result in rendered_results), default=0)
+	print(f"✅ {len(rendered_results)} thumbnails in {round(time.time() - start_time, 1)} s (slowest {slowest}s, {len(over_budget)} over budget)")
+	return results
+
+
+def main():
+	parser = argparse.ArgumentParser(description="Render thumbnail variants for a manifest of videos.")
+	parser.add_argument("manifest", help='JSON file: [{"title": ..., "category": ..., "images": [optional]}]')
+	parser.add_argument("--workers", type=int, default=THUMBNAIL_WORKERS, help="Worker processes (default: one per CPU).")
+	parser.add_argument("--variants", type=int, default=THUMBNAIL_VARIANTS)
+	args = parser.parse_args()
+	with open(args.manifest, "r", encoding="utf-8") as f:
+		entries = json.load(f)
+	results = generate_thumbnails(entries, workers=args.workers, variants=args.variants)
+	if any("error" in result for result in results):
+		raise SystemExit(1)
+
+if __name__ == "__main__":
+	main()
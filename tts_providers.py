@@ -0,0 +1,264 @@
+"""
+Narration backends of TTSEngine, registered in plugin_registry.TTS_PROVIDERS. Each provider imports its client library
+on first use, so a channel only needs the library of the provider it narrates with.
+"""
+import os
+import subprocess
+import sys
+
+import ffmpeg
+
+from artifact_store import video_folder
+from constants import SCRIPT_EXTENSION, SUBTITLE_EXTENSION
+
+
+def split_text_by_bytes(text, max_bytes=5000):
+	parts = []
+	current_part = ''
+	for char in text:
+		if len((current_part + char).encode('utf-8')) > max_bytes:
+			parts.append(current_part)
+			current_part = char
+		else:
+			current_part += char
+	if current_part:
+		parts.append(current_part)
+	return parts
+
+def _srt_time_to_seconds(srt_time):
+	h, m, s_ms = srt_time.split(":")
+	s, ms = s_ms.split(",")
+	return int(h) * 3600 + int(m) * 60 + int(s) + int(ms) / 1000
+
+def _seconds_to_srt_time(seconds):
+	h = int(seconds // 3600)
+	m = int((seconds % 3600) // 60)
+	s = int(seconds % 60)
+	ms = int((seconds - int(seconds)) * 1000)
+	return f"{h:02}:{m:02}:{s:02},{ms:03}"
+
+def _read_script(script_path, provider_name):
+	text = open(script_path, 'r', encoding='utf-8').read().strip()
+	if not text:
+		raise ValueError(f"❌ Script is empty. Cannot send to {provider_name}.")
+	return text
+
+def _write_empty_subtitles(script_path):
+	srt_path = script_path.replace(SCRIPT_EXTENSION, SUBTITLE_EXTENSION)
+	with open(srt_path, "w", encoding="utf-8") as f:
+		f.write("")  # This provider doesn't generate subtitles
+	return srt_path
+
+
+class TTSProvider:
+	"""
+	Narrates the scripts of one TTSEngine (voice, rate and locale are read from it).
+	synthesize_subpart narrates one subpart script; synthesize produces the full narration and its subtitles.
+	"""
+	name = None
+
+	def __init__(self, engine):
+		self.engine = engine
+
+	async def synthesize_subpart(self, sub, script_path, text, audio_path):
+		raise RuntimeError(f"❌ {self.name} TTS doesn't narrate subparts separately.")
+
+	async def synthesize(self, script_path, audio_path, srt_path, formatted_title, main_points_amount):
+		""":return: (audio path, subtitles path)"""
+		raise NotImplementedError
+
+
+class EdgeTTSProvider(TTSProvider):
+	"""Narrates every subpart with edge-tts (audio and word-timed subtitles), then joins them."""
+	name = "Edge"
+
+	def load_client(self):
+		import edge_tts
+		return edge_tts
+
+	async def synthesize_subpart(self, sub, script_path, text, audio_path):
+		edge_tts = self.load_client()
+		communicate = edge_tts.Communicate(text, self.engine.voice, rate=self.engine.rate)
+		submaker = edge_tts.SubMaker()
+		audio_bytes = bytearray()
+
+		async for chunk in communicate.stream():
+			if chunk["type"] == "audio":
+				audio_bytes.extend(chunk["data"])
+			elif chunk["type"] == "WordBoundary":
+				submaker.feed(chunk)
+
+		submaker.merge_cues(words=10)
+
+		with open(audio_path, "wb") as f:
+			f.write(audio_bytes)
+
+		if sub == "_intro":
+			amplified_path = audio_path.replace(".mp3", "_amplified.mp3")
+			ffmpeg.input(audio_path).filter("volume", volume=3).output(amplified_path).overwrite_output().run()
+			os.replace(amplified_path, audio_path)
+
+		# ✅ Save individual subtitle file
+		subpart_srt_path = audio_path.replace(".mp3", ".srt")
+		with open(subpart_srt_path, "w", encoding="utf-8") as f:
+			f.write(submaker.get_srt())
+
+	async def synthesize(self, script_path, audio_path, srt_path, formatted_title, main_points_amount):
+		subparts = ["_intro"] + [f"_{i}" for i in range(1, main_points_amount+1)] + ["_conclusion"]
+
+		audio_paths = []
+		srt_entries = []
+		current_offset = 0.0
+
+		for sub in subparts:
+			sub_audio = os.path.join(video_folder(formatted_title), formatted_title + sub + ".mp3")
+			sub_srt = sub_audio.replace(".mp3", ".srt")
+
+			if not os.path.exists(sub_audio) or not os.path.exists(sub_srt):
+				break
+
+			audio_paths.append(sub_audio)
+
+			with open(sub_srt, "r", encoding="utf-8") as f:
+				entries = f.read().strip().split("\n\n")
+				for entry in entries:
+					if not entry.strip():
+						continue
+					lines = entry.strip().splitlines()
+					if len(lines) < 3:
+						continue
+					index = lines[0]
+					times = lines[1]
+					text = "\n".join(lines[2:])
+
+					start, end = times.split(" --> ")
+					start_sec = _srt_time_to_seconds(start) + current_offset
+					end_sec = _srt_time_to_seconds(end) + current_offset
+
+					srt_entries.append((start_sec, end_sec, text))
+
+				# ✅ update offset
+				probe = ffmpeg.probe(sub_audio)
+				current_offset += float(probe["format"]["duration"])
+		concat_txt_path = os.path.join(video_folder(formatted_title), f"{formatted_title}_concat_list.txt")
+		with open(concat_txt_path, "w", encoding="utf-8") as f:
+			for path in audio_paths:
+				# use caminho absoluto e padronizado
+				abs_path = os.path.abspath(path).replace("\\", "/")
+				f.write(f"file '{abs_path}'\n")
+
+		ffmpeg.input(concat_txt_path, format="concat", safe=0) \
+			.output(audio_path, ar=44100, ac=2, acodec="libmp3lame", audio_bitrate="192k") \
+			.global_args("-fflags", "+genpts") \
+			.run(overwrite_output=True)
+
+		# os.remove(concat_txt_path)
+
+		with open(srt_path, "w", encoding="utf-8") as f:
+			for i, (start, end, text) in enumerate(srt_entries, 1):
+				f.write(f"{i}\n")
+				f.write(f"{_seconds_to_srt_time(start)} --> {_seconds_to_srt_time(end)}\n")
+				f.write(f"{text}\n\n")
+		return audio_path, srt_path
+
+
+class OpenVoiceTTSProvider(TTSProvider):
+	"""Runs the OpenVoice inference script in a child process (no subtitles)."""
+	name = "OpenVoice"
+
+	async def synthesize_subpart(self, sub, script_path, text, audio_path):
+		reference_speaker = OPENVOICE_SPEAKER_EMBEDDING
+		cmd = [
+			sys.executable,
+			str(OPENVOICE_INFERENCE_SCRIPT),
+			"--text", script_path,
+			"--reference_speaker", reference_speaker,
+			"--output", audio_path
+		]
+		subprocess.run(cmd, check=True)
+
+	async def synthesize(self, script_path, audio_path, srt_path, formatted_title, main_points_amount):
+		print(f"🧪 OpenVoice - Reading from: {script_path}")
+		text = _read_script(script_path, self.name)
+
+		# Save raw text to temp txt file (if OpenVoice requires it)
+		temp_text_path = script_path.replace(".txt", "_openvoice.txt")
+		with open(temp_text_path, 'w', encoding='utf-8') as f:
+			f.write(text)
+
+		try:
+			# Run inference using subprocess (you can adapt to your wrapper if needed)
+			cmd = [
+				sys.executable,
+				str(OPENVOICE_INFERENCE_SCRIPT),
+				"--text", temp_text_path,
+				"--reference_speaker", OPENVOICE_SPEAKER_EMBEDDING,
+				"--output", audio_path,
+				"--config_path", "C:/OpenVoice-main/checkpoints/converter/config.json",
+				"--checkpoint_path", "C:/OpenVoice-main/checkpoints/converter/checkpoint.pth"
+			]
+			subprocess.run(cmd, check=True)
+			print(f"🎧 OpenVoice audio saved to {audio_path}")
+		except subprocess.CalledProcessError as e:
+			print(f"❌ OpenVoice failed: {e}")
+			raise e  # force the engine to stop on failure
+
+		if not os.path.exists(audio_path):
+			raise RuntimeError("❌ OpenVoice failed to produce audio. Aborting.")
+		return audio_path, _write_empty_subtitles(script_path)
+
+
+class GoogleTTSProvider(TTSProvider):
+	"""Google Cloud Text-to-Speech, in requests of at most 5000 bytes (no subtitles)."""
+	name = "Google TTS"
+
+	def load_client(self):
+		from google.cloud import texttospeech
+		return texttospeech
+
+	async def synthesize(self, script_path, audio_path, srt_path, formatted_title, main_points_amount):
+		print(f"🎧 Google TTS - Reading text from: {script_path}")
+		text = _read_script(script_path, self.name)
+
+		texttospeech = self.load_client()
+		client = texttospeech.TextToSpeechClient.from_service_account_file(GOOGLE_APPLICATION_CREDENTIALS)
+		voice = texttospeech.VoiceSelectionParams(language_code=self.engine.locale, name=self.engine.voice)
+		audio_config = texttospeech.AudioConfig(audio_encoding=texttospeech.AudioEncoding.MP3)
+
+		# Split text into parts under 5000 bytes
+		parts = split_text_by_bytes(text, max_bytes=5000)
+		with open(audio_path, "wb") as out:
+			for idx, part in enumerate(parts):
+				synthesis_input = texttospeech.SynthesisInput(text=part)
+				response = client.synthesize_speech(input=synthesis_input, voice=voice, audio_config=audio_config)
+				out.write(response.audio_content)
+				print(f"🎧 Part {idx+1}/{len(parts)} generated and written.")
+		print(f"🎧 Google TTS audio saved to {audio_path}")
+		return audio_path, _write_empty_subtitles(script_path)
+
+
+class KokoroTTSProvider(TTSProvider):
+	"""Kokoro's OpenAI-compatible speech endpoint (no subtitles)."""
+	name = "Kokoro"
+
+	def load_client(self):
+		import aiohttp
+		return aiohttp
+
+	async def synthesize(self, script_path, audio_path, srt_path, formatted_title, main_points_amount):
+		print(f"🧠 Kokoro - Reading text from: {script_path}")
+		text = _read_script(script_path, self.name)
+
+		aiohttp = self.load_client()
+		timeout = aiohttp.ClientTimeout(total=300)
+		async with aiohttp.ClientSession(timeout=timeout) as session:
+			response = await session.post(
+				f"{KOKORO_API_URL}/v1/audio/speech",
+				json={"input": text, "voice": self.engine.voice, "response_format": "mp3", "speed": 1.1}
+			)
+			if response.status != 200:
+				raise RuntimeError(f"Kokoro TTS failed: {response.status} - {await response.text()}")
+			with open(audio_path, 'wb') as f:
+				f.write(await response.read())
+		print(f"🎧 Kokoro audio saved to {audio_path}")
+		return audio_path, _write_empty_subtitles(script_path)
@@ -0,0 +1,383 @@
+import datetime
+import os
+import threading
+import time
+import traceback
+import uuid
+
+from channel_profiles import get_channel_profile
+from constants import (
+	UPLOAD_BANDWIDTH_WINDOWS, UPLOAD_CADENCE, UPLOAD_MAX_ATTEMPTS, UPLOAD_MAX_BANDWIDTH, UPLOAD_MAX_CONCURRENT,
+	UPLOAD_MIN_LEAD_TIME, UPLOAD_QUEUE_FILE, UPLOAD_QUOTA_FILE, YOUTUBE_DAILY_QUOTA, YOUTUBE_QUOTA_COSTS
+)
+from plugin_registry import UPLOADERS
+from utils import atomic_write_json, file_lock, read_json
+
+try:
+	from zoneinfo import ZoneInfo
+	QUOTA_TIMEZONE = ZoneInfo("America/Los_Angeles")  # YouTube quota resets at midnight Pacific time.
+except Exception:
+	QUOTA_TIMEZONE = datetime.timezone(datetime.timedelta(hours=-8))
+
+DISPATCH_INTERVAL = 10  # seconds between queue scans (also how soon jobs queued by other server processes start)
+RETRY_DELAY = 15 * 60  # seconds before a failed upload is attempted again
+
+
+class BandwidthLimiter:
+	"""Token bucket shared by every upload thread, capping the combined upload rate."""
+
+	def __init__(self, max_bytes_per_second=UPLOAD_MAX_BANDWIDTH, windows=UPLOAD_BANDWIDTH_WINDOWS):
+		self.max_bytes_per_second = max_bytes_per_second
+		self.windows = windows
+		self._lock = threading.Lock()
+		self._available_at = 0.0
+
+	def current_limit(self):
+		hour = datetime.datetime.now().hour
+		for start_hour, end_hour, bytes_per_second in self.windows:
+			if start_hour <= hour < end_hour:
+				return bytes_per_second
+		return self.max_bytes_per_second
+
+	def consume(self, sent_bytes):
+		"""Sleeps long enough that the bytes just sent keep all uploads under the current limit."""
+		limit = self.current_limit()
+		if not limit or sent_bytes <= 0:
+			return
+
+		with self._lock:
+			now = time.time()
+			self._available_at = max(self._available_at, now) + sent_bytes / limit
+			wait = self._available_at - now
+		if wait > 0:
+			time.sleep(wait)
+
+
+class QuotaLedger:
+	"""Persists the YouTube API quota units spent per channel on the current quota day."""
+
+	def __init__(self, ledger_path=UPLOAD_QUOTA_FILE, daily_quota=YOUTUBE_DAILY_QUOTA):
+		self.ledger_path = ledger_path
+		self.daily_quota = daily_quota
+		self._lock = threading.Lock()
+		self.ledger = {}
+		self._mtime = None
+		self._reload()
+
+	def _reload(self):
+		"""Re-reads the ledger if another process spent quota since."""
+		try:
+			mtime = os.stat(self.ledger_path).st_mtime
+		except FileNotFoundError:
+			return
+		if mtime != self._mtime:
+			self.ledger = read_json(self.ledger_path, {})
+			self._mtime = mtime
+
+	@staticmethod
+	def quota_day():
+		return datetime.datetime.now(QUOTA_TIMEZONE).date().isoformat()
+
+	@staticmethod
+	def next_reset():
+		"""Unix timestamp of the next quota reset."""
+		now = datetime.datetime.now(QUOTA_TIMEZONE)
+		tomorrow = (now + datetime.timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+		return tomorrow.timestamp()
+
+	def used(self, category):
+		self._reload()
+		entry = self.ledger.get(category, {})
+		return entry.get("units", 0) if entry.get("day") == self.quota_day() else 0
+
+	def remaining(self, category):
+		return self.daily_quota - self.used(category)
+
+	def spend(self, category, units):
+		with self._lock, file_lock(self.ledger_path):
+			self.ledger[category] = {"day": self.quota_day(), "units": self.used(category) + units}
+			atomic_write_json(self.ledger_path, self.ledger)
+			self._mtime = os.stat(self.ledger_path).st_mtime
+
+
+class UploadScheduler:
+	"""
+	Persistent upload queue that spreads YouTube uploads over time.
+	Jobs wait until their channel has enough daily quota left, at most UPLOAD_MAX_CONCURRENT uploads run at once,
+	and all uploads share one bandwidth budget. Jobs without a publish date get the next free slot from the
+	channel cadence.
+	Every server process can queue uploads; only the one that called start() dispatches them and changes their
+	status. The queue file is shared under a file lock.
+	"""
+
+	def __init__(self, queue_path=UPLOAD_QUEUE_FILE, max_concurrent=UPLOAD_MAX_CONCURRENT, quota_ledger=None, bandwidth_limiter=None):
+		self.queue_path = queue_path
+		self.max_concurrent = max_concurrent
+		self.quota_ledger = quota_ledger or QuotaLedger()
+		self.bandwidth_limiter = bandwidth_limiter or BandwidthLimiter()
+		self._lock = threading.RLock()
+		self._wake_up = threading.Event()
+		self._thread = None
+		self._listeners = {}
+		self.jobs = read_json(queue_path, [])
+
+	@property
+	def dispatching(self):
+		return self._thread is not None
+
+	def _refresh_jobs(self):
+		"""
+		Picks up the queue file. The dispatching process keeps its own copy of the jobs it knows (it is the only one
+		changing them) and adds the ones other processes queued; other processes take the file as it is.
+		"""
+		with self._lock:
+			stored = read_json(self.queue_path, [])
+			if self.dispatching:
+				known = {job["id"] for job in self.jobs}
+				self.jobs.extend(job for job in stored if job["id"] not in known)
+			else:
+				self.jobs = stored
+
+	def _save_jobs(self):
+		with self._lock, file_lock(self.queue_path):
+			self._refresh_jobs()
+			atomic_write_json(self.queue_path, self.jobs)
+
+	def start(self):
+		"""Starts the dispatcher thread. Call it in one process only (see app.start_background_services)."""
+		with self._lock:
+			if self.dispatching:
+				return
+			self._thread = threading.Thread(target=self._run, name="upload-scheduler", daemon=True)
+			with file_lock(self.queue_path):
+				self.jobs = read_json(self.queue_path, [])
+				# Uploads interrupted by a crash go back to the queue; their resumable session continues the transfer.
+				for job in self.jobs:
+					if job["status"] == "uploading":
+						job["status"] = "queued"
+				atomic_write_json(self.queue_path, self.jobs)
+			self._thread.start()
+		print(f"📅 Upload scheduler started with {len([j for j in self.jobs if j['status'] == 'queued'])} queued uploads.")
+
+	def enqueue(self, category, video_path, title, description, tags, thumbnail_path=None, playlist_ids=None, publish_at=None):
+		"""
+		Adds an upload to the persistent queue.
+		:param publish_at: (Optional) ISO 8601 publish time. When omitted, the next free cadence slot is used.
+		:return: The queued job.
+		"""
+		with self._lock, file_lock(self.queue_path):
+			self._refresh_jobs()
+			if publish_at is None:
+				publish_at = self.next_publish_slot(category)
+
+			job = {
+				"id": uuid.uuid4().hex[:12],
+				"category": category,
+				"video_path": video_path,
+				"title": title,
+				"description": description,
+				"tags": tags,
+				"thumbnail_path": thumbnail_path,
+				"playlist_ids": playlist_ids or [],
+				"publish_at": publish_at,
+				"status": "queued",
+				"attempts": 0,
+				"not_before": 0,
+				"progress": 0,
+				"bytes_per_second": 0,
+				"video_id": None,
+				"error": None,
+				"created_at": time.time(),
+			}
+			self.jobs.append(job)
+			atomic_write_json(self.queue_path, self.jobs)
+
+		print(f"📥 Upload queued for {category}: {title} (publishAt: {publish_at})")
+		self._wake_up.set()
+		return job
+
+	def add_listener(self, job_id, callback):
+		"""
+		Registers a callback for progress of one upload job. Listeners live in memory only and are dropped once the
+		job is done or failed. In processes not dispatching uploads, the queue file is watched instead: only the
+		outcome events (upload_retry, upload_done, upload_failed) are delivered, not upload_progress.
+		:param callback: Called as callback(event_type, **data).
+		"""
+		with self._lock:
+			watched = job_id in self._listeners
+			self._listeners.setdefault(job_id, []).append(callback)
+		if not self.dispatching and not watched:
+			threading.Thread(target=self._watch_job, args=(job_id,), name=f"upload-watch-{job_id}", daemon=True).start()
+
+	def _watch_job(self, job_id):
+		retried_attempts = 0
+		while True:
+			time.sleep(DISPATCH_INTERVAL / 2)
+			job = next((job for job in read_json(self.queue_path, []) if job["id"] == job_id), None)
+			if job is None:
+				return
+			if job["status"] == "done":
+				return self._notify(job, "upload_done", video_id=job["video_id"])
+			if job["status"] == "failed":
+				return self._notify(job, "upload_failed", error=job["error"])
+			if job["status"] == "queued" and job["error"] and job["attempts"] > retried_attempts:
+				retried_attempts = job["attempts"]
+				self._notify(job, "upload_retry", error=job["error"], retry_at=job["not_before"])
+
+	def _notify(self, job, event_type, **data):
+		for callback in list(self._listeners.get(job["id"], [])):
+			try:
+				callback(event_type, **data)
+			except Exception as e:
+				print(f"⚠️ Upload listener failed for '{job['title']}': {e}")
+		if event_type in ("upload_done", "upload_failed"):
+			with self._lock:
+				self._listeners.pop(job["id"], None)
+
+	def list_jobs(self):
+		with self._lock:
+			self._refresh_jobs()
+			return [dict(job) for job in self.jobs]
+
+	def next_publish_slot(self, category, now=None):
+		"""Returns the first cadence slot (ISO 8601, UTC) not already taken by another job of the channel."""
+		cadence = UPLOAD_CADENCE.get(category)
+		if not cadence or not cadence.get("times"):
+			return None
+
+		now = now or datetime.datetime.now(datetime.timezone.utc)
+		earliest = now + datetime.timedelta(seconds=UPLOAD_MIN_LEAD_TIME)
+		taken = {job["publish_at"] for job in self.jobs if job["category"] == category and job["status"] != "failed"}
+		times = sorted(cadence["times"])
+
+		for day_offset in range(366):
+			day = (now + datetime.timedelta(days=day_offset)).date()
+			if day.weekday() not in cadence.get("weekdays", range(7)):
+				continue
+			for slot_time in times:
+				hour, minute = (int(part) for part in slot_time.split(":"))
+				slot = datetime.datetime(day.year, day.month, day.day, hour, minute, tzinfo=datetime.timezone.utc)
+				slot_iso = slot.strftime("%Y-%m-%dT%H:%M:%SZ")
+				if slot >= earliest and slot_iso not in taken:
+					return slot_iso
+		return None
+
+	@staticmethod
+	def estimate_quota(job):
+		"""Upper bound of quota units an upload job spends."""
+		units = YOUTUBE_QUOTA_COSTS["videos.insert"]
+		if job.get("thumbnail_path"):
+			units += YOUTUBE_QUOTA_COSTS["thumbnails.set"]
+		playlists = len(job.get("playlist_ids") or [])
+		units += playlists * (YOUTUBE_QUOTA_COSTS["playlistItems.insert"] + YOUTUBE_QUOTA_COSTS["playlistItems.list"])
+		return units
+
+	def _run(self):
+		while True:
+			try:
+				self._dispatch()
+			except Exception:
+				print("❌ Upload scheduler dispatch failed:")
+				print(traceback.format_exc())
+			self._wake_up.wait(DISPATCH_INTERVAL)
+			self._wake_up.clear()
+
+	def _dispatch(self):
+		oversized = []
+		with self._lock:
+			self._refresh_jobs()
+			active = sum(1 for job in self.jobs if job["status"] == "uploading")
+			now = time.time()
+
+			for job in sorted(self.jobs, key=lambda j: j["created_at"]):
+				if active >= self.max_concurrent:
+					break
+				if job["status"] != "queued" or job["not_before"] > now:
+					continue
+
+				estimate = self.estimate_quota(job)
+				if estimate > self.quota_ledger.daily_quota:
+					# Would be deferred forever: not even a full quota day covers it.
+					job["status"] = "failed"
+					job["error"] = f"Upload needs about {estimate} quota units, more than the daily quota of {self.quota_ledger.daily_quota}. Use fewer playlists."
+					print(f"❌ {job['error']} ('{job['title']}')")
+					oversized.append(job)
+					continue
+				if self.quota_ledger.remaining(job["category"]) < estimate:
+					job["not_before"] = self.quota_ledger.next_reset()
+					print(f"⏸️ Not enough {job['category']} quota left today for '{job['title']}'. Deferred to next quota reset.")
+					continue
+
+				# Reserve quota now so concurrent dispatches of the same channel can't overspend.
+				self.quota_ledger.spend(job["category"], estimate)
+				job["status"] = "uploading"
+				job["attempts"] += 1
+				active += 1
+				threading.Thread(target=self._upload_job, args=(job, estimate), name=f"upload-{job['id']}", daemon=True).start()
+
+			self._save_jobs()
+
+		for job in oversized:
+			self._notify(job, "upload_failed", error=job["error"])
+
+	def _upload_job(self, job, reserved_quota):
+		last_uploaded = [0]
+
+		def on_progress(uploaded_bytes, total_bytes, bytes_per_second):
+			self.bandwidth_limiter.consume(uploaded_bytes - last_uploaded[0])
+			last_uploaded[0] = uploaded_bytes
+			job["progress"] = round(uploaded_bytes / total_bytes * 100, 1) if total_bytes else 100
+			job["bytes_per_second"] = bytes_per_second
+			self._notify(job, "upload_progress", percent=job["progress"], bytes_per_second=bytes_per_second, attempt=job["attempts"])
+
+		uploader = None
+		video_id = None
+		try:
+			profile = get_channel_profile(job["category"])
+			uploader = UPLOADERS.get(profile["uploader"])(profile.get("upload_profile", job["category"]))
+			video_id = uploader.upload_video(
+				video_path=job["video_path"],
+				title=job["title"],
+				description=job["description"],
+				tags=job["tags"],
+				privacy_status=profile["defaults"]["visibility"],
+				category_id=profile["defaults"]["categoryId"],
+				scheduled_time=job["publish_at"],
+				thumbnail_path=job["thumbnail_path"],
+				playlist_ids=job["playlist_ids"],
+				progress_callback=on_progress
+			)
+			error = None if video_id else "Upload returned no video id."
+		except Exception as e:
+			print(f"❌ Scheduled upload failed for '{job['title']}': {e}")
+			error = str(e)
+
+		# Replace the reservation with what was actually spent, including the calls of a failed upload.
+		quota_used = getattr(uploader, "quota_used", 0)
+		self.quota_ledger.spend(job["category"], quota_used - reserved_quota)
+
+		with self._lock:
+			if video_id:
+				job["status"] = "done"
+				job["video_id"] = video_id
+				job["error"] = None
+				print(f"✅ Scheduled upload finished: {job['title']} → {video_id}")
+			elif job["attempts"] >= UPLOAD_MAX_ATTEMPTS:
+				job["status"] = "failed"
+				job["error"] = error
+			else:
+				job["status"] = "queued"
+				job["error"] = error
+				job["not_before"] = time.time() + RETRY_DELAY
+			self._save_jobs()
+
+		if job["status"] == "done":
+			self._notify(job, "upload_done", video_id=video_id)
+		elif job["status"] == "failed":
+			self._notify(job, "upload_failed", error=error)
+		else:
+			self._notify(job, "upload_retry", error=error, retry_at=job["not_before"])
+		self._wake_up.set()
+
+
+UPLOAD_SCHEDULER = UploadScheduler()
@@ -1,9 +1,150 @@
+import contextlib
+import io
+import ipaddress
+import json
+import os
 import re
+import sys
+import tempfile
+import threading
+import time
 import unicodedata
 
+from constants import FILE_LOCK_TIMEOUT
+
 def normalize_text(text):
 	text = unicodedata.normalize('NFD', text)
 	return ''.join(char for char in text if unicodedata.category(char) != 'Mn').lower().strip()
 
 def sanitize_filename(name):
 	return re.sub(r'[^\w\-_\. ]', '_', name)
+
+def format_title(title):
+	"""File name stem of a video's scripts, narration, image selection, thumbnails and outputs."""
+	return title.replace(":", "_").replace("?", "_").replace("'", "_").replace("/", "_").replace("+", "_").replace("=", "_").lower()
+
+def is_loopback_host(host):
+	"""True when a bind address (APP_HOST) only accepts connections from this machine."""
+	if host == "localhost":
+		return True
+	try:
+		return ipaddress.ip_address(host).is_loopback
+	except ValueError:
+		return False
+
+def atomic_write_text(path, text):
+	"""Writes text to a temp file in the same folder and swaps it in, so readers never see a partial file."""
+	folder = os.path.dirname(path) or "."
+	os.makedirs(folder, exist_ok=True)
+	fd, temp_path = tempfile.mkstemp(prefix=".tmp_", suffix=os.path.splitext(path)[1], dir=folder)
+	try:
+		with os.fdopen(fd, "w", encoding="utf-8") as f:
+			f.write(text)
+		os.replace(temp_path, path)
+	except BaseException:
+		if os.path.exists(temp_path):
+			os.remove(temp_path)
+		raise
+
+def atomic_write_json(path, data, indent=4):
+	atomic_write_text(path, json.dumps(data, indent=indent, ensure_ascii=False))
+
+if os.name == "nt":
+	import msvcrt
+
+	def _try_lock(lock_file):
+		lock_file.seek(0)
+		msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+
+	def _unlock(lock_file):
+		lock_file.seek(0)
+		msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+else:
+	import fcntl
+
+	def _try_lock(lock_file):
+		fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+	def _unlock(lock_file):
+		fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+def try_lock_file(lock_path):
+	"""
+	Takes an exclusive lock on lock_path without waiting. The lock is held until the returned file is closed or the
+	process exits, so it also tells processes apart (see app.start_background_services).
+	:return: The open lock file, or None when another process (or thread) holds the lock.
+	"""
+	os.makedirs(os.path.dirname(lock_path) or ".", exist_ok=True)
+	lock_file = open(lock_path, "a+b")
+	try:
+		_try_lock(lock_file)
+	except OSError:
+		lock_file.close()
+		return None
+	return lock_file
+
+@contextlib.contextmanager
+def file_lock(path, timeout=FILE_LOCK_TIMEOUT):
+	"""
+	Exclusive lock on a shared file, across threads and processes, held on the side file <path>.lock.
+	Wrap read-modify-write updates of JSON files shared by server workers in it; write with atomic_write_json.
+	:param timeout: Seconds to wait for the lock (None waits forever).
+	:raises TimeoutError: When the lock wasn't acquired in time.
+	"""
+	deadline = time.monotonic() + timeout if timeout is not None else None
+	while True:
+		lock_file = try_lock_file(f"{path}.lock")
+		if lock_file:
+			break
+		if deadline is not None and time.monotonic() > deadline:
+			raise TimeoutError(f"❌ Timed out waiting for the lock on {path}")
+		time.sleep(0.05)
+	try:
+		yield
+	finally:
+		_unlock(lock_file)
+		lock_file.close()
+
+def read_json(path, default=None):
+	if not os.path.exists(path):
+		return default
+	with open(path, "r", encoding="utf-8") as f:
+		return json.load(f)
+
+
+class _ThreadStdout:
+	"""sys.stdout stand-in sending what threads inside capture_stdout() print to their own buffer."""
+
+	def __init__(self, stream):
+		self.stream = stream
+		self.local = threading.local()
+
+	def write(self, text):
+		buffer = getattr(self.local, "buffer", None)
+		return (buffer if buffer is not None else self.stream).write(text)
+
+	def flush(self):
+		self.stream.flush()
+
+	def __getattr__(self, name):
+		return getattr(self.stream, name)
+
+_stdout_lock = threading.Lock()
+
+@contextlib.contextmanager
+def capture_stdout():
+	"""
+	Like contextlib.redirect_stdout(io.StringIO()), but only for the calling thread: requests served at the same time,
+	and background jobs, keep printing to the console.
+	:return: The StringIO receiving the output.
+	"""
+	with _stdout_lock:
+		if not isinstance(sys.stdout, _ThreadStdout):
+			sys.stdout = _ThreadStdout(sys.stdout)
+		proxy = sys.stdout
+	output = io.StringIO()
+	proxy.local.buffer = output
+	try:
+		yield output
+	finally:
+		proxy.local.buffer = None
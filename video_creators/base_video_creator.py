@@ -1,28 +1,55 @@
 import ffmpeg
+import hashlib
 import os
+import shutil
+import sys
+import time
 from PIL import Image
 
-from constants import BGM_FOLDER, FONTS_FOLDER
+from constants import BASE_PLATE_FOLDER, BGM_FOLDER, FONTS_FOLDER, RENDER_MAX_SEGMENT_IMAGES, RENDER_MAX_SINGLE_PASS_IMAGES, RENDER_MODE, RENDER_SEGMENT_CRF, RENDER_SEGMENT_FPS, SUBTITLE_MODE
+from ass_subtitles import build_ass_subtitles
+from image_metadata_index import get_metadata_index
 
 
 BASE_TARGET_WIDTH = 1366
 BASE_TARGET_HEIGHT = 768
+FIXED_VIDEO_DURATION = 5
+LOGO_X = 10
+LOGO_Y = 10
+LOGO_WIDTH = 400
+VIDEO_EXTENSIONS = (".mp4", ".mov", ".webm", ".avi")
 
 class BaseVideoCreator:
 	"""Base class for video creation logic. Subclasses must implement required abstract methods."""
 
-	def __init__(self, narration_audio, subtitle_file, output_file, intro_images, main_topic_images, conclusion_images, subparts_durations, font_path=FONTS_FOLDER, logo_path=None):
+	SUBTITLE_PLAY_RES = None  # (width, height) of the ASS script; None keeps ffmpeg's SRT defaults
+
+	def __init__(self, narration_audio, subtitle_file, output_file, intro_images, main_topic_images, conclusion_images, subparts_durations, font_path=FONTS_FOLDER, logo_path=None, progress_callback=None, render_mode=RENDER_MODE, max_segment_images=RENDER_MAX_SEGMENT_IMAGES, max_single_pass_images=RENDER_MAX_SINGLE_PASS_IMAGES, subtitle_mode=SUBTITLE_MODE, render_farm=None, renditions=None):
 		self.bgm_audio = self.select_bgm()
 		self.font_path = font_path
 		self.logo_path = logo_path
-		self.narration_audio = narration_audio
-		self.narration_duration = self.get_narration_duration()
+		self.narration_audio = narration_audio  # None while TTS is still running: see prepare_timeline/retime
+		self.subparts_durations = subparts_durations
+		self.narration_duration = self.get_narration_duration() if narration_audio else sum(subparts_durations)
 		self.output_file = output_file
+		self.progress_callback = progress_callback  # Called as callback(event_type, **data)
 		self.subtitle_file = subtitle_file
+		self.render_mode = render_mode
+		self.max_segment_images = max_segment_images
+		self.max_single_pass_images = max_single_pass_images
+		self.subtitle_mode = subtitle_mode  # "burned", "soft" (muxed as a subtitle track) or "none"
+		self.render_farm = render_farm  # RenderFarm to distribute segments to; segments render here without one
+		self.renditions = renditions or []  # Extra scaled copies: [{"name", "height", "crf", "video_bitrate", "audio_bitrate"}]
+		self.render_report = None
+		self._render_stats = None
+		self._prepared_timeline = None
 
 	def create_video(self):
 		raise NotImplementedError("Subclasses must implement `create_video`")
 
+	def build_timeline(self):
+		raise NotImplementedError("Subclasses must implement `build_timeline`")
+
 	def get_subtitle_style(self):
 		raise NotImplementedError("Subclasses must implement `get_subtitle_style`")
 
@@ -57,35 +84,88 @@ class BaseVideoCreator:
 			print("⚠️ Background image not found. Using black canvas instead.")
 			return ffmpeg.input(f"color=c=black:s={width}x{height}:d={duration}", format="lavfi")
 
+	def build_base_plate(self, background_path=None, height=1080, width=1920):
+		"""
+		Renders the background scaled to the output size into one image, cached in BASE_PLATE_FOLDER under a key made of
+		the background contents and the output size. A missing background gives a black plate, like build_canvas.
+		Only layers under everything else belong here: the logo stays the top overlay of finalize_video, above the
+		image sequences that move into its corner.
+		:return: {"path": plate image}
+		"""
+		has_background = bool(background_path and os.path.exists(background_path))
+		key = hashlib.sha256(f"{width}x{height}".encode("utf-8"))
+		if has_background:
+			with open(background_path, "rb") as f:
+				key.update(hashlib.sha256(f.read()).digest())
+		else:
+			key.update(b"none")
+
+		plate_path = os.path.join(BASE_PLATE_FOLDER, f"{key.hexdigest()[:20]}.png")
+		plate = {"path": plate_path}
+		if os.path.exists(plate_path):
+			print(f"🎨 Reusing base plate: {plate_path}")
+			return plate
+
+		print("🎨 Build base plate")
+		if has_background:
+			with Image.open(background_path) as background:
+				canvas = background.convert("RGB").resize((width, height), Image.BICUBIC)
+		else:
+			print("⚠️ Background image not found. Using black plate instead.")
+			canvas = Image.new("RGB", (width, height), "black")
+
+		os.makedirs(BASE_PLATE_FOLDER, exist_ok=True)
+		temp_path = f"{plate_path}.tmp.png"
+		canvas.save(temp_path)
+		os.replace(temp_path, plate_path)
+		print(f"✅ Base plate saved: {plate_path}")
+		return plate
+
+	def plate_canvas(self, plate, duration=None):
+		"""
+		Background stream of a base plate. The plate is decoded once and repeated by the loop filter
+		(an image input with loop=1 would be decoded again for every frame).
+		"""
+		if duration is None:
+			duration = self.narration_duration
+		return (
+			ffmpeg
+			.input(plate["path"])
+			.filter("loop", loop=-1, size=1, start=0)
+			.filter("trim", duration=duration)
+		)
+
+	def narration_input(self):
+		return ffmpeg.input(self.narration_audio)
+
 	def mix_audio(self, bgm_volume=5):
 		print("🔊 Mix Audio")
-		narration = ffmpeg.input(self.narration_audio)
+		narration = self.narration_input()
 		if self.bgm_audio:
 			bgm = ffmpeg.input(self.bgm_audio, stream_loop=-1).filter("volume", (bgm_volume/100))
 			return ffmpeg.filter([narration, bgm], "amix", duration="first", dropout_transition=2)
 		return narration
 
+	@staticmethod
+	def image_sequence_durations(image_paths, total_duration):
+		"""Videos play for FIXED_VIDEO_DURATION seconds, images share the rest of total_duration evenly."""
+		num_videos = sum(1 for p in image_paths if p.lower().endswith(VIDEO_EXTENSIONS))
+		num_images = len(image_paths) - num_videos
+		remaining_duration = total_duration - num_videos * FIXED_VIDEO_DURATION
+		duration_per_image = remaining_duration / num_images if num_images else 0
+		return [FIXED_VIDEO_DURATION if p.lower().endswith(VIDEO_EXTENSIONS) else duration_per_image for p in image_paths]
+
 	def overlay_image_sequence(self, video_stream, image_paths, start_time, total_duration, width=BASE_TARGET_WIDTH, height=BASE_TARGET_HEIGHT, motion="static", draw_box=False, x_offset=277, y_offset=156):
-		FIXED_VIDEO_DURATION = 5
 		print("🎬 overlay_image_sequence BASE")
 		if not image_paths:
 			raise RuntimeError("❌ No image paths provided to overlay_image_sequence!")
 
-		num_videos = sum(1 for p in image_paths if p.lower().endswith((".mp4", ".mov", ".webm", ".avi")))
-		num_images = len(image_paths) - num_videos
-
-		video_total_duration = num_videos * FIXED_VIDEO_DURATION
-		remaining_duration = total_duration - video_total_duration
-		duration_per_image = remaining_duration / num_images if num_images else 0
-
+		durations = self.image_sequence_durations(image_paths, total_duration)
 		print(f"total_duration: {total_duration}")
-		print(f"video_total_duration: {video_total_duration}")
-		print(f"remaining_duration: {remaining_duration}")
-		print(f"duration_per_image: {duration_per_image}")
+		print(f"durations: {[round(d, 2) for d in durations]}")
 
-		for img_path in image_paths:
-			is_video = img_path.lower().endswith((".mp4", ".mov", ".webm", ".avi"))
-			duration = FIXED_VIDEO_DURATION if is_video else duration_per_image
+		for img_path, duration in zip(image_paths, durations):
+			is_video = img_path.lower().endswith(VIDEO_EXTENSIONS)
 			if is_video:
 				image_input = ffmpeg.input(img_path, ss=0, t=duration)
 			else:
@@ -127,7 +207,7 @@ class BaseVideoCreator:
 
 		return video_stream, start_time
 
-	def overlay_logo(self, video_stream, x=10, y=10, scale=400):
+	def overlay_logo(self, video_stream, x=LOGO_X, y=LOGO_Y, scale=LOGO_WIDTH):
 		print("🎨 Overlay Logo")
 		if not self.logo_path or not os.path.exists(self.logo_path):
 			print(f"❌ Logo file not found: {self.logo_path}")
@@ -137,19 +217,409 @@ class BaseVideoCreator:
 		return ffmpeg.overlay(video_stream, logo, x=x, y=y, eof_action="repeat")
 
 	def apply_subtitles(self, video_stream):
+		"""Burns the subtitles from a pre-styled ASS file (built once per SRT and style) instead of styling the SRT in libass."""
 		print("💬 Apply Subtitles")
-		return video_stream.filter(
-			"subtitles", self.subtitle_file,
-			fontsdir=os.path.abspath(self.font_path),
-			force_style=self.get_subtitle_style()
+		ass_path, font_embedded = build_ass_subtitles(self.subtitle_file, self.get_subtitle_style(), self.font_path, play_res=self.SUBTITLE_PLAY_RES)
+		if font_embedded:
+			return video_stream.filter("ass", ass_path)
+		return video_stream.filter("ass", ass_path, fontsdir=os.path.abspath(self.font_path))
+
+	# 🎞️ Rendering
+	# Creators describe a video as a timeline and let render() turn it into ffmpeg passes:
+	#   {"background": path, "bell": path, "bells": [seconds], "plate": base plate (set by render()),
+	#    "size": [width, height] (optional, 1920x1080 by default),
+	#    "sequences": [{"images", "start", "duration", "motion", "draw_box", optional "width", "height", "x", "y"}],
+	#    "overlays": [{"path", "scale", "start", "end", "x", "y"}]}
+	# Times are absolute seconds of the final video.
+
+	def compose_video(self, timeline, window_start=0, window_end=None, sequences=None):
+		"""
+		Builds the picture of [window_start, window_end): background, image sequences and timed overlays,
+		with every time shifted so the window starts at 0.
+		:param sequences: (Optional) Image sequences to draw instead of the timeline's ones.
+		"""
+		window_end = self.narration_duration if window_end is None else window_end
+		width, height = timeline.get("size") or (1920, 1080)
+		if timeline.get("plate"):
+			video_stream = self.plate_canvas(timeline["plate"], duration=window_end - window_start)
+		else:
+			video_stream = self.build_canvas(duration=window_end - window_start, height=height, width=width, custom_bg_path=timeline.get("background"))
+
+		for sequence in timeline["sequences"] if sequences is None else sequences:
+			video_stream, _ = self.overlay_image_sequence(
+				video_stream,
+				sequence["images"],
+				sequence["start"] - window_start,
+				sequence["duration"],
+				width=sequence.get("width", BASE_TARGET_WIDTH),
+				height=sequence.get("height", BASE_TARGET_HEIGHT),
+				motion=sequence.get("motion", "static"),
+				draw_box=sequence.get("draw_box", False),
+				x_offset=sequence.get("x", 277),
+				y_offset=sequence.get("y", 156)
+			)
+
+		# Overlays sharing a file are read once and split, e.g. the main point avatar shown at every subpart.
+		groups = {}
+		for overlay in timeline["overlays"]:
+			if overlay["start"] < window_end and overlay["end"] > window_start:
+				groups.setdefault((overlay["path"], overlay.get("scale")), []).append(overlay)
+
+		for (path, scale), overlays in groups.items():
+			source = ffmpeg.input(path)
+			if scale:
+				source = source.filter("scale", scale, -1)
+			if len(overlays) > 1:
+				split = source.filter_multi_output("split", len(overlays))
+				sources = [split[i] for i in range(len(overlays))]
+			else:
+				sources = [source]
+			for overlay_source, overlay in zip(sources, overlays):
+				video_stream = ffmpeg.overlay(
+					video_stream,
+					overlay_source,
+					x=overlay["x"],
+					y=overlay["y"],
+					enable=f"between(t,{overlay['start'] - window_start},{overlay['end'] - window_start})"
+				)
+		return video_stream
+
+	def mix_final_audio(self, timeline):
+		print("🔊 Mix main Audio")
+		main_audio = self.mix_audio()
+		bells = timeline.get("bells", [])
+		if not bells or not timeline.get("bell"):
+			return main_audio.filter("dynaudnorm").filter("volume", 1.3)
+
+		print("🔉 Mix bell sounds with main audio.")
+		bell_sfx_raw = ffmpeg.input(timeline["bell"], ss=0, t=1).audio
+		bell_sfx_streams = bell_sfx_raw.filter_multi_output("asplit", len(bells)) if len(bells) > 1 else None
+		all_audio_streams = [main_audio]
+		for index, bell_time in enumerate(bells):
+			bell_stream = bell_sfx_streams[index] if bell_sfx_streams else bell_sfx_raw
+			all_audio_streams.append(bell_stream.filter("adelay", f"{bell_time * 1000}|{bell_time * 1000}").filter("volume", 0.10))
+
+		mixed_audio = ffmpeg.filter(all_audio_streams, "amix", inputs=len(all_audio_streams), duration="longest")
+		return mixed_audio.filter("dynaudnorm").filter("volume", 1.3)
+
+	def finalize_video(self, video_stream, timeline, label=None):
+		"""
+		Overlays the logo, adds the subtitles as configured by subtitle_mode, mixes the audio and encodes the output file.
+		"""
+		video_stream = self.overlay_logo(video_stream)
+		audio_stream = self.mix_final_audio(timeline)
+		subtitle_streams = []
+		output_options = {"vcodec": "libx264", "acodec": "aac", "strict": "experimental", "pix_fmt": "yuv420p"}
+		if self.subtitle_mode == "burned":
+			video_stream = self.apply_subtitles(video_stream)
+		elif self.subtitle_mode == "soft":
+			print("💬 Mux subtitles as a soft track")
+			subtitle_streams.append(ffmpeg.input(self.subtitle_file))
+			output_options["scodec"] = "mov_text"
+		elif self.subtitle_mode != "none":
+			raise ValueError(f"❌ Unknown subtitle mode: {self.subtitle_mode}")
+
+		print("📦 Finalizing Video Output")
+		self.run_ffmpeg(self.encode_outputs(video_stream, audio_stream, subtitle_streams, output_options), label=label)
+
+	def rendition_path(self, rendition):
+		base, extension = os.path.splitext(self.output_file)
+		return f"{base}_{rendition['name']}{extension}"
+
+	def output_files(self):
+		return [self.output_file] + [self.rendition_path(rendition) for rendition in self.renditions]
+
+	def encode_outputs(self, video_stream, audio_stream, subtitle_streams, output_options):
+		"""
+		Encodes output_file and every rendition in one ffmpeg run: the finished picture and audio are split after
+		compositing and subtitle burn-in, so only the scaling and encoding are done once per rendition.
+		"""
+		if not self.renditions:
+			return ffmpeg.output(video_stream, audio_stream, *subtitle_streams, self.output_file, **output_options)
+
+		print(f"📦 Encode {len(self.renditions)} extra rendition(s): {', '.join(rendition['name'] for rendition in self.renditions)}")
+		count = len(self.renditions) + 1
+		video_streams = video_stream.filter_multi_output("split", count)
+		audio_streams = audio_stream.filter_multi_output("asplit", count)
+		outputs = [ffmpeg.output(video_streams[0], audio_streams[0], *subtitle_streams, self.output_file, **output_options)]
+		for index, rendition in enumerate(self.renditions, 1):
+			options = dict(output_options)
+			for key in ("crf", "video_bitrate", "audio_bitrate"):
+				if rendition.get(key) is not None:
+					options[key] = rendition[key]
+			scaled = video_streams[index].filter("scale", -2, rendition["height"])
+			outputs.append(ffmpeg.output(scaled, audio_streams[index], *subtitle_streams, self.rendition_path(rendition), **options))
+		return ffmpeg.merge_outputs(*outputs)
+
+	def plan_segments(self, timeline):
+		"""
+		Cuts the timeline into segments of at most max_segment_images image/video inputs.
+		Cuts fall on the frame grid so the concatenated segments keep the narration's timing.
+		:return: List of (start, end, sequences) with sequences holding the images drawn in that segment.
+		"""
+		chunks = []
+		for sequence in timeline["sequences"]:
+			durations = self.image_sequence_durations(sequence["images"], sequence["duration"])
+			offset = sequence["start"]
+			for i in range(0, len(sequence["images"]), self.max_segment_images):
+				chunk_duration = sum(durations[i:i + self.max_segment_images])
+				chunks.append(dict(sequence, images=sequence["images"][i:i + self.max_segment_images], start=offset, duration=chunk_duration))
+				offset += chunk_duration
+
+		def on_frame_grid(seconds):
+			return round(seconds * RENDER_SEGMENT_FPS) / RENDER_SEGMENT_FPS
+
+		end = on_frame_grid(self.narration_duration)
+		cuts = sorted({0, end} | {on_frame_grid(chunk["start"]) for chunk in chunks if 0 < on_frame_grid(chunk["start"]) < end})
+		segments = []
+		for segment_start, segment_end in zip(cuts, cuts[1:]):
+			# A chunk belongs to the segment it starts in; a segment without one only shows the background.
+			sequences = [chunk for chunk in chunks if segment_start <= on_frame_grid(chunk["start"]) < segment_end]
+			segments.append((segment_start, segment_end, sequences))
+		return segments
+
+	def render_single_pass(self, timeline):
+		"""Every input of the video is opened by one ffmpeg process. Fastest, but memory grows with the input count."""
+		self.finalize_video(self.compose_video(timeline), timeline)
+
+	def render_segment(self, timeline, segment_start, segment_end, sequences, segment_path, label=None):
+		"""Renders the picture (no audio) of [segment_start, segment_end) into segment_path."""
+		segment_stream = self.compose_video(timeline, segment_start, segment_end, sequences)
+		segment_output = ffmpeg.output(
+			segment_stream, segment_path,
+			t=segment_end - segment_start, r=RENDER_SEGMENT_FPS,
+			vcodec="libx264", crf=RENDER_SEGMENT_CRF, preset="veryfast", pix_fmt="yuv420p"
 		)
+		return self.run_ffmpeg(segment_output, duration=segment_end - segment_start, label=label)
+
+	@staticmethod
+	def segment_spec(timeline, segment_start, segment_end, sequences, label=None):
+		"""
+		JSON-serializable description of a segment for render workers.
+		:return: (spec, local files the segment reads)
+		"""
+		spec = {
+			"timeline": {key: timeline.get(key) for key in ("background", "plate", "overlays")},
+			"start": segment_start,
+			"end": segment_end,
+			"sequences": sequences,
+			"label": label,
+		}
+		paths = [path for sequence in sequences for path in sequence["images"]]
+		paths += [overlay["path"] for overlay in timeline["overlays"] if overlay["start"] < segment_end and overlay["end"] > segment_start]
+		if timeline.get("plate"):
+			paths.append(timeline["plate"]["path"])
+		elif timeline.get("background") and os.path.exists(timeline["background"]):
+			paths.append(timeline["background"])
+		return spec, paths
+
+	def render_spec(self, spec, segment_path):
+		"""Renders a segment_spec, for farm tasks rendered on this machine or on a worker."""
+		return self.render_segment(spec["timeline"], spec["start"], spec["end"], spec["sequences"], segment_path, label=spec.get("label"))
+
+	def render_segments_on_farm(self, timeline, segments, segment_paths, worker_count):
+		"""Queues every segment on the render farm and waits for the workers to upload them."""
+		print(f"🖧 Distributing {len(segments)} segments to {worker_count} render worker(s)")
+		task_ids = []
+		for index, (segment_start, segment_end, sequences) in enumerate(segments):
+			spec, paths = self.segment_spec(timeline, segment_start, segment_end, sequences, label=f"Segment {index + 1}/{len(segments)}")
+			task_ids.append(self.render_farm.submit(spec, paths, segment_paths[index]))
+
+		for task in self.render_farm.wait(task_ids, local_render=self.render_spec):
+			stats = task["stats"]
+			if not stats:
+				continue  # Rendered here: run_ffmpeg already counted it.
+			self._render_stats["passes"] += 1
+			self._render_stats["remote_passes"] += 1
+			self._render_stats["max_open_inputs"] = max(self._render_stats["max_open_inputs"], stats.get("open_inputs") or 0)
+			if stats.get("peak_rss"):
+				self._render_stats["peak_rss_bytes"] = max(self._render_stats["peak_rss_bytes"] or 0, stats["peak_rss"])
+
+	def render_segmented(self, timeline):
+		"""
+		Renders the picture segment by segment into near-lossless intermediates, then concatenates them and adds
+		logo, subtitles and audio in a final pass. Peak memory is bounded by the largest segment instead of the video.
+		"""
+		segments = self.plan_segments(timeline)
+		segment_folder = f"{os.path.splitext(self.output_file)[0]}_segments"
+		os.makedirs(segment_folder, exist_ok=True)
+
+		segment_paths = [os.path.join(segment_folder, f"segment_{index:04}.mp4") for index in range(len(segments))]
+		workers = self.render_farm.live_workers() if self.render_farm else []
+		if workers:
+			self.render_segments_on_farm(timeline, segments, segment_paths, len(workers))
+		else:
+			for index, (segment_start, segment_end, sequences) in enumerate(segments):
+				print(f"🧩 Render segment {index + 1}/{len(segments)} ({segment_start:.2f}s → {segment_end:.2f}s, {sum(len(s['images']) for s in sequences)} images)")
+				self.render_segment(timeline, segment_start, segment_end, sequences, segment_paths[index], label=f"Segment {index + 1}/{len(segments)}")
+
+		concat_txt_path = os.path.join(segment_folder, "concat_list.txt")
+		with open(concat_txt_path, "w", encoding="utf-8") as f:
+			for path in segment_paths:
+				abs_path = os.path.abspath(path).replace("\\", "/")
+				f.write(f"file '{abs_path}'\n")
+
+		video_stream = ffmpeg.input(concat_txt_path, format="concat", safe=0).video
+		self.finalize_video(video_stream, timeline, label="Final pass")
+		shutil.rmtree(segment_folder, ignore_errors=True)
+
+	def prepare_timeline(self):
+		"""
+		Builds the timeline and its base plate ahead of the render. Called with predicted subpart durations while TTS
+		is still running; retime() swaps in the real ones afterwards.
+		"""
+		print("🔮 Prepare the timeline")
+		timeline = self.build_timeline()
+		width, height = timeline.get("size") or (1920, 1080)
+		timeline["plate"] = self.build_base_plate(timeline.get("background"), height=height, width=width)
+		self._prepared_timeline = (list(self.subparts_durations), timeline)
+		return timeline
+
+	def retime(self, subparts_durations, narration_audio, subtitle_file):
+		"""
+		Switches a creator prepared on predicted durations to the finished narration, and reports how far off the
+		prediction was (also sent as a "duration_prediction" progress event).
+		"""
+		predicted = self.subparts_durations
+		self.subparts_durations = subparts_durations
+		self.narration_audio = narration_audio
+		self.subtitle_file = subtitle_file
+		self.narration_duration = self.get_narration_duration()
+
+		errors = [actual - expected for expected, actual in zip(predicted, subparts_durations)]
+		error_percent = round(abs(sum(subparts_durations) - sum(predicted)) / sum(subparts_durations) * 100, 1)
+		print(f"🔮 Duration prediction was off by {[round(e, 1) for e in errors]} s ({error_percent}% of the narration)")
+		if self.progress_callback:
+			self.progress_callback(
+				"duration_prediction",
+				predicted=[round(d, 2) for d in predicted],
+				actual=[round(d, 2) for d in subparts_durations],
+				error_percent=error_percent
+			)
+
+	def current_timeline(self):
+		"""
+		The prepared timeline when it was built on the current subpart durations, otherwise a fresh one.
+		A rebuild is plain Python (no media is read), and keeps the prepared base plate.
+		"""
+		if self._prepared_timeline is None:
+			return self.build_timeline()
+		durations, timeline = self._prepared_timeline
+		if durations == list(self.subparts_durations):
+			return timeline
+		print("🔮 Retime the prepared timeline on the real durations")
+		return dict(self.build_timeline(), plate=timeline["plate"])
+
+	def render(self, timeline):
+		"""
+		Renders a timeline in the configured mode and builds render_report (also sent as a "render_report" progress event).
+		:return: The render report.
+		"""
+		start_time = time.time()
+		image_inputs = sum(len(sequence["images"]) for sequence in timeline["sequences"])
+		mode = self.render_mode
+		if mode == "auto":
+			mode = "segmented" if image_inputs > self.max_single_pass_images else "single_pass"
+
+		print(f"🎞️ Rendering {image_inputs} image inputs ({mode})")
+		width, height = timeline.get("size") or (1920, 1080)
+		timeline = dict(timeline, plate=timeline.get("plate") or self.build_base_plate(timeline.get("background"), height=height, width=width))
+		self._render_stats = {"passes": 0, "remote_passes": 0, "max_open_inputs": 0, "peak_rss_bytes": None}
+		if mode == "segmented":
+			self.render_segmented(timeline)
+		elif mode == "single_pass":
+			self.render_single_pass(timeline)
+		else:
+			raise ValueError(f"❌ Unknown render mode: {mode}")
+
+		peak_rss = self._render_stats["peak_rss_bytes"]
+		self.render_report = {
+			"mode": mode,
+			"image_inputs": image_inputs,
+			"ffmpeg_passes": self._render_stats["passes"],
+			"remote_passes": self._render_stats["remote_passes"],
+			"max_open_inputs": self._render_stats["max_open_inputs"],
+			"peak_rss_mb": round(peak_rss / 1024 / 1024, 1) if peak_rss is not None else None,
+			"seconds": round(time.time() - start_time, 1),
+			"outputs": self.output_files(),
+		}
+		print(f"📊 Render report: {self.render_report}")
+		if self.progress_callback:
+			self.progress_callback("render_report", **self.render_report)
+		return self.render_report
+
+	def run_ffmpeg(self, output_stream, duration=None, label=None):
+		"""
+		Runs an ffmpeg output graph, reporting frame/fps/speed progress through progress_callback.
+		:param duration: Expected output duration in seconds, used to compute the percentage.
+		:param label: (Optional) Name of the pass, for renders made of several ffmpeg runs.
+		:return: Peak resident memory of the ffmpeg process in bytes (None where the OS can't report it).
+		"""
+		duration = duration or self.narration_duration
+		output_stream = output_stream.global_args("-progress", "pipe:1", "-nostats")
+		open_inputs = output_stream.get_args().count("-i")
+		started = time.time()
+		process = ffmpeg.run_async(output_stream, pipe_stdout=True, overwrite_output=True)
+
+		progress = {}
+		for raw_line in process.stdout:
+			key, _, value = raw_line.decode("utf-8", errors="replace").strip().partition("=")
+			if key != "progress":
+				progress[key] = value
+				continue
+
+			# Values are "N/A" until the first frame is encoded.
+			out_time_us = progress.get("out_time_us") or progress.get("out_time_ms") or ""
+			out_time = int(out_time_us) / 1_000_000 if out_time_us.isdigit() else 0
+			if self.progress_callback:
+				self.progress_callback(
+					"ffmpeg_progress",
+					label=label,
+					frame=int(progress.get("frame", "0")) if progress.get("frame", "").isdigit() else 0,
+					fps=float(progress["fps"]) if progress.get("fps", "").replace(".", "", 1).isdigit() else 0.0,
+					speed=progress.get("speed", "").strip(),
+					out_time=round(out_time, 1),
+					percent=round(min(out_time / duration * 100, 100), 1) if duration else None
+				)
+			progress = {}
+
+		peak_rss = None
+		cpu_seconds = None
+		if hasattr(os, "wait4"):
+			# wait4 reports the resource usage of this ffmpeg process alone (ru_maxrss is in KB on Linux, bytes on macOS).
+			_, status, usage = os.wait4(process.pid, 0)
+			process.returncode = os.waitstatus_to_exitcode(status)
+			peak_rss = usage.ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+			cpu_seconds = round(usage.ru_utime + usage.ru_stime, 2)
+		else:
+			process.wait()
+
+		if self._render_stats is not None:
+			self._render_stats["passes"] += 1
+			self._render_stats["max_open_inputs"] = max(self._render_stats["max_open_inputs"], open_inputs)
+			if peak_rss is not None:
+				self._render_stats["peak_rss_bytes"] = max(self._render_stats["peak_rss_bytes"] or 0, peak_rss)
+		print(f"📈 ffmpeg{f' ({label})' if label else ''}: {open_inputs} inputs, peak RSS {round(peak_rss / 1024 / 1024, 1) if peak_rss is not None else '?'} MB")
+		if self.progress_callback:
+			self.progress_callback(
+				"ffmpeg_pass",
+				label=label,
+				open_inputs=open_inputs,
+				seconds=round(time.time() - started, 2),
+				cpu_seconds=cpu_seconds,  # Encoding (libx264) and filtering, all threads of the ffmpeg process
+				peak_rss_mb=round(peak_rss / 1024 / 1024, 1) if peak_rss is not None else None
+			)
+
+		if process.returncode != 0:
+			raise ffmpeg.Error("ffmpeg", None, None)
+		return peak_rss
 
 	# 🔧 Image Utilities
 
 	@staticmethod
 	def get_image_resolution(image_path):
 		"""Returns (width, height) of an image or video."""
-		if image_path.lower().endswith((".mp4", ".mov", ".webm", ".avi")):
+		if image_path.lower().endswith(VIDEO_EXTENSIONS):
 			# Use ffprobe to get video resolution
 			try:
 				probe = ffmpeg.probe(image_path)
@@ -162,7 +632,10 @@ class BaseVideoCreator:
 			except Exception as e:
 				raise RuntimeError(f"Failed to get video resolution for {image_path}: {e}")
 		else:
-			# Fall back to PIL for image files
+			# Use the metadata sidecar index when the image was scanned, fall back to PIL otherwise
+			metadata = get_metadata_index().get(image_path)
+			if metadata:
+				return metadata["width"], metadata["height"]
 			with Image.open(image_path) as img:
 				return img.width, img.height
 
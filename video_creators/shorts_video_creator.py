@@ -0,0 +1,100 @@
+import os
+import time
+
+import ffmpeg
+
+from constants import FONTS_FOLDER, SHORTS_HEIGHT, SHORTS_MAX_SECONDS, SHORTS_WIDTH
+from video_creators.base_video_creator import LOGO_WIDTH, LOGO_X, LOGO_Y, BaseVideoCreator
+
+FADE_OUT_TIME = 1  # seconds of fade when the narration is cut at SHORTS_MAX_SECONDS
+
+
+class ShortsVideoCreator(BaseVideoCreator):
+	"""
+	Vertical clip of one main point: the subpart narration and subtitles of a finished video over its images,
+	already framed to 9:16 (see ShortsGenerator.prepare_frames). Narration longer than SHORTS_MAX_SECONDS is cut.
+	"""
+
+	SUBTITLE_PLAY_RES = (SHORTS_WIDTH, SHORTS_HEIGHT)
+
+	def __init__(self, narration_audio, subtitle_file, output_file, frames, bgm_audio=None, font_path=FONTS_FOLDER, logo_path=None, progress_callback=None):
+		self.bgm_path = bgm_audio
+		self.full_narration_duration = None
+		super().__init__(
+			narration_audio,
+			subtitle_file,
+			output_file,
+			[],
+			frames,
+			[],
+			[],
+			font_path,
+			None,  # The logo is a timeline overlay: a base plate logo would be hidden under the full-frame images.
+			progress_callback,
+			render_mode="single_pass",
+			subtitle_mode="burned" if subtitle_file else "none"
+		)
+		self.frames = frames
+		self.watermark = logo_path
+		self.subparts_durations = [self.narration_duration]
+
+	def get_subtitle_style(self):
+		return "FontName=Heavitas,FontSize=64,PrimaryColour=&HFFFFFF,OutlineColour=&H000000,Outline=4,MarginL=60,MarginR=60,MarginV=480"
+
+	def select_bgm(self):
+		return self.bgm_path
+
+	def get_narration_duration(self):
+		self.full_narration_duration = super().get_narration_duration()
+		return min(self.full_narration_duration, SHORTS_MAX_SECONDS)
+
+	def narration_input(self):
+		narration = ffmpeg.input(self.narration_audio, t=self.narration_duration)
+		if self.full_narration_duration > self.narration_duration:
+			narration = narration.filter("afade", t="out", st=self.narration_duration - FADE_OUT_TIME, d=FADE_OUT_TIME)
+		return narration
+
+	def overlay_logo(self, video_stream, x=LOGO_X, y=LOGO_Y, scale=LOGO_WIDTH):
+		return video_stream  # Drawn as a timeline overlay, see build_timeline.
+
+	def build_timeline(self):
+		timeline = {
+			"background": None,
+			"size": [SHORTS_WIDTH, SHORTS_HEIGHT],
+			"bells": [],
+			"sequences": [{
+				"images": self.frames,
+				"start": 0,
+				"duration": self.narration_duration,
+				"motion": "static",
+				"width": SHORTS_WIDTH,
+				"height": SHORTS_HEIGHT,
+				"x": 0,
+				"y": 0,
+			}],
+			"overlays": [],
+		}
+		if self.watermark and os.path.exists(self.watermark):
+			timeline["overlays"].append({
+				"path": self.watermark,
+				"scale": LOGO_WIDTH,
+				"start": 0,
+				"end": self.narration_duration,
+				"x": str(LOGO_X),
+				"y": str(LOGO_Y),
+			})
+		return timeline
+
+	def create_video(self):
+		print(f"🔄 STARTED Short creation: {self.output_file}")
+		start_time = time.time()
+
+		if os.path.exists(self.output_file):
+			print(f"📼 Skipping: Short already exists: {self.output_file}")
+			return self.output_file
+
+		self.render(self.build_timeline())
+
+		print(f"✅ Short created successfully: {self.output_file}")
+		print(f"⏳ Short editing time: {round(time.time() - start_time, 1)} s")
+		return self.output_file
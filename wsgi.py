@@ -0,0 +1,19 @@
+"""
+Production entry point. On Linux/macOS serve with gunicorn (settings in gunicorn.conf.py):
+
+	gunicorn -c gunicorn.conf.py wsgi:app
+
+On Windows, where gunicorn doesn't run, `python wsgi.py` serves with waitress (one process, WSGI_THREADS threads).
+"""
+from app import app, start_background_services
+from constants import APP_HOST, APP_PORT, SCRIPT_FOLDER, THUMBNAIL_FOLDER, VIDEO_OUTPUT_FOLDER, WSGI_THREADS
+
+if __name__ == "__main__":
+	import os
+	from waitress import serve
+
+	for folder in (SCRIPT_FOLDER, VIDEO_OUTPUT_FOLDER, THUMBNAIL_FOLDER):
+		os.makedirs(folder, exist_ok=True)
+	start_background_services()
+	print(f"🚀 Serving on http://{APP_HOST}:{APP_PORT} with {WSGI_THREADS} threads")
+	serve(app, host=APP_HOST, port=APP_PORT, threads=WSGI_THREADS)
@@ -0,0 +1,88 @@
+import datetime
+import google.auth.transport.requests
+import googleapiclient.discovery
+import threading
+
+from constants import TOKEN_REFRESH_MARGIN
+
+
+class YouTubeClientPool:
+	"""
+	Process-wide cache of authenticated YouTube API clients.
+	Credentials are loaded once per channel and refreshed shortly before they expire. The discovery document is
+	parsed once per API version. httplib2 connections are not thread-safe, so each thread gets its own client
+	built from the shared credentials and discovery document.
+	"""
+
+	def __init__(self, refresh_margin=TOKEN_REFRESH_MARGIN):
+		self.refresh_margin = datetime.timedelta(seconds=refresh_margin)
+		self._lock = threading.Lock()
+		self._channel_locks = {}
+		self._credentials = {}
+		self._discovery_documents = {}
+		self._local = threading.local()
+
+	def get_client(self, uploader):
+		"""
+		Returns a YouTube API client for the uploader's channel, reusing cached credentials and clients.
+		:param uploader: YouTubeUploader providing category, API name/version and credential load/save methods.
+		"""
+		credentials = self._get_credentials(uploader)
+
+		clients = self._local.__dict__.setdefault("clients", {})
+		cached = clients.get(uploader.category)
+		if cached and cached[0] is credentials:
+			return cached[1]
+
+		document = self._get_discovery_document(uploader.api_service_name, uploader.api_version, credentials)
+		client = googleapiclient.discovery.build_from_document(document, credentials=credentials)
+		clients[uploader.category] = (credentials, client)
+		return client
+
+	def invalidate(self, category):
+		"""Drops cached credentials for a channel so the next request authenticates again."""
+		with self._lock:
+			self._credentials.pop(category, None)
+
+	def _get_channel_lock(self, category):
+		with self._lock:
+			return self._channel_locks.setdefault(category, threading.Lock())
+
+	def _get_credentials(self, uploader):
+		with self._get_channel_lock(uploader.category):
+			credentials = self._credentials.get(uploader.category)
+			if credentials is None:
+				credentials = uploader.load_credentials()
+				self._credentials[uploader.category] = credentials
+			elif self._expires_soon(credentials):
+				print(f"🔄 Proactively refreshing YouTube API token for {uploader.category}...")
+				try:
+					credentials.refresh(google.auth.transport.requests.Request())
+					uploader.save_credentials(credentials)
+				except Exception as e:
+					print(f"⚠️ Proactive refresh failed for {uploader.category}: {e}")
+					credentials = uploader.load_credentials()
+					self._credentials[uploader.category] = credentials
+			return credentials
+
+	def _expires_soon(self, credentials):
+		if not credentials.expiry:
+			return False
+		# google-auth stores expiry as a naive UTC datetime.
+		now = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+		return credentials.expiry - now < self.refresh_margin
+
+	def _get_discovery_document(self, api_service_name, api_version, credentials):
+		key = (api_service_name, api_version)
+		with self._lock:
+			document = self._discovery_documents.get(key)
+		if document is not None:
+			return document
+
+		service = googleapiclient.discovery.build(api_service_name, api_version, credentials=credentials, cache_discovery=False)
+		with self._lock:
+			self._discovery_documents[key] = service._rootDesc
+		return service._rootDesc
+
+
+YOUTUBE_CLIENT_POOL = YouTubeClientPool()
@@ -1,14 +1,33 @@
 import google.auth
 import google_auth_oauthlib.flow
-import googleapiclient.discovery
 import googleapiclient.errors
+import hashlib
+import http.client
+import httplib2
 import json
 import os
+import random
+import threading
 import time
 
-from constants import CREDENTIALS_FOLDER, PEOPLE_BLOGS_YOUTUBE_CATEGORY_ID, GOOGLE_OAUTH_PORT, MAX_PLAYLISTS_PER_REQUEST, PLAYLIST_FOLDER, THUMBNAIL_FOLDER
+from constants import (
+	CREDENTIALS_FOLDER, PEOPLE_BLOGS_YOUTUBE_CATEGORY_ID, GOOGLE_OAUTH_PORT, MAX_PLAYLISTS_PER_REQUEST, PLAYLIST_FOLDER,
+	THUMBNAIL_FOLDER, UPLOAD_CHUNK_SIZE, UPLOAD_MAX_BACKOFF, UPLOAD_MAX_RETRIES, UPLOAD_SESSION_FOLDER, YOUTUBE_QUOTA_COSTS
+)
 from google.oauth2.credentials import Credentials
 from googleapiclient.http import MediaFileUpload
+from playlist_cache import PLAYLIST_CACHE
+from playlist_items_index import PlaylistItemsIndex
+from utils import atomic_write_json, atomic_write_text, file_lock
+from youtube_client_pool import YOUTUBE_CLIENT_POOL
+
+# Errors worth retrying while sending upload chunks (server hiccups and dropped connections).
+RETRIABLE_STATUS_CODES = (500, 502, 503, 504)
+RETRIABLE_EXCEPTIONS = (httplib2.HttpLib2Error, http.client.HTTPException, ConnectionError, TimeoutError)
+# Status codes returned when a persisted resumable session is no longer valid.
+EXPIRED_SESSION_STATUS_CODES = (404, 410)
+# One interactive sign-in at a time: every flow listens on GOOGLE_OAUTH_PORT and needs the user at the browser.
+_OAUTH_FLOW_LOCK = threading.Lock()
 
 
 class YouTubeUploader:
@@ -29,19 +48,26 @@ class YouTubeUploader:
 			"https://www.googleapis.com/auth/youtube"
 		]
 		self.youtube = self.authenticate()
+		self.playlist_items_index = PlaylistItemsIndex(category)
+		self.quota_used = 0
 
 
 	def get_playlist_name(self, playlist_id):
-		"""Fetch playlist name from the JSON file based on category and playlist ID."""
-		playlist_file = f"{PLAYLIST_FOLDER}/{self.category}_playlists.json"
-		if os.path.exists(playlist_file):
-			with open(playlist_file, "r", encoding="utf-8") as f:
-				playlists = json.load(f)
-				return playlists.get(playlist_id, "Unknown Playlist")
-		return "Unknown Playlist"
+		"""Fetch playlist name from the cached playlists JSON based on category and playlist ID."""
+		return PLAYLIST_CACHE.get(self.category).get(playlist_id, "Unknown Playlist")
+
+
+	def spend_quota(self, method, calls=1):
+		"""Counts YouTube API quota units spent by this uploader."""
+		self.quota_used += YOUTUBE_QUOTA_COSTS.get(method, 0) * calls
 
 
 	def authenticate(self):
+		"""Returns a cached YouTube API client for this channel, authenticating only on first use."""
+		return YOUTUBE_CLIENT_POOL.get_client(self)
+
+
+	def load_credentials(self):
 		"""Authenticate with OAuth 2.0, managing separate tokens per account."""
 		credentials = None
 
@@ -55,6 +81,7 @@ class YouTubeUploader:
 				try:
 					print(f"🔄 Refreshing YouTube API token for {self.category}...")
 					credentials.refresh(google.auth.transport.requests.Request())
+					self.save_credentials(credentials)
 				except Exception as e:
 					print(f"⚠️ Refresh failed for {self.category}: {e}")
 					print("🔁 Attempting full re-authentication instead...")
@@ -63,22 +90,39 @@ class YouTubeUploader:
 						os.remove(self.token_path)  # Clear invalid token
 
 			if not credentials:
-				print(f"🔑 Full authentication required for {self.category}. Please sign in.")
-				flow = google_auth_oauthlib.flow.InstalledAppFlow.from_client_secrets_file(
-					self.credentials_path, self.scopes
-				)
-				credentials = flow.run_local_server(
-					port=8080,
-					access_type='offline', # ✅ Enables refresh token
-					prompt='consent'       # ✅ Forces refresh token to be returned every time
-				)
-				with open(self.token_path, "w") as token_file:
-					token_file.write(credentials.to_json())
+				credentials = self.run_oauth_flow()
+
+		return credentials
 
-		return googleapiclient.discovery.build(self.api_service_name, self.api_version, credentials=credentials)
 
+	def run_oauth_flow(self):
+		"""Signs in through the browser, waiting for any other channel's sign-in to finish first."""
+		with _OAUTH_FLOW_LOCK:
+			# Another thread may have signed in this channel while we waited.
+			if os.path.exists(self.token_path):
+				credentials = Credentials.from_authorized_user_file(self.token_path)
+				if credentials.valid:
+					return credentials
 
-	def upload_video(self, video_path, title, description, tags, privacy_status="private", category_id=PEOPLE_BLOGS_YOUTUBE_CATEGORY_ID, scheduled_time=None, thumbnail_path=None, playlist_ids=None):
+			print(f"🔑 Full authentication required for {self.category}. Please sign in.")
+			flow = google_auth_oauthlib.flow.InstalledAppFlow.from_client_secrets_file(
+				self.credentials_path, self.scopes
+			)
+			credentials = flow.run_local_server(
+				port=GOOGLE_OAUTH_PORT,
+				access_type='offline', # ✅ Enables refresh token
+				prompt='consent'       # ✅ Forces refresh token to be returned every time
+			)
+			self.save_credentials(credentials)
+			return credentials
+
+
+	def save_credentials(self, credentials):
+		with file_lock(self.token_path):
+			atomic_write_text(self.token_path, credentials.to_json())
+
+
+	def upload_video(self, video_path, title, description, tags, privacy_status="private", category_id=PEOPLE_BLOGS_YOUTUBE_CATEGORY_ID, scheduled_time=None, thumbnail_path=None, playlist_ids=None, chunk_size=UPLOAD_CHUNK_SIZE, progress_callback=None):
 		"""
 		Uploads a video to YouTube with metadata, optional scheduling, and playlist associations.
 
@@ -91,10 +135,13 @@ class YouTubeUploader:
 		:param scheduled_time: (Optional) ISO 8601 format (YYYY-MM-DDTHH:MM:SSZ) to schedule the video.
 		:param thumbnail_path: (Optional) Path to a custom thumbnail image.
 		:param playlist_ids: (Optional) List of playlist IDs to add the video to.
+		:param chunk_size: Bytes sent per resumable upload request.
+		:param progress_callback: (Optional) Called as callback(uploaded_bytes, total_bytes, bytes_per_second) after each chunk.
 		:return: Video ID or None if failed.
 		"""
 		print("🚀 Uploading video to YouTube...")
 		upload_start_time = time.time()
+		quota_before_upload = self.quota_used
 
 		if not self.youtube:
 			print("❌ YouTube API client is not authenticated.")
@@ -118,10 +165,11 @@ class YouTubeUploader:
 					},
 					"status": status
 				},
-				media_body=MediaFileUpload(video_path, chunksize=-1, resumable=True)
+				media_body=MediaFileUpload(video_path, chunksize=chunk_size, resumable=True)
 			)
 
-			response = request.execute()
+			self.spend_quota("videos.insert")
+			response = self._execute_resumable_upload(request, video_path, progress_callback)
 			video_id = response["id"]
 			print(f"✅ Upload successful! Video ID: {video_id}")
 
@@ -134,18 +182,128 @@ class YouTubeUploader:
 					playlist_ids = [playlist_ids]  # ✅ Convert single string to list
 
 				print(f"🎥 Video {video_id} is being added to playlists: {playlist_ids}")
-
-				for playlist_id in playlist_ids:
-					self.add_video_to_playlist(video_id, playlist_id)
+				self.add_video_to_playlists(video_id, playlist_ids)
 
 			upload_end_time = time.time()
 			print(f"🚀 YouTube upload time: {round(upload_end_time - upload_start_time, 1)} s")
+			print(f"📊 YouTube API quota used by this upload: {self.quota_used - quota_before_upload} units")
 			return video_id
 		except googleapiclient.errors.HttpError as e:
 			print(f"❌ Upload failed: {e}")
 			return None
 
 
+	def _execute_resumable_upload(self, request, video_path, progress_callback=None):
+		"""
+		Drives a resumable upload chunk by chunk, retrying transient failures with exponential backoff.
+		The session URI is persisted so an upload interrupted by a crash resumes where it stopped.
+		"""
+		total_bytes = os.path.getsize(video_path)
+		session_path = self._get_upload_session_path(video_path)
+		session = self._load_upload_session(session_path, video_path)
+		resumed = session is not None
+		if resumed:
+			print(f"♻️ Resuming interrupted upload session for: {video_path}")
+			request.resumable_uri = session["resumable_uri"]
+			request._in_error_state = True  # Makes next_chunk() ask the server how many bytes it already has.
+
+		response = None
+		retries = 0
+		started_at = time.time()
+		start_progress = None
+
+		while response is None:
+			try:
+				status, response = request.next_chunk()
+				retries = 0
+
+				if request.resumable_uri and not session:
+					session = self._save_upload_session(session_path, video_path, request.resumable_uri)
+
+				uploaded_bytes = total_bytes if response is not None else (status.resumable_progress if status else 0)
+				if start_progress is None:
+					# Bytes already on the server from a previous process don't count toward throughput.
+					start_progress = uploaded_bytes if resumed else 0
+					if resumed:
+						started_at = time.time()
+				elapsed = max(time.time() - started_at, 0.001)
+				bytes_per_second = (uploaded_bytes - start_progress) / elapsed
+
+				print(f"📤 Uploaded {uploaded_bytes / total_bytes * 100:.1f}% ({uploaded_bytes / 1024 / 1024:.1f}/{total_bytes / 1024 / 1024:.1f} MB) at {bytes_per_second / 1024 / 1024:.2f} MB/s")
+				if progress_callback:
+					progress_callback(uploaded_bytes, total_bytes, bytes_per_second)
+
+			except googleapiclient.errors.HttpError as e:
+				if e.resp.status in EXPIRED_SESSION_STATUS_CODES and session:
+					print("⚠️ Stored upload session expired. Starting a new upload session...")
+					self._discard_upload_session(session_path)
+					session = None
+					resumed = False
+					request.resumable_uri = None
+					request.resumable_progress = 0
+					request._in_error_state = False
+					continue
+				if e.resp.status not in RETRIABLE_STATUS_CODES:
+					raise
+				retries = self._wait_before_retry(retries, f"HTTP {e.resp.status}")
+			except RETRIABLE_EXCEPTIONS as e:
+				retries = self._wait_before_retry(retries, e)
+
+		self._discard_upload_session(session_path)
+		return response
+
+	@staticmethod
+	def _wait_before_retry(retries, reason):
+		"""Sleeps with exponential backoff and jitter. Returns the updated retry count."""
+		retries += 1
+		if retries > UPLOAD_MAX_RETRIES:
+			raise RuntimeError(f"❌ Upload aborted after {UPLOAD_MAX_RETRIES} retries. Last error: {reason}")
+
+		sleep_seconds = min(2 ** retries, UPLOAD_MAX_BACKOFF) * random.uniform(0.5, 1)
+		print(f"⚠️ Upload chunk failed ({reason}). Retry {retries}/{UPLOAD_MAX_RETRIES} in {round(sleep_seconds, 1)} s...")
+		time.sleep(sleep_seconds)
+		return retries
+
+	def _get_upload_session_path(self, video_path):
+		video_key = hashlib.sha1(os.path.abspath(video_path).encode("utf-8")).hexdigest()[:16]
+		return os.path.join(UPLOAD_SESSION_FOLDER, f"{self.category}_{video_key}.json")
+
+	@staticmethod
+	def _load_upload_session(session_path, video_path):
+		"""Returns the stored session if it still matches the file on disk, otherwise None."""
+		if not os.path.exists(session_path):
+			return None
+
+		with open(session_path, "r", encoding="utf-8") as f:
+			session = json.load(f)
+
+		file_stat = os.stat(video_path)
+		if session.get("size") != file_stat.st_size or session.get("mtime") != file_stat.st_mtime:
+			print("⚠️ Video file changed since the last upload attempt. Discarding stored session.")
+			os.remove(session_path)
+			return None
+		return session
+
+	@staticmethod
+	def _save_upload_session(session_path, video_path, resumable_uri):
+		os.makedirs(UPLOAD_SESSION_FOLDER, exist_ok=True)
+		file_stat = os.stat(video_path)
+		session = {
+			"resumable_uri": resumable_uri,
+			"video_path": os.path.abspath(video_path),
+			"size": file_stat.st_size,
+			"mtime": file_stat.st_mtime,
+			"created_at": time.time()
+		}
+		atomic_write_json(session_path, session)
+		return session
+
+	@staticmethod
+	def _discard_upload_session(session_path):
+		if os.path.exists(session_path):
+			os.remove(session_path)
+
+
 	def set_thumbnail(self, video_id, thumbnail_path):
 		"""
 		Sets a custom thumbnail for the uploaded video.
@@ -157,6 +315,7 @@ class YouTubeUploader:
 			return None
 
 		try:
+			self.spend_quota("thumbnails.set")
 			request = self.youtube.thumbnails().set(
 				videoId=video_id,
 				media_body=MediaFileUpload(thumbnail_path)
@@ -180,8 +339,10 @@ class YouTubeUploader:
 					part="snippet",
 					mine=True,
 					maxResults=MAX_PLAYLISTS_PER_REQUEST,
-					pageToken=next_page_token
+					pageToken=next_page_token,
+					fields="nextPageToken,items(id,snippet/title)"
 				)
+				self.spend_quota("playlists.list")
 				response = request.execute()
 
 				for playlist in response.get("items", []):
@@ -191,12 +352,17 @@ class YouTubeUploader:
 				if not next_page_token:
 					break
 
-			# ✅ Sort and save
+			# ✅ Sort and save (only when the playlists changed)
 			sorted_playlists = dict(sorted(playlists.items(), key=lambda item: item[1].lower()))
-			playlist_file_path = os.path.join(PLAYLIST_FOLDER, f"{self.category}_playlists.json")
+			playlist_file_path = PLAYLIST_CACHE.get_path(self.category)
+
+			if sorted_playlists == PLAYLIST_CACHE.get(self.category):
+				print(f"✅ Fetched {len(sorted_playlists)} playlists, unchanged since last refresh: {playlist_file_path}")
+				return sorted_playlists
 
-			with open(playlist_file_path, "w", encoding="utf-8") as f:
-				json.dump(sorted_playlists, f, indent=4, ensure_ascii=False)
+			with file_lock(playlist_file_path):
+				atomic_write_json(playlist_file_path, sorted_playlists)
+			PLAYLIST_CACHE.invalidate(self.category)
 
 			print(f"✅ Fetched {len(sorted_playlists)} playlists and saved to {playlist_file_path}")
 			return sorted_playlists
@@ -210,39 +376,66 @@ class YouTubeUploader:
 		"""
 		Adds a video to the specified YouTube playlist.
 		"""
-		try:
-			playlist_name = self.get_playlist_name(playlist_id)
-			print(f"📝 Attempting to add video {video_id} to playlist {playlist_name}...")
+		self.add_video_to_playlists(video_id, [playlist_id])
 
-			# Check if the video is already in the playlist
-			existing_videos = self.youtube.playlistItems().list(
-				part="snippet",
-				playlistId=playlist_id,
-				maxResults=MAX_PLAYLISTS_PER_REQUEST
-			).execute()
 
-			if any(item["snippet"]["resourceId"]["videoId"] == video_id for item in existing_videos.get("items", [])):
+	def add_video_to_playlists(self, video_id, playlist_ids):
+		"""
+		Adds a video to several playlists with a single batch request.
+		Duplicates are detected with the local playlist items index instead of listing every playlist.
+		"""
+		pending_playlist_ids = []
+		for playlist_id in dict.fromkeys(playlist_ids):
+			playlist_name = self.get_playlist_name(playlist_id)
+			try:
+				if self.playlist_items_index.is_stale(playlist_id):
+					print(f"🔄 Refreshing local items index for playlist {playlist_name}...")
+					self.playlist_items_index.refresh(self.youtube, playlist_id, self.spend_quota)
+			except googleapiclient.errors.HttpError as e:
+				print(f"⚠️ Could not refresh items of playlist {playlist_name}: {e}")
+
+			if self.playlist_items_index.contains(playlist_id, video_id):
 				print(f"⚠️ Video {video_id} is already in playlist {playlist_name}. Skipping...")
+				continue
+			pending_playlist_ids.append(playlist_id)
+
+		if not pending_playlist_ids:
+			self.playlist_items_index.save()
+			return
+
+		def on_insert(request_id, response, exception):
+			playlist_name = self.get_playlist_name(request_id)
+			if exception is not None:
+				print(f"❌ ERROR adding video {video_id} to playlist {playlist_name}: {exception}")
 				return
+			self.playlist_items_index.add(request_id, video_id)
+			print(f"✅ Successfully added video {video_id} to playlist {playlist_name}.")
 
-			# Insert the video into the playlist
-			request = self.youtube.playlistItems().insert(
-				part="snippet",
-				body={
-					"snippet": {
-						"playlistId": playlist_id,
-						"resourceId": {
-							"kind": "youtube#video",
-							"videoId": video_id
+		print(f"📝 Adding video {video_id} to {len(pending_playlist_ids)} playlists in one batch request...")
+		batch = self.youtube.new_batch_http_request(callback=on_insert)
+		for playlist_id in pending_playlist_ids:
+			batch.add(
+				self.youtube.playlistItems().insert(
+					part="snippet",
+					body={
+						"snippet": {
+							"playlistId": playlist_id,
+							"resourceId": {
+								"kind": "youtube#video",
+								"videoId": video_id
+							}
 						}
 					}
-				}
+				),
+				request_id=playlist_id
 			)
-			request.execute()
-			print(f"✅ Successfully added video {video_id} to playlist {playlist_name}.")
+		self.spend_quota("playlistItems.insert", len(pending_playlist_ids))
 
+		try:
+			batch.execute()
 		except googleapiclient.errors.HttpError as e:
-			print(f"❌ ERROR adding video {video_id} to playlist {playlist_name}: {e}")
+			print(f"❌ ERROR sending playlist batch request for video {video_id}: {e}")
+		self.playlist_items_index.save()
 
 
 if __name__ == "__main__":